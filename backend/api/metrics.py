@@ -0,0 +1,119 @@
+"""
+SautiNa Metrics Endpoint
+Prometheus scrape target. Cache and disk figures are read from the
+services at scrape time, so they cost nothing on the request path.
+Some collectors block (a temp dir walk, a SQLite count), so the route is
+synchronous and runs on the threadpool; collectors copy any shared dict
+before iterating it.
+"""
+import os
+from typing import Dict
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from config import settings
+from services.audio_bank_service import audio_bank_service
+from services.intent_service import intent_service
+from services.job_service import job_service
+from services.search_service import search_service
+from services.semantic_cache import semantic_cache
+from services.translation_memory import translation_memory
+from utils.admission import LIMITERS
+from utils.loop_monitor import loop_monitor
+from utils.metrics import CallbackMetric, register, register_histograms, render_metrics
+
+router = APIRouter()
+
+
+def _cache_stats() -> Dict[str, dict]:
+    return {
+        "search": search_service.cache.get_stats(),
+        "intent": intent_service.get_stats(),
+        "semantic": semantic_cache.get_stats(),
+        "translation_memory": translation_memory.get_stats(),
+        "audio_bank": audio_bank_service.get_stats(),
+    }
+
+
+def _cache_field(field: str):
+    def collect():
+        samples = {}
+        for cache, stats in _cache_stats().items():
+            if field in stats:
+                samples[(cache,)] = stats[field]
+        return samples
+    return collect
+
+
+def _temp_dir_usage() -> Dict[tuple, float]:
+    """Total size and file count of generated audio waiting in the temp dir"""
+    size = files = 0
+    try:
+        with os.scandir(settings.temp_dir) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    size += entry.stat(follow_symlinks=False).st_size
+                    files += 1
+    except FileNotFoundError:
+        pass
+    return {("bytes",): size, ("files",): files}
+
+
+register(CallbackMetric(
+    "sautina_cache_hits_total", "Cache lookups that found a fresh entry", ["cache"],
+    _cache_field("hits"), type="counter",
+))
+register(CallbackMetric(
+    "sautina_cache_stale_hits_total", "Lookups answered from a stale entry while it was refreshed", ["cache"],
+    _cache_field("stale_hits"), type="counter",
+))
+register(CallbackMetric(
+    "sautina_cache_misses_total", "Cache lookups that found nothing", ["cache"],
+    _cache_field("misses"), type="counter",
+))
+register(CallbackMetric(
+    "sautina_cache_hit_ratio", "Hit ratio since startup (stale hits count as hits), as each cache reports it", ["cache"],
+    _cache_field("hit_ratio"),
+))
+register(CallbackMetric(
+    "sautina_temp_dir_usage", "Generated audio in the temp dir", ["unit"],
+    _temp_dir_usage,
+))
+register_histograms(
+    "sautina_event_loop_lag_seconds", "How late the event loop ran a scheduled heartbeat", "loop",
+    {"main": loop_monitor.lag},
+)
+register(CallbackMetric(
+    "sautina_event_loop_stalls_total", "Times the event loop was blocked beyond the stall threshold", [],
+    lambda: {(): loop_monitor.stalls}, type="counter",
+))
+
+register(CallbackMetric(
+    "sautina_stage_slots_in_use", "Admission slots held per pipeline stage", ["stage"],
+    lambda: {(name,): limiter.in_use for name, limiter in LIMITERS.items()},
+))
+register(CallbackMetric(
+    "sautina_stage_queue_depth", "Requests waiting for an admission slot", ["stage"],
+    lambda: {(name,): limiter.queued for name, limiter in LIMITERS.items()},
+))
+register(CallbackMetric(
+    "sautina_stage_rejections_total", "Requests shed by admission control", ["stage", "reason"],
+    lambda: {
+        (name, reason): count
+        for name, limiter in LIMITERS.items()
+        for reason, count in list(limiter.rejected.items())
+    },
+    type="counter",
+))
+
+register(CallbackMetric(
+    "sautina_voice_jobs", "Voice jobs held, by status (queue_depth: waiting for a worker)", ["status"],
+    lambda: {(status,): count for status, count in job_service.get_stats().items()},
+))
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """Prometheus text exposition"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,157 @@
+"""
+SautiNa ASGI Middleware
+Pure ASGI (no BaseHTTPMiddleware) so the request context set here is the
+one the endpoint and the services it awaits actually see.
+"""
+import asyncio
+import time
+
+from utils.metrics import HTTP_IN_FLIGHT, HTTP_REQUESTS
+from utils import tracing
+from utils.profiler import request_profiler, set_profile, reset_profile
+from utils.timing import start_request, end_request, current_timings, record, server_timing_header
+
+
+class ServerTimingMiddleware:
+    """Collect per-stage timings for each HTTP request and report them in a Server-Timing header"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        token = start_request()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                timings = current_timings()
+                if timings:
+                    total_ms = (time.perf_counter() - start) * 1000
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", server_timing_header(timings, total_ms).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            # Only requests that ran a pipeline stage count towards the end-to-end histogram
+            if current_timings():
+                record("total", time.perf_counter() - start)
+            end_request(token)
+
+
+def route_label(path: str) -> str:
+    """Bounded route label for metrics ("/api/voice", "/audio", "other")"""
+    if path.startswith("/api/"):
+        return "/".join(path.split("/")[:3])
+    if path.startswith("/audio/"):
+        return "/audio"
+    if path in ("/", "/metrics"):
+        return path
+    return "other"
+
+
+class MetricsMiddleware:
+    """Track in-flight and completed HTTP requests per route"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = route_label(scope["path"])
+        status = "500"
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(route)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec(route)
+            HTTP_REQUESTS.inc(route, status)
+
+
+class TracingMiddleware:
+    """
+    Give each HTTP request a request id (X-Request-ID, taken from the client
+    if sent) and, when sampled, a root span that the stage spans hang off.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        client_id = dict(scope.get("headers", [])).get(b"x-request-id", b"").decode("latin-1")[:64]
+        tokens = tracing.start_request(client_id or None)
+        request_id = tracing.request_id_var.get()
+
+        try:
+            with tracing.span(f"{scope['method']} {route_label(scope['path'])}", path=scope["path"]) as root:
+                async def send_with_id(message):
+                    if message["type"] == "http.response.start":
+                        root.set_attribute("status", message["status"])
+                        headers = list(message.get("headers", []))
+                        headers.append((b"x-request-id", request_id.encode("latin-1")))
+                        message = {**message, "headers": headers}
+                    await send(message)
+
+                await self.app(scope, receive, send_with_id)
+        finally:
+            tracing.end_request(tokens)
+
+
+class ProfilingMiddleware:
+    """
+    Profile the request when it carries the profiling token in an X-Profile
+    header or is picked by the sampling rate. The profile file name comes back
+    in an X-Profile response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        header_token = dict(scope.get("headers", [])).get(b"x-profile", b"").decode("latin-1")
+        trigger = request_profiler.trigger(header_token)
+        profile = None
+        if trigger:
+            label = f"{scope['method']} {route_label(scope['path'])}"
+            profile = request_profiler.start(tracing.request_id_var.get(), label, trigger)
+        if profile is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_profile(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile", profile.filename.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = set_profile(profile)
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            reset_profile(token)
+            await asyncio.to_thread(request_profiler.finish, profile)
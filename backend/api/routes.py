@@ -2,9 +2,14 @@
 SautiNa API Routes
 Endpoints for voice and text processing.
 """
-from fastapi import APIRouter, File, UploadFile, HTTPException, Form, WebSocket, WebSocketDisconnect
-from fastapi.responses import FileResponse
+from fastapi import (
+    APIRouter, Depends, File, UploadFile, HTTPException, Form, Header, Request, WebSocket, WebSocketDisconnect
+)
+from fastapi.responses import FileResponse, StreamingResponse
 from typing import Optional
+import asyncio
+import hmac
+import json
 import logging
 
 from config import settings, SupportedLanguage
@@ -15,11 +20,18 @@ from schemas import (
     HealthResponse,
     LanguagesResponse,
     TranslateRequest,
-    TranslateResponse
+    TranslateResponse,
+    VoiceJobAccepted,
+    VoiceJobStatus
 )
+from services.conversation_service import ConversationSession
+from services.job_service import job_service
 from services.pipeline_service import pipeline_service
 from services.llm_service import llm_service
 from services.tts_service import tts_service
+from utils.admission import OverloadedError, LIMITERS
+from utils.loop_monitor import loop_monitor
+from utils.timing import get_stage_stats
 
 
 logger = logging.getLogger(__name__)
@@ -27,6 +39,16 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def require_diagnostics_token(x_diagnostics_token: Optional[str] = Header(None)):
+    """
+    Guard for endpoints that expose process internals. They answer 404
+    unless DIAGNOSTICS_TOKEN is set and the request sends it.
+    """
+    token = settings.diagnostics_token
+    if not (token and x_diagnostics_token and hmac.compare_digest(x_diagnostics_token, token)):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
@@ -38,6 +60,24 @@ async def health_check():
     )
 
 
+@router.get("/timings", dependencies=[Depends(require_diagnostics_token)], include_in_schema=False)
+async def get_timings():
+    """Per-stage latency summary (count, mean, p50, p95) since startup"""
+    return get_stage_stats()
+
+
+@router.get("/admission", dependencies=[Depends(require_diagnostics_token)], include_in_schema=False)
+async def get_admission_stats():
+    """Per-stage slots in use, queue depth and rejections"""
+    return {name: limiter.get_stats() for name, limiter in LIMITERS.items()}
+
+
+@router.get("/loop", dependencies=[Depends(require_diagnostics_token)], include_in_schema=False)
+async def get_loop_stats():
+    """Event-loop lag percentiles, worst blocking call sites and recent stall stacks"""
+    return loop_monitor.get_stats()
+
+
 @router.get("/languages", response_model=LanguagesResponse)
 async def get_languages():
     """Get list of supported languages"""
@@ -63,29 +103,42 @@ async def process_text(request: TextRequest):
     try:
         logger.info(f"Text request ({request.mode.value} mode): {request.text[:100]}...")
         
-        # Use provided language or default
-        language = request.language or SupportedLanguage.ENGLISH
-        
-        # Process through pipeline (LLM + TTS) with mode
+        # Process through pipeline (LLM + TTS) with mode; language is detected if not given
         response_text, response_lang, audio_url = await pipeline_service.process_text(
-            request.text, language, mode=request.mode
+            request.text, request.language, mode=request.mode, budget_seconds=request.budget_seconds
         )
         
         return TextResponse(
             text=response_text,
             detected_language=response_lang,
-            audio_url=audio_url
+            audio_url=audio_url,
+            timings=pipeline_service.response_timings(),
+            degraded=pipeline_service.response_degradations()
         )
         
+    except OverloadedError:
+        raise
     except Exception as e:
         logger.error(f"Text processing error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _preferred_language(language: Optional[str]) -> Optional[SupportedLanguage]:
+    """Parse an optional language form field (invalid codes fall back to auto-detect)"""
+    if not language:
+        return None
+    try:
+        return SupportedLanguage(language)
+    except ValueError:
+        logger.warning(f"Invalid language code: {language}, using auto-detect")
+        return None
+
+
 @router.post("/voice", response_model=VoiceResponse)
 async def process_voice(
     audio: UploadFile = File(..., description="Audio file (wav, mp3, ogg, webm)"),
-    language: Optional[str] = Form(None, description="Language code (ha, yo, ig, pcm, en)")
+    language: Optional[str] = Form(None, description="Language code (ha, yo, ig, pcm, en)"),
+    budget_seconds: Optional[float] = Form(None, gt=0, description="Answer within this many seconds")
 ):
     """
     Process a voice message through the full pipeline.
@@ -102,28 +155,114 @@ async def process_voice(
         # Read audio data
         audio_data = await audio.read()
         
-        # Parse language if provided
-        preferred_language = None
-        if language:
-            try:
-                preferred_language = SupportedLanguage(language)
-            except ValueError:
-                logger.warning(f"Invalid language code: {language}, using auto-detect")
-        
         # Process through full pipeline
         result = await pipeline_service.process_voice(
             audio_data=audio_data,
             filename=audio.filename or "audio.wav",
-            preferred_language=preferred_language
+            preferred_language=_preferred_language(language),
+            budget_seconds=budget_seconds
         )
         
         return result
         
+    except OverloadedError:
+        raise
     except Exception as e:
         logger.error(f"Voice processing error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/voice/jobs", response_model=VoiceJobAccepted, status_code=202)
+async def submit_voice_job(
+    request: Request,
+    audio: UploadFile = File(..., description="Audio file (wav, mp3, ogg, webm)"),
+    language: Optional[str] = Form(None, description="Language code (ha, yo, ig, pcm, en)"),
+    budget_seconds: Optional[float] = Form(None, gt=0, description="Answer within this many seconds")
+):
+    """
+    Queue a voice message and return at once.
+    
+    The pipeline keeps running if the connection drops. Poll the status URL
+    or follow the events URL (server-sent events: queued, running,
+    transcribed, answered, audio_ready, completed/failed). Results are kept
+    for VOICE_JOBS_TTL_SECONDS.
+    """
+    audio_data = await audio.read()
+    job = job_service.submit(
+        audio_data,
+        audio.filename or "audio.wav",
+        preferred_language=_preferred_language(language),
+        budget_seconds=budget_seconds
+    )
+    logger.info(f"Voice job queued: {job.id}")
+    return VoiceJobAccepted(
+        job_id=job.id,
+        status=job.status,
+        status_url=str(request.url_for("get_voice_job", job_id=job.id)),
+        events_url=str(request.url_for("voice_job_events", job_id=job.id)),
+    )
+
+
+def _get_job(job_id: str):
+    job = job_service.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    return job
+
+
+@router.get("/voice/jobs/{job_id}", response_model=VoiceJobStatus)
+async def get_voice_job(job_id: str):
+    """Current status, step events so far and (once completed) the result"""
+    return VoiceJobStatus(**_get_job(job_id).to_dict())
+
+
+@router.get("/voice/jobs/{job_id}/events")
+async def voice_job_events(job_id: str, last_event_id: Optional[str] = Header(None)):
+    """
+    Server-sent events for a voice job. Past events are replayed first, so a
+    client that reconnects (sending Last-Event-ID) misses nothing.
+    """
+    job = _get_job(job_id)
+    after = int(last_event_id) if last_event_id and last_event_id.isdigit() else -1
+    queue = job.subscribe(after)
+    
+    async def stream():
+        try:
+            while True:
+                try:
+                    entry = await asyncio.wait_for(queue.get(), timeout=settings.voice_jobs_keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if entry is None:
+                    return
+                data = json.dumps(entry["data"], ensure_ascii=False)
+                yield f"id: {entry['id']}\nevent: {entry['event']}\ndata: {data}\n\n"
+                if entry["event"] in ("completed", "failed"):
+                    return
+        finally:
+            job.unsubscribe(queue)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/conversation")
+async def conversation(websocket: WebSocket):
+    """
+    Live voice conversation.
+    
+    Stream 16-bit mono PCM microphone audio in; receive partial transcripts,
+    the answer as it is generated, and its audio sentence by sentence. Talking
+    over an answer cancels it. See services/conversation_service.py for the
+    message protocol.
+    """
+    await ConversationSession(websocket).run()
+
+
 @router.post("/text-to-speech")
 async def text_to_speech(
     text: str = Form(..., description="Text to convert to speech"),
@@ -148,6 +287,8 @@ async def text_to_speech(
             filename="response.mp3"
         )
         
+    except OverloadedError:
+        raise
     except Exception as e:
         logger.error(f"TTS error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -178,6 +319,8 @@ async def translate_text(request: TranslateRequest):
             target_language=request.target_language
         )
         
+    except OverloadedError:
+        raise
     except Exception as e:
         logger.error(f"Translation error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
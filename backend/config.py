@@ -3,8 +3,13 @@ SautiNa Configuration
 Environment-based configuration for the voice assistant backend.
 """
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import NamedTuple, Optional
 from enum import Enum
+import os
+
+
+# Directory containing this file (the backend root)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
 class SupportedLanguage(str, Enum):
@@ -23,11 +28,112 @@ class Settings(BaseSettings):
     app_name: str = "SautiNa"
     app_version: str = "1.0.0"
     debug: bool = True
+    stage_timings_in_response: bool = True  # Add per-stage timings to voice/text responses
     
     # N-ATLaS LLM settings (deployed on Modal)
     natlas_api_url: str = "https://ms-yuguda0--natlas-vllm-full-serve.modal.run/v1"
     natlas_model_name: str = "n-atlas-full"
     natlas_api_key: str = "not-needed"  # Modal doesn't require API key
+    speculative_execution: bool = True  # Classify and search concurrently when the fast path is unsure
+    speculative_generation: bool = False  # Also start a chat answer before the intent is known
+    
+    # Intent classification settings
+    intent_keywords_path: str = os.path.join(BASE_DIR, "data", "intent_keywords.json")
+    intent_local_enabled: bool = True  # Try the local classifier before N-ATLaS
+    intent_model_path: str = os.path.join(BASE_DIR, "models", "intent_classifier.npz")
+    intent_local_confidence_threshold: float = 0.85  # Below this, ask N-ATLaS
+    intent_log_enabled: bool = False  # Log N-ATLaS labels as training data (stores raw user messages)
+    intent_log_path: str = os.path.join(BASE_DIR, "logs", "intent_labels.jsonl")
+    intent_log_max_mb: int = 50  # Logging stops once the file reaches this size
+    intent_cache_enabled: bool = True
+    intent_cache_max_entries: int = 5000
+    intent_cache_ttl_seconds: int = 6 * 60 * 60
+    
+    # Translation memory (sentence-level reuse for /api/translate)
+    translation_memory_enabled: bool = True
+    translation_memory_path: str = os.path.join(BASE_DIR, "cache", "translation_memory.sqlite3")
+    translation_batch_max_tokens: int = 2048  # Cap on a batched reply; bigger batches are split
+    
+    # Semantic response cache (opt-in; general-knowledge CHAT/LEARN answers only)
+    semantic_cache_enabled: bool = False
+    semantic_cache_threshold: float = 0.95  # Minimum cosine similarity to reuse an answer...
+    semantic_cache_min_overlap: float = 0.8  # ...and Jaccard overlap of content words (numbers and names must match)
+    semantic_cache_max_entries: int = 500  # Per (language, mode)
+    semantic_cache_dim: int = 2 ** 12
+    
+    # Greeting fast path (answers pleasantries without the LLM)
+    fast_path_enabled: bool = True
+    greetings_path: str = os.path.join(BASE_DIR, "data", "greetings.json")
+    
+    # Local language identification (text with no language given, Whisper cross-check)
+    language_id_enabled: bool = True
+    language_id_corpus_path: str = os.path.join(BASE_DIR, "data", "langid_corpus.json")
+    language_id_min_letters: int = 3  # Shorter texts are left to the default language
+    language_id_min_margin: float = 0.05  # Mean per-feature log-likelihood lead over the runner-up
+    
+    # Diagnostics endpoints (/api/timings, /api/admission, /api/loop): served only with an X-Diagnostics-Token header
+    diagnostics_token: str = ""  # Set in .env; empty disables them (404)
+    
+    # Event-loop lag monitor (captures the loop's stack when it is blocked)
+    loop_monitor_enabled: bool = True
+    loop_monitor_interval_seconds: float = 0.05
+    loop_monitor_stall_threshold_seconds: float = 0.1
+    
+    # On-demand request profiling (X-Profile: <token> header, or a random sample of requests)
+    profiling_enabled: bool = False
+    profiling_token: str = ""  # Set in .env; empty disables the header trigger
+    profiling_sample_rate: float = 0.0
+    profiling_interval_seconds: float = 0.005
+    profiling_max_seconds: float = 30.0  # Stop sampling a request after this long
+    profiling_max_concurrent: int = 1
+    profiling_dir: str = os.path.join(BASE_DIR, "logs", "profiles")
+    profiling_max_files: int = 100
+    profiling_max_mb: int = 50
+    
+    # Admission control (per-stage concurrency; text is admitted before voice when saturated)
+    admission_enabled: bool = True
+    admission_limits: dict[str, int] = {"stt": 1, "llm": 16, "tts": 8, "search": 8}
+    admission_queue_sizes: dict[str, int] = {"stt": 8, "llm": 64, "tts": 32, "search": 32}
+    admission_max_wait_seconds: dict[str, float] = {"stt": 20.0, "llm": 10.0, "tts": 10.0, "search": 2.0}
+    
+    # Request deadlines (optional stages are dropped as the budget runs out)
+    deadline_seconds: dict[str, float] = {"voice": 25.0, "text": 30.0}  # Per output channel; clients may ask for less
+    deadline_search_min_seconds: float = 1.0  # Skip search if it would get less than this
+    deadline_llm_reserve_seconds: float = 4.0  # Kept back for generation when budgeting search
+    deadline_tts_reserve_seconds: float = 3.0  # Kept back for speech when budgeting search and tokens
+    deadline_tts_min_seconds: float = 2.0  # Return text only if less than this is left
+    deadline_min_tokens: int = 60  # Floor when max_tokens is shrunk to fit
+    llm_first_token_seconds: float = 1.0  # Initial estimates for budgeting max_tokens;
+    llm_tokens_per_second: float = 25.0  # the decode rate is then learned from responses
+    
+    # Voice jobs (POST /api/voice/jobs; results survive a dropped connection)
+    voice_jobs_workers: int = 2
+    voice_jobs_max_queued: int = 32
+    voice_jobs_ttl_seconds: int = 15 * 60  # Finished jobs are kept this long for clients to collect
+    voice_jobs_retry_after_seconds: int = 10
+    voice_jobs_keepalive_seconds: float = 15.0  # SSE comment interval, so proxies keep the stream open
+    
+    # Live conversation (WebSocket /api/conversation; 16-bit mono PCM in, streamed text and audio out)
+    conversation_sample_rate: int = 16000  # Default; clients may declare another in their "start" message
+    conversation_vad_frame_ms: int = 30
+    conversation_vad_threshold_db: float = 12.0  # Speech is this far above the tracked noise floor...
+    conversation_vad_min_level_dbfs: float = -50.0  # ...and never quieter than this
+    conversation_vad_start_ms: int = 120  # Voiced audio needed to start an utterance (and to barge in)
+    conversation_vad_silence_ms: int = 700  # Silence that ends an utterance
+    conversation_preroll_ms: int = 300  # Audio kept from just before speech was detected
+    conversation_max_utterance_seconds: float = 30.0  # Longer speech is transcribed in parts, answered as one
+    conversation_partial_interval_seconds: float = 1.0  # Partial transcript this often while speaking (0 disables)
+    conversation_partial_window_seconds: float = 6.0  # Partials decode only this much of the latest audio
+    conversation_partial_max_seconds: float = 20.0  # No partials once an utterance is longer than this
+    conversation_tts_min_chars: int = 24  # Shorter sentences are joined to the next before synthesis
+    conversation_max_history_messages: int = 12
+    
+    # Tracing (spans per pipeline stage; 0 disables, 1 traces every request)
+    tracing_sample_rate: float = 0.0
+    tracing_exporter: str = "jsonl"  # "jsonl" or "otlp"
+    tracing_jsonl_path: str = os.path.join(BASE_DIR, "logs", "traces.jsonl")
+    tracing_otlp_endpoint: str = "http://localhost:4318"
+    tracing_service_name: str = "sautina-backend"
     
     # Whisper STT settings
     whisper_model: str = "base"  # Options: tiny, base, small, medium, large
@@ -47,6 +153,43 @@ class Settings(BaseSettings):
     # Search settings
     tavily_api_key: str = ""  # Set in .env for Tavily search
     use_tavily: bool = True   # Use Tavily if key available, else DuckDuckGo
+    search_deadline_seconds: float = 4.0  # Per-request budget for the whole search
+    search_hedge_delay_seconds: float = 0.5  # Start the next provider after this delay (0 = race all at once)
+    search_max_workers: int = 8  # Threads for the blocking provider clients
+    search_context_compaction: bool = True  # Rank and trim results before they reach the prompt
+    search_context_token_budget: int = 350
+    search_cache_enabled: bool = True
+    search_cache_max_entries: int = 1000
+    search_cache_ttls: dict[str, int] = {  # Fresh lifetime in seconds per query class
+        "weather": 15 * 60,
+        "news": 30 * 60,
+        "price": 60 * 60,
+        "general": 24 * 60 * 60,
+    }
+    search_cache_stale_ratio: float = 0.5  # Serve stale for this fraction of the TTL while refreshing
+    search_prewarm_enabled: bool = True  # Keep the hottest queries refreshed in the background
+    search_prewarm_interval_seconds: int = 60
+    search_prewarm_top_n: int = 20
+    search_prewarm_min_hits: int = 3  # Ignore one-off queries
+    search_prewarm_window_seconds: int = 6 * 60 * 60  # Rolling window for query popularity
+    search_prewarm_max_tracked: int = 5000  # Distinct raw queries remembered for pre-warming
+    search_prewarm_concurrency: int = 2
+    search_prewarm_rate_per_minute: int = 30
+    search_prewarm_queries: list[str] = [  # Always kept warm, regardless of traffic
+        "weather in Lagos today",
+        "weather in Kano today",
+        "weather in Abuja today",
+        "price of rice in Lagos market",
+        "price of maize in Kano market",
+        "fuel price in Nigeria today",
+        "Nigeria news today",
+    ]
+    
+    # Audio bank settings (pre-rendered speech for fixed phrases)
+    audio_bank_enabled: bool = True
+    audio_bank_dir: str = os.path.join(BASE_DIR, "audio_bank")
+    audio_bank_version: str = "v1"  # Bump to re-render every phrase into a fresh bank
+    audio_bank_prerender_on_startup: bool = False  # Otherwise run build_audio_bank.py offline
     
     class Config:
         env_file = ".env"
@@ -63,6 +206,24 @@ LANGUAGE_VOICE_MAP = {
     SupportedLanguage.ENGLISH: "Adaora",  # Warm, engaging - Nigerian English
 }
 
+# Fallback responses when N-ATLaS is unavailable
+FALLBACK_MESSAGES = {
+    SupportedLanguage.HAUSA: "Yi haƙuri, matsala ta faru. Da fatan za a sake gwadawa.",
+    SupportedLanguage.YORUBA: "E jọ̀wọ́, ìṣòro kan wáyé. Ẹ gbìyànjú lẹ́ẹ̀kan síi.",
+    SupportedLanguage.IGBO: "Biko, nsogbu mere. Gbalịa ọzọ.",
+    SupportedLanguage.PIDGIN: "Abeg, problem happen. Try again abeg.",
+    SupportedLanguage.ENGLISH: "Sorry, an error occurred. Please try again.",
+}
+
+# Welcome text shown on the root endpoint
+WELCOME_MESSAGES = {
+    SupportedLanguage.HAUSA: "Barka da zuwa SautiNa!",
+    SupportedLanguage.YORUBA: "Ẹ kú àbọ̀ sí SautiNa!",
+    SupportedLanguage.IGBO: "Nnọọ na SautiNa!",
+    SupportedLanguage.PIDGIN: "Welcome to SautiNa o!",
+    SupportedLanguage.ENGLISH: "Welcome to SautiNa!",
+}
+
 # System prompts for N-ATLaS with cultural context
 SYSTEM_PROMPTS = {
     SupportedLanguage.HAUSA: """Kai mai taimako ne na dijital na Najeriya. Ka amsa da Hausa mai sauƙi da kulawa. Ka taimaka game da lafiya, noma, kasuwa, yanayi, da canjin yanayi. Yi amfani da bayanan bincike don ba da shawarwari masu amfani.""",
@@ -83,6 +244,58 @@ class ChatMode(str, Enum):
     LEARN = "learn"    # Teacher mode - LLM asks questions and teaches
 
 
+class OutputChannel(str, Enum):
+    """How the answer reaches the user"""
+    VOICE = "voice"    # Spoken back through TTS
+    TEXT = "text"      # Read on screen
+
+
+class GenerationPolicy(NamedTuple):
+    """Generation budget for one kind of request"""
+    max_tokens: int
+    temperature: float
+    brevity: str = ""  # Extra system-prompt instruction; "" for none
+
+
+DEFAULT_GENERATION_POLICY = GenerationPolicy(500, 0.7)
+
+# Budgets keyed on (mode, intent, channel); "*" matches any intent or channel.
+# Spoken answers are kept short because TTS cost and listening time grow with length.
+GENERATION_POLICIES = {
+    (ChatMode.CHAT, "chat", OutputChannel.VOICE): GenerationPolicy(
+        120, 0.7, "Reply in one to three short sentences that sound natural when read aloud."),
+    (ChatMode.CHAT, "chat", OutputChannel.TEXT): GenerationPolicy(
+        250, 0.7, "Keep the reply brief and conversational."),
+    (ChatMode.CHAT, "search", OutputChannel.VOICE): GenerationPolicy(
+        150, 0.3, "Give the key facts in two or three short spoken sentences. No lists, links or tables."),
+    (ChatMode.CHAT, "search", OutputChannel.TEXT): GenerationPolicy(
+        300, 0.3, "Lead with the key facts and keep the answer concise."),
+    (ChatMode.CHAT, "learn", OutputChannel.VOICE): GenerationPolicy(
+        250, 0.6, "Explain simply in one short spoken paragraph, without lists or formatting."),
+    (ChatMode.CHAT, "learn", OutputChannel.TEXT): GenerationPolicy(450, 0.6),
+    (ChatMode.CHAT, "translate", "*"): GenerationPolicy(
+        200, 0.3, "Give the translation and at most one short note."),
+    (ChatMode.LEARN, "*", OutputChannel.VOICE): GenerationPolicy(
+        200, 0.7, "Keep each turn short: a brief explanation and one question, suitable for speech."),
+    (ChatMode.LEARN, "*", OutputChannel.TEXT): GenerationPolicy(
+        400, 0.7, "Ask only one question per turn."),
+}
+
+
+def get_generation_policy(mode: ChatMode, intent: str, channel: OutputChannel) -> GenerationPolicy:
+    """Most specific policy for a request, falling back through the "*" wildcards"""
+    for key in (
+        (mode, intent, channel),
+        (mode, intent, "*"),
+        (mode, "*", channel),
+        (mode, "*", "*"),
+    ):
+        policy = GENERATION_POLICIES.get(key)
+        if policy:
+            return policy
+    return DEFAULT_GENERATION_POLICY
+
+
 # Teacher mode prompts - LLM acts as an interactive teacher
 TEACHER_PROMPTS = {
     SupportedLanguage.HAUSA: """Kai malami ne mai hikima kuma mai tausayi na dijital na Najeriya. Aikinku shi ne ku koyar ta hanyar yin tambayoyi. 
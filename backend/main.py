@@ -2,14 +2,35 @@
 SautiNa - Multilingual Voice-First AI Assistant
 FastAPI backend for Nigerian language voice assistant.
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
+import asyncio
+import logging
 import os
 
-from config import settings
+from config import settings, SupportedLanguage, WELCOME_MESSAGES
 from api.routes import router
+from api.middleware import ServerTimingMiddleware, MetricsMiddleware, TracingMiddleware, ProfilingMiddleware
+from api.metrics import router as metrics_router
+from services.audio_bank_service import audio_bank_service
+from services.tts_service import tts_service
+from services.search_service import search_service
+from services.job_service import job_service
+from utils.admission import OverloadedError
+from utils.loop_monitor import loop_monitor
+from utils.profiler import request_profiler
+from utils.tracing import RequestIdFilter
+
+# Tag every log line with the id of the request that produced it
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s",
+)
+for handler in logging.getLogger().handlers:
+    handler.addFilter(RequestIdFilter())
 
 
 @asynccontextmanager
@@ -19,8 +40,24 @@ async def lifespan(app: FastAPI):
     os.makedirs(settings.temp_dir, exist_ok=True)
     print(f"🎤 SautiNa starting...")
     print(f"📡 N-ATLaS endpoint: {settings.natlas_api_url}")
+    # Measure event-loop lag and catch blocking calls
+    if settings.loop_monitor_enabled:
+        loop_monitor.start()
+    # Let requests opt into a CPU profile (header token or sampling)
+    if settings.profiling_enabled:
+        request_profiler.install()
+    # Fill any gaps in the pre-rendered phrase bank in the background
+    if settings.audio_bank_enabled and settings.audio_bank_prerender_on_startup:
+        asyncio.create_task(tts_service.prerender_bank())
+    # Keep hot search queries cached
+    prewarm_task = asyncio.create_task(search_service.run_prewarmer())
+    # Background voice jobs
+    job_service.start()
     yield
     # Cleanup on shutdown
+    prewarm_task.cancel()
+    job_service.stop()
+    loop_monitor.stop()
     print("👋 SautiNa shutting down...")
 
 
@@ -39,21 +76,43 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Profile", "Retry-After"],
 )
 
-# Mount static files for audio responses
+# Opt-in CPU profiles of single requests (innermost, so it sees the request id)
+app.add_middleware(ProfilingMiddleware)
+# Per-stage timings in a Server-Timing header; request counts for /metrics
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(MetricsMiddleware)
+# Outermost, so the request id covers everything above
+app.add_middleware(TracingMiddleware)
+
+
+@app.exception_handler(OverloadedError)
+async def overloaded_handler(request: Request, exc: OverloadedError):
+    """Shed load with a retryable status instead of queueing without bound"""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": str(exc), "stage": exc.stage, "reason": exc.reason},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+# Mount static files for audio responses (bank first so it wins the prefix match)
 os.makedirs(settings.temp_dir, exist_ok=True)
+app.mount("/audio/bank", StaticFiles(directory=audio_bank_service.bank_dir), name="audio_bank")
 app.mount("/audio", StaticFiles(directory=settings.temp_dir), name="audio")
 
 # Include API routes
 app.include_router(router, prefix="/api")
+app.include_router(metrics_router)
 
 
 @app.get("/")
 async def root():
     """Root endpoint with welcome message"""
     return {
-        "message": "Welcome to SautiNa! 🇳🇬",
+        "message": f"{WELCOME_MESSAGES[SupportedLanguage.ENGLISH]} 🇳🇬",
         "description": "Multilingual voice assistant for Nigerian users",
         "languages": ["Hausa", "Yoruba", "Igbo", "Nigerian Pidgin", "English"],
         "docs": "/docs"
@@ -3,7 +3,7 @@ SautiNa API Schemas
 Pydantic models for request/response validation.
 """
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Dict, List, Optional
 from config import SupportedLanguage, ChatMode
 
 
@@ -18,6 +18,11 @@ class TextRequest(BaseModel):
         default=ChatMode.CHAT,
         description="Chat mode: 'chat' for normal conversation, 'learn' for interactive teacher mode"
     )
+    budget_seconds: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="Answer within this many seconds, dropping search, length or audio if needed"
+    )
 
 
 class TextResponse(BaseModel):
@@ -25,6 +30,8 @@ class TextResponse(BaseModel):
     text: str = Field(..., description="Assistant response text")
     detected_language: SupportedLanguage = Field(..., description="Language used for response")
     audio_url: Optional[str] = Field(None, description="URL to audio response file")
+    timings: Optional[Dict[str, float]] = Field(None, description="Per-stage durations in milliseconds")
+    degraded: Optional[List[str]] = Field(None, description="Optional steps dropped to meet the deadline")
 
 
 class VoiceResponse(BaseModel):
@@ -33,6 +40,27 @@ class VoiceResponse(BaseModel):
     response_text: str = Field(..., description="Assistant's text response")
     detected_language: SupportedLanguage = Field(..., description="Detected/used language")
     audio_url: Optional[str] = Field(None, description="URL to audio response file")
+    timings: Optional[Dict[str, float]] = Field(None, description="Per-stage durations in milliseconds")
+    degraded: Optional[List[str]] = Field(None, description="Optional steps dropped to meet the deadline")
+
+
+class VoiceJobAccepted(BaseModel):
+    """A queued voice job"""
+    job_id: str = Field(..., description="Job id for polling and events")
+    status: str = Field(..., description="queued, running, completed or failed")
+    status_url: str = Field(..., description="Poll here for status and result")
+    events_url: str = Field(..., description="Server-sent events stream of pipeline steps")
+
+
+class VoiceJobStatus(BaseModel):
+    """State of a voice job, with its step events so far"""
+    job_id: str
+    status: str = Field(..., description="queued, running, completed or failed")
+    created_at: float
+    finished_at: Optional[float] = None
+    events: List[dict] = Field(default_factory=list, description="Steps so far: queued, running, transcribed, answered, audio_ready, completed/failed")
+    result: Optional[VoiceResponse] = Field(None, description="Set once the job completes")
+    error: Optional[str] = None
 
 
 class HealthResponse(BaseModel):
@@ -0,0 +1,137 @@
+"""
+Audio Bank Service
+Versioned on-disk bank of pre-rendered speech for fixed phrases
+(fallback messages, welcome text, fast-path greeting replies) so they never hit YarnGPT.
+"""
+import hashlib
+import json
+import os
+import logging
+import unicodedata
+from typing import Dict, List, Optional
+
+from config import settings, SupportedLanguage, FALLBACK_MESSAGES, WELCOME_MESSAGES
+from services.fast_path_service import fast_path_service
+
+logger = logging.getLogger(__name__)
+
+
+def phrase_key(text: str, voice: str) -> str:
+    """
+    Stable key for a (voice, phrase) pair.
+    Whitespace and Unicode composition differences map to the same key.
+    """
+    normalized = " ".join(unicodedata.normalize("NFC", text).split())
+    return hashlib.sha1(f"{voice}\n{normalized}".encode("utf-8")).hexdigest()[:20]
+
+
+class AudioBankService:
+    """Lookup and bookkeeping for pre-rendered phrase audio"""
+
+    def __init__(self):
+        self.enabled = settings.audio_bank_enabled
+        self.version = settings.audio_bank_version
+        self.bank_dir = os.path.join(settings.audio_bank_dir, self.version)
+        self.manifest_path = os.path.join(self.bank_dir, "manifest.json")
+        self.entries: Dict[str, dict] = {}
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.bank_dir, exist_ok=True)
+        self._load_manifest()
+
+    def _load_manifest(self):
+        """Load the manifest for the current bank version, if one was built"""
+        if not os.path.exists(self.manifest_path):
+            logger.info(f"No audio bank found for version {self.version}")
+            return
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            self.entries = manifest.get("entries", {})
+            logger.info(f"🔊 Audio bank {self.version} loaded: {len(self.entries)} phrases")
+        except Exception as e:
+            logger.error(f"Failed to load audio bank manifest: {e}")
+            self.entries = {}
+
+    def save_manifest(self):
+        """Atomically write the manifest for the current bank version"""
+        manifest = {"version": self.version, "entries": self.entries}
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def phrases(self) -> Dict[SupportedLanguage, List[str]]:
+        """
+        Collect every fixed phrase that should be pre-rendered.
+
+        Returns:
+            Mapping of language to the phrases spoken in that language's voice
+        """
+        greeting_replies = fast_path_service.all_replies()
+        catalogue: Dict[SupportedLanguage, List[str]] = {}
+        for language in SupportedLanguage:
+            texts = [FALLBACK_MESSAGES.get(language), WELCOME_MESSAGES.get(language)]
+            texts += greeting_replies.get(language, [])
+            catalogue[language] = [text for text in texts if text]
+        return catalogue
+
+    def path_for(self, text: str, voice: str) -> str:
+        """Get the on-disk path a phrase is (or will be) rendered to"""
+        return os.path.join(self.bank_dir, f"{voice.lower()}_{phrase_key(text, voice)}.mp3")
+
+    def lookup(self, text: str, voice: str, record: bool = True) -> Optional[str]:
+        """
+        Find pre-rendered audio for a phrase.
+
+        Args:
+            text: Phrase to be spoken
+            voice: YarnGPT voice name
+            record: Count the lookup in the hit/miss stats. Pre-rendering
+                passes False so building the bank does not skew the hit ratio.
+
+        Returns:
+            Path to the audio file, or None if the phrase is not banked
+        """
+        if not self.enabled:
+            return None
+
+        entry = self.entries.get(phrase_key(text, voice))
+        if entry:
+            path = os.path.join(self.bank_dir, entry["file"])
+            if os.path.exists(path):
+                if record:
+                    self.hits += 1
+                return path
+
+        if record:
+            self.misses += 1
+        return None
+
+    def register(self, text: str, voice: str, language: SupportedLanguage):
+        """Record a freshly rendered phrase (call save_manifest() afterwards)"""
+        self.entries[phrase_key(text, voice)] = {
+            "file": os.path.basename(self.path_for(text, voice)),
+            "voice": voice,
+            "language": language.value,
+            "text": text,
+        }
+
+    def contains(self, path: str) -> bool:
+        """Check whether a file path lives inside the bank directory"""
+        return os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.bank_dir)
+
+    def get_stats(self) -> dict:
+        """Get bank size and lookup hit ratio"""
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "phrases": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Singleton instance
+audio_bank_service = AudioBankService()
@@ -0,0 +1,470 @@
+"""
+Conversation Service
+Live, full-duplex voice conversations over a WebSocket. The client streams
+microphone audio; voice activity detection finds where each utterance starts
+and ends, partial transcripts of the latest few seconds are sent while the
+user is still talking, and once they stop the answer is streamed back as
+N-ATLaS writes it, each sentence synthesized and pushed as soon as it is
+ready. If the user starts talking over an answer (barge-in), its generation
+and pending speech are cancelled.
+
+Protocol (JSON text messages, except the audio):
+    client -> server
+        {"type": "start", "sample_rate": 16000, "language": "yo", "mode": "chat"}   optional
+        binary messages of 16-bit little-endian mono PCM
+        {"type": "end_of_speech"}   end the utterance now (push-to-talk); if no
+                                    speech was detected, everything since the
+                                    last turn is answered
+        {"type": "interrupt"}       cancel the answer in flight
+    server -> client
+        ready {session_id, sample_rate, language, mode}
+        speech_started
+        transcript {text, final, language?, turn?}
+        response_started {turn}
+        response_delta {turn, text}
+        audio {turn, index, text, audio_url}
+        response_done {turn, text, timings, degraded}
+        interrupted {turn}
+        error {detail, turn?, retry_after?}
+
+Clients should capture with echo cancellation on, or the answer being played
+back will be heard as the user barging in.
+"""
+import asyncio
+import io
+import json
+import logging
+import re
+import time
+import uuid
+import wave
+from collections import deque
+from typing import AsyncIterator, Deque, List, Optional, Tuple
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from config import settings, SupportedLanguage, ChatMode, OutputChannel
+from services.stt_service import stt_service
+from services.llm_service import llm_service
+from services.fast_path_service import fast_path_service
+from services.pipeline_service import pipeline_service
+from utils import timing, tracing
+from utils.admission import OverloadedError, Priority, set_priority, stt_limiter
+from utils.timing import stage
+from utils.vad import EnergyVAD, SPEECH_START, SPEECH_END
+
+logger = logging.getLogger(__name__)
+
+# Where a streamed answer can be cut for speech: after sentence punctuation, or at a line break
+_SPEAKABLE_BOUNDARY = re.compile(r"(?<=[.!?…])\s+|\n+")
+
+
+def split_speakable(text: str, min_chars: int) -> Tuple[List[str], str]:
+    """
+    Cut the complete sentences off the front of a partly streamed answer.
+    Sentences shorter than min_chars are joined to the next one, so speech is
+    not synthesized a word at a time.
+
+    Returns:
+        Tuple of (sentences ready to speak, text still being written)
+    """
+    boundaries = list(_SPEAKABLE_BOUNDARY.finditer(text))
+    if not boundaries:
+        return [], text
+    complete, rest = text[:boundaries[-1].start()], text[boundaries[-1].end():]
+
+    sentences = []
+    current = ""
+    for piece in _SPEAKABLE_BOUNDARY.split(complete):
+        current = f"{current} {piece.strip()}".strip()
+        if len(current) >= min_chars:
+            sentences.append(current)
+            current = ""
+    if current:
+        rest = f"{current} {rest}"
+    return sentences, rest
+
+
+class SentenceSpeaker:
+    """Synthesizes a streamed answer sentence by sentence and pushes the audio in order"""
+
+    def __init__(self, session: "ConversationSession", turn: int, language: SupportedLanguage):
+        self.session = session
+        self.turn = turn
+        self.language = language
+        self._buffer = ""
+        self._tasks: List[asyncio.Task] = []
+        # (sentence, synthesis task) in answer order; None once the answer is complete
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._delivery = asyncio.create_task(self._deliver())
+
+    def feed(self, delta: str):
+        """Add streamed text; every sentence it completes starts synthesizing right away"""
+        self._buffer += delta
+        sentences, self._buffer = split_speakable(self._buffer, settings.conversation_tts_min_chars)
+        for sentence in sentences:
+            self._speak(sentence)
+
+    def _speak(self, sentence: str):
+        task = asyncio.create_task(pipeline_service.speak_sentence(sentence, self.language))
+        self._tasks.append(task)
+        self._queue.put_nowait((sentence, task))
+
+    async def finish(self):
+        """Speak whatever is left and wait until every segment has been pushed"""
+        if self._buffer.strip():
+            self._speak(self._buffer.strip())
+            self._buffer = ""
+        self._queue.put_nowait(None)
+        await self._delivery
+
+    async def _deliver(self):
+        index = 0
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            sentence, task = item
+            # Segments synthesize concurrently but are pushed in answer order
+            audio_url = await task
+            if audio_url:
+                await self.session.send("audio", turn=self.turn, index=index, text=sentence, audio_url=audio_url)
+                index += 1
+
+    async def cancel(self):
+        """Stop synthesizing and pushing (barge-in or disconnect)"""
+        pending = [task for task in (*self._tasks, self._delivery) if not task.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+class ConversationSession:
+    """One live conversation on one WebSocket"""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.id = uuid.uuid4().hex[:16]
+        self.sample_rate = settings.conversation_sample_rate
+        self.language: Optional[SupportedLanguage] = None  # None: use the language Whisper detects
+        self.mode = ChatMode.CHAT
+        self.history: List[dict] = []
+        self.turns = 0
+        self._closed = False
+        self._send_lock = asyncio.Lock()
+        self._reset_audio()
+        self._partial_task: Optional[asyncio.Task] = None
+        self._turn_task: Optional[asyncio.Task] = None
+        # Transcriptions of the earlier parts of an utterance that ran past the length cap
+        self._carried: List[asyncio.Task] = []
+
+    def _reset_audio(self):
+        """Start over on the audio stream (new session, or a new sample rate)"""
+        self._vad = EnergyVAD(
+            sample_rate=self.sample_rate,
+            frame_ms=settings.conversation_vad_frame_ms,
+            threshold_db=settings.conversation_vad_threshold_db,
+            min_level_dbfs=settings.conversation_vad_min_level_dbfs,
+            start_ms=settings.conversation_vad_start_ms,
+            silence_ms=settings.conversation_vad_silence_ms,
+        )
+        self._pending = bytearray()  # Received audio not yet cut into frames
+        frame_ms = settings.conversation_vad_frame_ms
+        self._preroll_frames = max(1, settings.conversation_preroll_ms // frame_ms)
+        # Frames heard since the last utterance that the VAD did not count as
+        # speech: their tail is the onset of the next one, and all of them are
+        # answered if push-to-talk ends over audio too quiet to trigger the VAD
+        self._quiet: Deque[bytes] = deque(
+            maxlen=max(1, int(settings.conversation_max_utterance_seconds * 1000) // frame_ms)
+        )
+        self._utterance = bytearray()
+        self._utterance_id = 0  # Bumped per utterance, so late partial transcripts are dropped
+        self._utterance_started = 0.0
+        self._last_partial = 0.0
+
+    async def run(self):
+        """Serve the conversation until the client disconnects"""
+        await self.websocket.accept()
+        # Live audio is voice work: text requests are admitted first when a stage is saturated
+        set_priority(Priority.VOICE)
+        logger.info(f"📞 Conversation {self.id} opened")
+        try:
+            await self._send_ready()
+            while True:
+                message = await self.websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                if message.get("bytes") is not None:
+                    await self._on_audio(message["bytes"])
+                elif message.get("text") is not None:
+                    await self._on_control(message["text"])
+        except WebSocketDisconnect:
+            pass
+        finally:
+            self._closed = True
+            for task in (self._partial_task, self._turn_task, *self._carried):
+                if task and not task.done():
+                    task.cancel()
+            logger.info(f"📞 Conversation {self.id} closed after {self.turns} turns")
+
+    async def send(self, event: str, **data):
+        """Send one event to the client (dropped once the client is gone)"""
+        if self._closed:
+            return
+        async with self._send_lock:
+            try:
+                await self.websocket.send_json({"type": event, **data})
+            except Exception as e:
+                self._closed = True
+                logger.info(f"Conversation {self.id} lost its client: {e}")
+
+    async def _send_ready(self):
+        await self.send(
+            "ready",
+            session_id=self.id,
+            sample_rate=self.sample_rate,
+            language=self.language.value if self.language else None,
+            mode=self.mode.value,
+        )
+
+    async def _on_control(self, raw: str):
+        try:
+            message = json.loads(raw)
+            kind = message.get("type")
+        except (ValueError, AttributeError):
+            await self.send("error", detail="Control messages must be JSON objects with a type")
+            return
+
+        if kind == "start":
+            try:
+                self._configure(message)
+            except ValueError as e:
+                await self.send("error", detail=str(e))
+                return
+            await self._send_ready()
+        elif kind == "end_of_speech":
+            await self._end_utterance(explicit=True)
+        elif kind == "interrupt":
+            await self._interrupt()
+        else:
+            await self.send("error", detail=f"Unknown message type: {kind}")
+
+    def _configure(self, message: dict):
+        """Apply a start message; raises ValueError on bad values"""
+        sample_rate = int(message.get("sample_rate") or self.sample_rate)
+        if not 8000 <= sample_rate <= 48000:
+            raise ValueError(f"Unsupported sample rate: {sample_rate}")
+        language = SupportedLanguage(message["language"]) if message.get("language") else None
+        mode = ChatMode(message.get("mode") or ChatMode.CHAT.value)
+
+        if sample_rate != self.sample_rate:
+            self.sample_rate = sample_rate
+            self._reset_audio()
+        self.language = language
+        self.mode = mode
+
+    async def _on_audio(self, data: bytes):
+        self._pending.extend(data)
+        frame_bytes = self._vad.frame_bytes
+        max_bytes = int(settings.conversation_max_utterance_seconds * self.sample_rate) * 2
+
+        while len(self._pending) >= frame_bytes:
+            frame = bytes(self._pending[:frame_bytes])
+            del self._pending[:frame_bytes]
+            event = self._vad.process(frame)
+
+            if event == SPEECH_START:
+                await self._start_utterance()
+            if self._vad.speaking or event == SPEECH_END:
+                self._utterance.extend(frame)
+            else:
+                self._quiet.append(frame)
+
+            if event == SPEECH_END:
+                await self._end_utterance()
+            elif self._vad.speaking:
+                if len(self._utterance) >= max_bytes:
+                    self._carry_over()
+                self._maybe_partial()
+
+    async def _start_utterance(self):
+        # The onset was already heard before the detector was sure; keep it
+        preroll = list(self._quiet)[-self._preroll_frames:]
+        self._utterance = bytearray(b"".join(preroll))
+        self._quiet.clear()
+        self._utterance_id += 1
+        self._utterance_started = self._last_partial = time.monotonic()
+        # Barge-in: the user talking over an answer cancels it
+        await self._interrupt()
+        await self.send("speech_started")
+
+    def _carry_over(self):
+        """
+        Start transcribing a long utterance's audio so far while the user keeps
+        talking. The utterance stays open; its text is joined to the rest once
+        they stop.
+        """
+        self._carried.append(asyncio.create_task(self._transcribe(bytes(self._utterance))))
+        self._utterance = bytearray()
+
+    async def _end_utterance(self, explicit: bool = False):
+        """
+        Answer the utterance heard so far (VAD end of speech, or push-to-talk
+        when explicit)
+        """
+        self._vad.reset()
+        self._utterance_id += 1
+        if self._partial_task and not self._partial_task.done():
+            # A partial still waiting for its STT slot leaves the queue; one already
+            # decoding keeps its slot until Whisper is done, and its now-stale text
+            # is dropped (the utterance id has moved on)
+            self._partial_task.cancel()
+        carried, self._carried = self._carried, []
+        if explicit and not self._utterance and not carried:
+            # The client says the user spoke, but too quietly (or too far from
+            # the mic) for the VAD: answer everything heard since the last turn
+            pending = len(self._pending) - len(self._pending) % 2
+            self._utterance = bytearray(b"".join(self._quiet) + self._pending[:pending])
+            self._pending = bytearray()
+            if self._utterance:
+                # No speech start was detected, so nothing barged in yet
+                await self._interrupt()
+        self._quiet.clear()
+        if not self._utterance and not carried:
+            return
+        audio = bytes(self._utterance)
+        self._utterance = bytearray()
+        self.turns += 1
+        self._turn_task = asyncio.create_task(self._run_turn(self.turns, carried, audio))
+
+    async def _interrupt(self):
+        """Cancel the answer in flight, if any, and wait until it has stopped"""
+        task = self._turn_task
+        if task is None or task.done():
+            return
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        logger.info(f"✋ Conversation {self.id}: turn {self.turns} interrupted")
+        await self.send("interrupted", turn=self.turns)
+
+    def _maybe_partial(self):
+        """Transcribe the last few seconds of the utterance, if it is time and Whisper is idle"""
+        interval = settings.conversation_partial_interval_seconds
+        now = time.monotonic()
+        if not interval or now - self._last_partial < interval:
+            return
+        if now - self._utterance_started > settings.conversation_partial_max_seconds:
+            return
+        if self._partial_task and not self._partial_task.done():
+            return
+        # Partials are best-effort: never queue them behind someone's real transcription
+        if stt_limiter.in_use >= stt_limiter.limit:
+            return
+        self._last_partial = now
+        # Only a bounded tail, so a partial never keeps Whisper busy for long
+        window_bytes = int(settings.conversation_partial_window_seconds * self.sample_rate) * 2
+        self._partial_task = asyncio.create_task(
+            self._partial(self._utterance_id, bytes(self._utterance[-window_bytes:]))
+        )
+
+    async def _partial(self, utterance_id: int, audio: bytes):
+        set_priority(Priority.BACKGROUND)
+        try:
+            text, _ = await stt_service.transcribe(self._wav(audio), "partial.wav")
+        except OverloadedError:
+            return
+        except Exception as e:
+            logger.warning(f"Partial transcription failed: {e}")
+            return
+        if text and utterance_id == self._utterance_id:
+            await self.send("transcript", text=text, final=False)
+
+    async def _transcribe(self, audio: bytes) -> Tuple[str, SupportedLanguage]:
+        return await stt_service.transcribe(self._wav(audio), "utterance.wav")
+
+    async def _run_turn(self, turn: int, carried: List[asyncio.Task], audio: bytes):
+        """
+        Transcribe one utterance (joining the text of any parts carried over
+        from the length cap), then stream the answer as text and audio
+        """
+        tracing_tokens = tracing.start_request(f"{self.id}-{turn}")
+        timing_token = timing.start_request()
+        pipeline_service.start_deadline(OutputChannel.VOICE, None)
+        text = ""
+        reply: List[str] = []
+        speaker: Optional[SentenceSpeaker] = None
+        try:
+            with tracing.span("conversation turn", turn=turn, audio_ms=round(500 * len(audio) / self.sample_rate)):
+                with stage("stt", audio_bytes=len(audio), carried=len(carried)) as span:
+                    pieces = [await task for task in carried]
+                    if audio:
+                        pieces.append(await self._transcribe(audio))
+                    text = " ".join(piece for piece, _ in pieces if piece)
+                    detected_language = pieces[-1][1]
+                    span.set_attribute("language", detected_language.value)
+                language = self.language or detected_language
+                await self.send("transcript", turn=turn, text=text, final=True, language=language.value)
+                if not text:
+                    return
+
+                await self.send("response_started", turn=turn)
+                speaker = SentenceSpeaker(self, turn, language)
+                async for delta in self._generate(text, language):
+                    reply.append(delta)
+                    await self.send("response_delta", turn=turn, text=delta)
+                    speaker.feed(delta)
+                await speaker.finish()
+                tracing.annotate(language=language.value, mode=self.mode.value, channel="conversation")
+
+            await self.send(
+                "response_done",
+                turn=turn,
+                text="".join(reply),
+                timings=pipeline_service.response_timings(),
+                degraded=pipeline_service.response_degradations(),
+            )
+        except OverloadedError as e:
+            await self.send("error", turn=turn, detail=str(e), retry_after=e.retry_after)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Conversation {self.id} turn {turn} failed: {e}")
+            await self.send("error", turn=turn, detail="Failed to answer")
+        finally:
+            for task in carried:
+                task.cancel()
+            if speaker:
+                await speaker.cancel()
+            if reply:
+                # An interrupted answer is remembered as far as it got
+                self._remember(text, "".join(reply))
+            timing.end_request(timing_token)
+            tracing.end_request(tracing_tokens)
+
+    async def _generate(self, text: str, language: SupportedLanguage) -> AsyncIterator[str]:
+        """The answer as it is written: the greeting fast path, else streamed from N-ATLaS"""
+        fast_reply = fast_path_service.respond(text, language, self.mode)
+        if fast_reply:
+            yield fast_reply
+            return
+        async for delta in llm_service.stream_response(
+            text, language, self.history, self.mode, OutputChannel.VOICE
+        ):
+            yield delta
+
+    def _remember(self, user_text: str, assistant_text: str):
+        self.history.extend([
+            {"role": "user", "content": user_text},
+            {"role": "assistant", "content": assistant_text},
+        ])
+        del self.history[:-settings.conversation_max_history_messages]
+
+    def _wav(self, pcm: bytes) -> bytes:
+        """Wrap raw PCM as a WAV file for Whisper"""
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(pcm)
+        return buffer.getvalue()
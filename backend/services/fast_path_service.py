@@ -0,0 +1,111 @@
+"""
+Greeting Fast Path Service
+Answers greetings, thanks and goodbyes from a curated table without calling
+N-ATLaS. Replies are pre-rendered in the audio bank, so YarnGPT is skipped too.
+"""
+import json
+import logging
+import random
+from typing import Dict, List, Optional, Tuple
+
+from config import settings, SupportedLanguage, ChatMode
+from utils.text import normalize_text
+
+logger = logging.getLogger(__name__)
+
+
+class FastPathService:
+    """Data-driven responder for one-line pleasantries"""
+
+    def __init__(self, path: Optional[str] = None):
+        with open(path or settings.greetings_path, "r", encoding="utf-8") as f:
+            table = json.load(f)
+
+        self.max_words = table.get("max_words", 8)
+        self.fillers = {normalize_text(word) for word in table.get("fillers", [])}
+        self.priority = table.get("priority", list(table["categories"]))
+
+        # Normalized pattern words -> category; patterns from every language are pooled
+        self.patterns: Dict[Tuple[str, ...], str] = {}
+        self.replies: Dict[str, Dict[SupportedLanguage, List[str]]] = {}
+        for category, entry in table["categories"].items():
+            for patterns in entry["patterns"].values():
+                for pattern in patterns:
+                    self.patterns[tuple(normalize_text(pattern).split())] = category
+            self.replies[category] = {
+                SupportedLanguage(code): replies for code, replies in entry["replies"].items()
+            }
+        self.longest_pattern = max(len(words) for words in self.patterns)
+
+    def match(self, text: str) -> Optional[str]:
+        """
+        Check whether a message is nothing but pleasantries.
+
+        Args:
+            text: User message
+
+        Returns:
+            Category name (e.g. "greeting"), or None if the message needs the LLM
+        """
+        words = [word for word in normalize_text(text).split() if word not in self.fillers]
+        if not words or len(words) > self.max_words:
+            return None
+
+        # Every word must belong to some pattern (longest match first)
+        found = set()
+        i = 0
+        while i < len(words):
+            for length in range(min(self.longest_pattern, len(words) - i), 0, -1):
+                category = self.patterns.get(tuple(words[i:i + length]))
+                if category:
+                    found.add(category)
+                    i += length
+                    break
+            else:
+                return None
+
+        # "thanks, bye" is a goodbye
+        for category in self.priority:
+            if category in found:
+                return category
+        return found.pop()
+
+    def respond(
+        self,
+        text: str,
+        language: SupportedLanguage,
+        mode: ChatMode = ChatMode.CHAT
+    ) -> Optional[str]:
+        """
+        Get a canned reply for a pleasantry.
+
+        Args:
+            text: User message
+            language: Language to reply in
+            mode: Chat mode (learn mode always goes to the teacher prompt)
+
+        Returns:
+            Reply text, or None if the message should go to the LLM
+        """
+        if not settings.fast_path_enabled or mode != ChatMode.CHAT:
+            return None
+
+        category = self.match(text)
+        if category is None:
+            return None
+
+        replies = self.replies[category].get(language) or self.replies[category][SupportedLanguage.ENGLISH]
+        logger.info(f"⚡ Fast path reply ({category}, {language.value})")
+        return random.choice(replies)
+
+    def all_replies(self) -> Dict[SupportedLanguage, List[str]]:
+        """Every reply per language, for pre-rendering"""
+        collected: Dict[SupportedLanguage, List[str]] = {}
+        for by_language in self.replies.values():
+            for language, replies in by_language.items():
+                collected.setdefault(language, []).extend(replies)
+        return collected
+
+
+# Singleton instance
+fast_path_service = FastPathService()
@@ -0,0 +1,164 @@
+"""
+Local Intent Classifier
+Softmax regression over hashed character n-grams, trained from logged
+(message, intent) pairs so most messages skip the N-ATLaS classification call.
+"""
+import json
+import logging
+import os
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from config import settings
+from utils.vectorize import DEFAULT_DIM, hashed_ngram_features
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    logger.warning("NumPy not installed. Local intent classifier disabled.")
+
+
+INTENT_LABELS = ["search", "translate", "learn", "chat"]
+
+
+def load_labeled_log(path: str) -> List[Tuple[str, str]]:
+    """
+    Read logged (message, intent) pairs, keeping the latest label per message.
+
+    Args:
+        path: JSONL file written by IntentService
+
+    Returns:
+        List of (message, intent label) pairs
+    """
+    labeled: Dict[str, str] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("intent") in INTENT_LABELS and record.get("message"):
+                labeled[record["message"]] = record["intent"]
+    return list(labeled.items())
+
+
+class LocalIntentClassifier:
+    """Multinomial logistic regression on hashed character n-grams"""
+
+    def __init__(self, dim: int = DEFAULT_DIM, labels: Sequence[str] = INTENT_LABELS):
+        self.dim = dim
+        self.labels = list(labels)
+        self.weights = None
+        self.bias = None
+
+    def _sparse(self, text: str) -> Tuple["np.ndarray", "np.ndarray"]:
+        features = hashed_ngram_features(text, self.dim)
+        indices = np.fromiter(features.keys(), dtype=np.int64, count=len(features))
+        values = np.fromiter(features.values(), dtype=np.float32, count=len(features))
+        return indices, values
+
+    def fit(
+        self,
+        texts: Sequence[str],
+        labels: Sequence[str],
+        epochs: int = 30,
+        learning_rate: float = 5.0,
+        l2: float = 1e-4,
+        batch_size: int = 256,
+        seed: int = 0
+    ):
+        """
+        Train with mini-batch gradient descent on the softmax cross-entropy.
+
+        Args:
+            texts: Training messages
+            labels: Intent label per message
+            epochs: Passes over the data
+            learning_rate: Gradient step size
+            l2: Weight decay
+            batch_size: Examples per dense mini-batch
+            seed: Shuffle seed for reproducible models
+        """
+        rows = [self._sparse(text) for text in texts]
+        targets = np.array([self.labels.index(label) for label in labels])
+        n_classes = len(self.labels)
+
+        self.weights = np.zeros((self.dim, n_classes), dtype=np.float32)
+        self.bias = np.zeros(n_classes, dtype=np.float32)
+
+        rng = random.Random(seed)
+        order = list(range(len(rows)))
+        for _ in range(epochs):
+            rng.shuffle(order)
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                features = np.zeros((len(batch), self.dim), dtype=np.float32)
+                for row, i in enumerate(batch):
+                    indices, values = rows[i]
+                    features[row, indices] = values
+
+                probs = self._softmax(features @ self.weights + self.bias)
+                probs[np.arange(len(batch)), targets[batch]] -= 1.0
+                probs /= len(batch)
+
+                self.weights -= learning_rate * (features.T @ probs + l2 * self.weights)
+                self.bias -= learning_rate * probs.sum(axis=0)
+
+    @staticmethod
+    def _softmax(logits: "np.ndarray") -> "np.ndarray":
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=-1, keepdims=True)
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """
+        Predict the intent label of a message.
+
+        Returns:
+            Tuple of (intent label, probability)
+        """
+        indices, values = self._sparse(text)
+        probs = self._softmax(values @ self.weights[indices] + self.bias)
+        best = int(probs.argmax())
+        return self.labels[best], float(probs[best])
+
+    def save(self, path: str):
+        """Save weights and labels to a .npz file"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(
+            path,
+            weights=self.weights,
+            bias=self.bias,
+            labels=np.array(self.labels),
+            dim=np.array(self.dim),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "LocalIntentClassifier":
+        """Load a classifier saved with save()"""
+        data = np.load(path)
+        model = cls(dim=int(data["dim"]), labels=[str(label) for label in data["labels"]])
+        model.weights = data["weights"]
+        model.bias = data["bias"]
+        return model
+
+
+def load_default_classifier() -> Optional[LocalIntentClassifier]:
+    """Load the configured model, or None if it is disabled or not trained yet"""
+    if not (NUMPY_AVAILABLE and settings.intent_local_enabled):
+        return None
+    if not os.path.exists(settings.intent_model_path):
+        logger.info("No local intent model found; using N-ATLaS for classification")
+        return None
+    try:
+        model = LocalIntentClassifier.load(settings.intent_model_path)
+        logger.info(f"✅ Local intent classifier loaded from {settings.intent_model_path}")
+        return model
+    except Exception as e:
+        logger.error(f"Failed to load local intent classifier: {e}")
+        return None
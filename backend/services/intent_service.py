@@ -3,11 +3,24 @@ Intent Classification Service
 Uses N-ATLaS to intelligently classify user intent for smart routing.
 """
 from enum import Enum
-from openai import OpenAI
+import asyncio
+from openai import AsyncOpenAI
+import json
 import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 from config import settings
+from services.intent_classifier import load_default_classifier
+from services.keyword_matcher import KeywordMatcher
+from utils.admission import OverloadedError, llm_limiter
+from utils.cache import TTLCache
+from utils.deadline import time_left
+from utils.metrics import UPSTREAM_ERRORS, record_llm_usage
+from utils.tracing import span
+from utils.text import normalize_text
 
 logger = logging.getLogger(__name__)
 
@@ -51,11 +64,21 @@ class IntentService:
     """Service for classifying user intent using N-ATLaS"""
     
     def __init__(self):
-        self.client = OpenAI(
+        self.client = AsyncOpenAI(
             base_url=settings.natlas_api_url,
             api_key=settings.natlas_api_key,
         )
         self.model = settings.natlas_model_name
+        self.local_classifier = load_default_classifier()
+        self.keyword_matcher = KeywordMatcher.from_file(settings.intent_keywords_path)
+        # N-ATLaS classifications keyed on the normalized message
+        self.cache = TTLCache(
+            max_entries=settings.intent_cache_max_entries,
+            default_ttl=settings.intent_cache_ttl_seconds,
+        )
+        # Label log appends run here, in order, off the event loop
+        self._log_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="intent-log")
+        self._log_full = False
     
     async def classify(self, user_message: str) -> Intent:
         """
@@ -67,19 +90,35 @@ class IntentService:
         Returns:
             Intent enum value
         """
+        cache_key = normalize_text(user_message)
+        if settings.intent_cache_enabled:
+            cached, state = self.cache.get(cache_key)
+            if state == TTLCache.FRESH:
+                logger.info(f"Intent cache hit: {cached.value}")
+                return cached
+        
         try:
             logger.info(f"Classifying intent for: {user_message[:50]}...")
             
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": INTENT_CLASSIFICATION_PROMPT},
-                    {"role": "user", "content": user_message}
-                ],
-                max_tokens=10,  # Only need one word
-                temperature=0.1,  # Low temperature for consistent classification
-            )
+            async with llm_limiter.slot():
+                with span("intent.natlas") as current:
+                    response = await asyncio.wait_for(
+                        self.client.chat.completions.create(
+                            model=self.model,
+                            messages=[
+                                {"role": "system", "content": INTENT_CLASSIFICATION_PROMPT},
+                                {"role": "user", "content": user_message}
+                            ],
+                            max_tokens=10,  # Only need one word
+                            temperature=0.1,  # Low temperature for consistent classification
+                        ),
+                        timeout=time_left(),
+                    )
+                    if response.usage:
+                        current.set_attribute("prompt_tokens", response.usage.prompt_tokens)
+                        current.set_attribute("completion_tokens", response.usage.completion_tokens)
             
+            record_llm_usage(response.usage, "intent")
             intent_text = response.choices[0].message.content.strip().lower()
             logger.info(f"Classified intent: {intent_text}")
             
@@ -92,58 +131,84 @@ class IntentService:
             }
             
             intent = intent_map.get(intent_text, Intent.CHAT)
+            
+            # Keep clean labels as training data and for repeat messages
+            if intent_text in intent_map:
+                self._log_label(user_message, intent)
+                if settings.intent_cache_enabled:
+                    self.cache.set(cache_key, intent)
+            
             return intent
             
+        except (OverloadedError, asyncio.TimeoutError):
+            # Not worth an LLM slot while N-ATLaS is saturated, or the request is out of time
+            return Intent.CHAT
         except Exception as e:
             logger.error(f"Intent classification error: {str(e)}")
+            UPSTREAM_ERRORS.inc("natlas")
             # Default to CHAT on error
             return Intent.CHAT
     
-    def classify_quick(self, user_message: str) -> Intent:
+    def get_stats(self) -> dict:
+        """Get classification cache counters"""
+        return self.cache.get_stats()
+    
+    def _log_label(self, user_message: str, intent: Intent):
+        """Queue an N-ATLaS-labeled message for the training log"""
+        if not settings.intent_log_enabled or self._log_full:
+            return
+        record = {"message": user_message, "intent": intent.value, "ts": time.time()}
+        self._log_executor.submit(self._append_label, record)
+    
+    def _append_label(self, record: dict):
+        """Append one record to the training log, up to its size cap (blocking)"""
+        path = settings.intent_log_path
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if os.path.exists(path) and os.path.getsize(path) >= settings.intent_log_max_mb * 1024 * 1024:
+                self._log_full = True
+                logger.warning(f"Intent label log reached {settings.intent_log_max_mb} MB; no longer logging")
+                return
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except Exception as e:
+            logger.error(f"Failed to log intent label: {e}")
+    
+    def classify_local(self, user_message: str) -> Optional[Intent]:
         """
-        Quick heuristic-based classification as fallback.
-        Uses pattern matching for obvious cases to save API calls.
+        Classify with the local n-gram model.
         
         Args:
             user_message: The user's input message
             
         Returns:
-            Intent enum value or None if unsure
+            Intent enum value, or None if no model is loaded or it is unsure
         """
-        message_lower = user_message.lower()
+        if self.local_classifier is None:
+            return None
         
-        # Clear translation indicators
-        translate_patterns = [
-            "translate", "translation", "how do you say",
-            "in hausa", "in yoruba", "in igbo", "in pidgin", "in english",
-            "to hausa", "to yoruba", "to igbo", "to pidgin", "to english",
-            "tumọ", "fassara", "kowaa", # Local translation keywords
-        ]
-        if any(pattern in message_lower for pattern in translate_patterns):
-            return Intent.TRANSLATE
+        label, confidence = self.local_classifier.predict(user_message)
+        if confidence < settings.intent_local_confidence_threshold:
+            return None
         
-        # Clear search indicators (real-time data)
-        search_patterns = [
-            "weather", "price", "market price", "news", "today",
-            "current", "now", "latest", "how much is", "cost of",
-            "oju ojo", "iroyin", "owo", # Yoruba
-            "yanayi", "labarai", "nawa ne", # Hausa
-            "ihu igwe", "ozi", "ego ole", # Igbo
-        ]
-        if any(pattern in message_lower for pattern in search_patterns):
-            return Intent.SEARCH
+        logger.info(f"Local intent: {label} ({confidence:.2f})")
+        return Intent(label)
+    
+    def classify_quick(self, user_message: str) -> Intent:
+        """
+        Quick keyword-based classification.
+        Uses weighted, word-boundary keyword matching for obvious cases to save API calls.
         
-        # Clear learning indicators
-        learn_patterns = [
-            "teach me", "explain", "learn about", "tell me about",
-            "what is", "how do i", "how to", "guide me", "help me understand",
-            "kọ mi", "koya min", "kuziere m", # Local learning keywords
-        ]
-        if any(pattern in message_lower for pattern in learn_patterns):
-            return Intent.LEARN
+        Args:
+            user_message: The user's input message
+            
+        Returns:
+            Intent enum value or None if unsure
+        """
+        label = self.keyword_matcher.match(user_message)
         
-        # If no clear pattern, return None to trigger LLM classification
-        return None
+        # If no clear pattern, return None to trigger model classification
+        return Intent(label) if label else None
 
 
 # Singleton instance
@@ -0,0 +1,208 @@
+"""
+Voice Job Service
+Runs voice messages as background jobs so the work survives a dropped
+connection. A fixed pool of workers takes jobs from a bounded queue and runs
+them through PipelineService.process_voice; each pipeline step is appended to
+the job's event log, which clients poll or follow over SSE. Finished jobs are
+kept for a TTL so a reconnecting client can collect the result.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from config import settings, SupportedLanguage
+from schemas import VoiceResponse
+from services.pipeline_service import pipeline_service
+from utils import timing, tracing
+from utils.admission import OverloadedError
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class VoiceJob:
+    """One submitted voice message and everything that has happened to it"""
+
+    def __init__(
+        self,
+        audio_data: bytes,
+        filename: str,
+        preferred_language: Optional[SupportedLanguage],
+        budget_seconds: Optional[float]
+    ):
+        self.id = uuid.uuid4().hex
+        self.status = JobStatus.QUEUED
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.events: List[Dict[str, Any]] = []
+        self.result: Optional[VoiceResponse] = None
+        self.error: Optional[str] = None
+        # Inputs, dropped once the job has run
+        self.audio_data: Optional[bytes] = audio_data
+        self.filename = filename
+        self.preferred_language = preferred_language
+        self.budget_seconds = budget_seconds
+        # One queue per live SSE subscriber
+        self._subscribers: List[asyncio.Queue] = []
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+
+    def emit(self, event: str, data: Optional[dict] = None):
+        """Append an event to the log and hand it to live subscribers"""
+        entry = {"id": len(self.events), "event": event, "data": data or {}, "ts": time.time()}
+        self.events.append(entry)
+        for queue in self._subscribers:
+            queue.put_nowait(entry)
+
+    def subscribe(self, after: int = -1) -> asyncio.Queue:
+        """
+        Queue of events with id > after: the backlog now, later events as they
+        happen. For a finished job the backlog ends with None, since nothing
+        more will come (even if the caller has already seen the last event).
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        for entry in self.events[after + 1:]:
+            queue.put_nowait(entry)
+        if self.finished:
+            queue.put_nowait(None)
+        else:
+            self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "events": self.events,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobService:
+    """Bounded queue of voice jobs drained by a fixed worker pool"""
+
+    def __init__(self):
+        self.jobs: Dict[str, VoiceJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    def start(self):
+        """Start the worker pool (call from inside the running loop)"""
+        self._queue = asyncio.Queue(maxsize=settings.voice_jobs_max_queued)
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(settings.voice_jobs_workers)
+        ]
+        logger.info(f"🧵 Voice job workers started: {settings.voice_jobs_workers}")
+
+    def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+
+    def submit(
+        self,
+        audio_data: bytes,
+        filename: str,
+        preferred_language: Optional[SupportedLanguage] = None,
+        budget_seconds: Optional[float] = None
+    ) -> VoiceJob:
+        """
+        Queue a voice message for processing.
+
+        Raises:
+            OverloadedError: If the job queue is full
+        """
+        self._purge()
+        if self._queue is None or self._queue.full():
+            raise OverloadedError("jobs", "queue_full", 429, settings.voice_jobs_retry_after_seconds)
+
+        job = VoiceJob(audio_data, filename, preferred_language, budget_seconds)
+        self.jobs[job.id] = job
+        job.emit(JobStatus.QUEUED, {"position": self._queue.qsize() + 1})
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[VoiceJob]:
+        self._purge()
+        return self.jobs.get(job_id)
+
+    def _purge(self):
+        """Forget finished jobs older than the TTL"""
+        cutoff = time.time() - settings.voice_jobs_ttl_seconds
+        expired = [job_id for job_id, job in self.jobs.items() if job.finished and job.finished_at < cutoff]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    async def _worker(self, number: int):
+        while True:
+            job = await self._queue.get()
+            try:
+                # A task per job, so each starts from a clean request context
+                await asyncio.create_task(self._run(job))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Voice job worker {number} error: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: VoiceJob):
+        tracing_tokens = tracing.start_request(job.id)
+        timing_token = timing.start_request()
+        job.status = JobStatus.RUNNING
+        job.emit(JobStatus.RUNNING)
+        try:
+            with tracing.span("voice job", queued_ms=round(1000 * (time.time() - job.created_at))):
+                job.result = await pipeline_service.process_voice(
+                    audio_data=job.audio_data,
+                    filename=job.filename,
+                    preferred_language=job.preferred_language,
+                    budget_seconds=job.budget_seconds,
+                    on_event=job.emit,
+                )
+            job.status = JobStatus.COMPLETED
+            job.emit(JobStatus.COMPLETED, job.result.model_dump(mode="json"))
+        except OverloadedError as e:
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+            job.emit(JobStatus.FAILED, {"error": job.error, "retry_after": e.retry_after})
+        except Exception as e:
+            logger.error(f"Voice job {job.id} failed: {e}")
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+            job.emit(JobStatus.FAILED, {"error": job.error})
+        finally:
+            job.finished_at = time.time()
+            job.audio_data = None
+            job._subscribers.clear()
+            timing.end_request(timing_token)
+            tracing.end_request(tracing_tokens)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Jobs held per status, plus queue depth"""
+        counts = {status: 0 for status in (JobStatus.QUEUED, JobStatus.RUNNING, JobStatus.COMPLETED, JobStatus.FAILED)}
+        for job in list(self.jobs.values()):
+            counts[job.status] += 1
+        counts["queue_depth"] = self._queue.qsize() if self._queue else 0
+        return counts
+
+
+# Singleton instance (workers started from the app lifespan)
+job_service = JobService()
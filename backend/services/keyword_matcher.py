@@ -0,0 +1,141 @@
+"""
+Keyword Intent Matcher
+Weighted multilingual keyword rules compiled into one character-trie regex
+and matched on whole words over diacritic-folded text.
+"""
+import json
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+from utils.text import fold_diacritics, normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Words, keeping inner apostrophes ("n'ime", "what's")
+_WORD = re.compile(r"\w+(?:'\w+)*")
+# So a keyword may not start or end next to a word character or a
+# word-joining apostrophe
+_WORD_START = r"(?<!\w)(?<!\w')"
+_WORD_END = r"(?!\w)(?!'\w)"
+# Anything between two words of a multi-word keyword ("market, price")
+_WORD_GAP = _WORD_END + r"\W+" + _WORD_START
+
+
+def _trie_pattern(keywords: List[str]) -> str:
+    """
+    Build a regex that walks every keyword as one character trie, so the
+    engine branches on the next character instead of trying each keyword.
+    Longer continuations are tried before a keyword ends, so "market price"
+    beats "price" and "prices" beats "price".
+    """
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        branches = [
+            (_WORD_GAP if char == " " else re.escape(char)) + emit(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # A keyword may also end here
+            pattern = f"(?:{pattern})?"
+        return pattern
+
+    return emit(trie)
+
+
+class KeywordMatcher:
+    """Scores each intent by the weights of the keywords found in a message"""
+
+    def __init__(
+        self,
+        keywords: Dict[str, Dict[str, float]],
+        min_score: float = 1.0,
+        priority: Optional[List[str]] = None
+    ):
+        """
+        Args:
+            keywords: Mapping of intent label to {keyword: weight}
+            min_score: Score an intent needs before it is returned
+            priority: Intent order used to break score ties
+        """
+        self.min_score = min_score
+        self.priority = priority or list(keywords)
+
+        # Keyword (single-spaced words) -> (intent, weight); the first intent
+        # listed wins a clash
+        self._keywords: Dict[str, Tuple[str, float]] = {}
+        for intent, patterns in keywords.items():
+            for pattern, weight in patterns.items():
+                keyword = normalize_text(pattern)
+                if keyword and keyword not in self._keywords:
+                    self._keywords[keyword] = (intent, weight)
+
+        # No groups, so findall returns plain strings rather than match objects
+        self._pattern = re.compile(_WORD_START + _trie_pattern(list(self._keywords)) + _WORD_END)
+
+        # Tie-break rank per intent (lower wins)
+        self._rank = {intent: rank for rank, intent in enumerate(self.priority)}
+
+    @classmethod
+    def from_file(cls, path: str) -> "KeywordMatcher":
+        """Load keyword rules from a JSON data file"""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            keywords=data["intents"],
+            min_score=data.get("min_score", 1.0),
+            priority=data.get("priority"),
+        )
+
+    def scores(self, message: str) -> Dict[str, float]:
+        """Sum keyword weights per intent (each keyword counted once)"""
+        text = message.casefold()
+        # Plain ASCII (most English and Pidgin input) needs no Unicode work
+        if not text.isascii():
+            text = fold_diacritics(text)
+
+        # Matches never overlap, so words inside a keyword cannot start another.
+        # A multi-word keyword may match across punctuation ("market, price").
+        found = {
+            keyword if keyword in self._keywords else " ".join(_WORD.findall(keyword))
+            for keyword in self._pattern.findall(text)
+        }
+
+        totals: Dict[str, float] = {}
+        for keyword in found:
+            intent, weight = self._keywords[keyword]
+            totals[intent] = totals.get(intent, 0.0) + weight
+        return totals
+
+    def match(self, message: str) -> Optional[str]:
+        """
+        Pick the highest-scoring intent.
+
+        Returns:
+            Intent label, or None if no intent reaches min_score
+        """
+        totals = self.scores(message)
+        if len(totals) == 1:
+            # Most messages hit a single intent; skip the tie-break
+            (best, score), = totals.items()
+        elif totals:
+            unranked = len(self.priority)
+            best, score = max(
+                totals.items(),
+                key=lambda item: (item[1], -self._rank.get(item[0], unranked)),
+            )
+        else:
+            return None
+        if score < self.min_score:
+            return None
+        return best
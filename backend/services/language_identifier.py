@@ -0,0 +1,129 @@
+"""
+Language Identification Service
+Local naive Bayes over character n-grams that tells Hausa, Yoruba, Igbo,
+Nigerian Pidgin and English apart without a model download or network call.
+"""
+import json
+import logging
+import math
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config import settings, SupportedLanguage
+from utils.vectorize import char_ngrams
+
+logger = logging.getLogger(__name__)
+
+# Hooked Hausa letters; char_ngrams folds them away, so they are counted separately
+_HOOKED_LETTERS = set("ƙɓɗƴ")
+
+
+def _mark_features(text: str) -> Iterator[str]:
+    """
+    Yield the accented letters of a text ("ọ", "ẹ́", "ị", "ƙ"), which
+    char_ngrams folds to ASCII but which say a lot about the language.
+    """
+    base = ""
+    for ch in unicodedata.normalize("NFD", text.lower()):
+        if unicodedata.combining(ch):
+            yield f"#{base}{ch}"
+        elif ch in _HOOKED_LETTERS:
+            yield f"#{ch}"
+        else:
+            base = ch
+
+
+def language_features(text: str) -> List[str]:
+    """Folded character 1-4 grams plus accented-letter features"""
+    features = list(char_ngrams(text, 1, 4))
+    if not text.isascii():
+        features.extend(_mark_features(text))
+    return features
+
+
+class LanguageIdentifier:
+    """Multinomial naive Bayes over n-gram profiles built from a seed corpus"""
+
+    def __init__(self, path: Optional[str] = None, alpha: float = 0.5):
+        """
+        Args:
+            path: JSON corpus of {language code: [sentences]}
+            alpha: Additive smoothing for n-grams a language never produced
+        """
+        with open(path or settings.language_id_corpus_path, "r", encoding="utf-8") as f:
+            corpus = json.load(f)
+
+        self.languages = [SupportedLanguage(code) for code in corpus if not code.startswith("_")]
+        profiles = {
+            language: Counter(
+                feature for sentence in corpus[language.value] for feature in language_features(sentence)
+            )
+            for language in self.languages
+        }
+        vocabulary = set().union(*profiles.values())
+
+        # Feature -> log P(feature | language), one entry per language in self.languages order
+        denominators = [
+            sum(profiles[language].values()) + alpha * (len(vocabulary) + 1)
+            for language in self.languages
+        ]
+        self._unseen = [math.log(alpha / denominator) for denominator in denominators]
+        self._log_probs: Dict[str, List[float]] = {
+            feature: [
+                math.log((profiles[language][feature] + alpha) / denominator)
+                for language, denominator in zip(self.languages, denominators)
+            ]
+            for feature in vocabulary
+        }
+        logger.info(f"🌍 Language identifier ready: {len(vocabulary)} features, {len(self.languages)} languages")
+
+    def scores(self, text: str) -> Dict[SupportedLanguage, float]:
+        """Mean log-likelihood per feature for each language (higher is better)"""
+        features = language_features(text)
+        totals = [0.0] * len(self.languages)
+        for feature in features:
+            for i, log_prob in enumerate(self._log_probs.get(feature, self._unseen)):
+                totals[i] += log_prob
+        count = len(features) or 1
+        return {language: total / count for language, total in zip(self.languages, totals)}
+
+    def identify(self, text: str) -> Tuple[Optional[SupportedLanguage], float]:
+        """
+        Guess the language of a text.
+
+        Args:
+            text: User message or transcript
+
+        Returns:
+            Tuple of (language, margin over the runner-up). Language is None
+            when the text is too short or the margin is below the configured minimum.
+        """
+        if sum(ch.isalpha() for ch in text) < settings.language_id_min_letters:
+            return None, 0.0
+
+        ranked = sorted(self.scores(text).items(), key=lambda item: item[1], reverse=True)
+        (best, best_score), (_, runner_up) = ranked[0], ranked[1]
+        margin = best_score - runner_up
+        if margin < settings.language_id_min_margin:
+            return None, margin
+        return best, margin
+
+    def detect(
+        self,
+        text: str,
+        default: SupportedLanguage = SupportedLanguage.ENGLISH
+    ) -> SupportedLanguage:
+        """Identified language, or the default when unsure"""
+        if not settings.language_id_enabled:
+            return default
+        language, margin = self.identify(text)
+        if language is None:
+            logger.info(f"Language unclear (margin {margin:.3f}), using {default.value}")
+            return default
+        logger.info(f"🌍 Detected language: {language.value} (margin {margin:.3f})")
+        return language
+
+
+# Singleton instance
+language_identifier = LanguageIdentifier()
@@ -2,33 +2,78 @@
 N-ATLaS LLM Service
 Integrates with the deployed N-ATLaS model on Modal for multilingual responses.
 """
-from openai import OpenAI
-from typing import Optional, Tuple
+from openai import AsyncOpenAI
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
 import logging
+import re
+import time
 
-from config import settings, SupportedLanguage, SYSTEM_PROMPTS, TEACHER_PROMPTS, ChatMode
+from config import (
+    settings, SupportedLanguage, SYSTEM_PROMPTS, TEACHER_PROMPTS, FALLBACK_MESSAGES, ChatMode,
+    OutputChannel, GenerationPolicy, get_generation_policy,
+)
 from services.search_service import search_service
 from services.intent_service import intent_service, Intent
+from services.semantic_cache import semantic_cache, is_personal
+from services.translation_memory import translation_memory, split_segments, segment_key
+from utils.admission import OverloadedError, llm_limiter
+from utils.compaction import estimate_tokens
+from utils.deadline import current_deadline, degrade, time_left
+from utils.metrics import UPSTREAM_ERRORS, record_llm_usage
+from utils.timing import stage
 
 logger = logging.getLogger(__name__)
 
+# Language name mapping for clearer prompts
+LANGUAGE_NAMES = {
+    SupportedLanguage.HAUSA: "Hausa",
+    SupportedLanguage.YORUBA: "Yoruba",
+    SupportedLanguage.IGBO: "Igbo",
+    SupportedLanguage.PIDGIN: "Nigerian Pidgin",
+    SupportedLanguage.ENGLISH: "English",
+}
+
+# "3." markers starting each item of a batched translation reply
+_NUMBER_MARKER = re.compile(r"^[ \t]*(\d+)[.)][ \t]*", re.MULTILINE)
+# A blank line ends an item (anything after it is a note, not translation)
+_BLANK_LINE = re.compile(r"\n[ \t]*\n")
+
+
+def parse_numbered_items(reply: str) -> Dict[int, str]:
+    """
+    Split a numbered reply into {number: text}. An item runs from its marker
+    to the next one, so a translation wrapped onto several lines stays whole.
+    The first item with a given number wins.
+    """
+    markers = list(_NUMBER_MARKER.finditer(reply))
+    items: Dict[int, str] = {}
+    for marker, following in zip(markers, markers[1:] + [None]):
+        text = reply[marker.end():following.start() if following else len(reply)]
+        text = _BLANK_LINE.split(text, 1)[0]
+        items.setdefault(int(marker.group(1)), " ".join(text.split()))
+    return items
+
 
 class LLMService:
     """Service for interacting with N-ATLaS LLM"""
     
     def __init__(self):
-        self.client = OpenAI(
+        self.client = AsyncOpenAI(
             base_url=settings.natlas_api_url,
             api_key=settings.natlas_api_key,
         )
         self.model = settings.natlas_model_name
+        # Observed decode rate, for fitting max_tokens into a request deadline
+        self._tokens_per_second = settings.llm_tokens_per_second
     
     async def generate_response(
         self,
         user_message: str,
         language: SupportedLanguage = SupportedLanguage.ENGLISH,
         conversation_history: Optional[list] = None,
-        mode: ChatMode = ChatMode.CHAT
+        mode: ChatMode = ChatMode.CHAT,
+        channel: OutputChannel = OutputChannel.TEXT
     ) -> Tuple[str, Intent]:
         """
         Generate a response from N-ATLaS LLM.
@@ -38,75 +83,400 @@ class LLMService:
             language: Target language for response
             conversation_history: Optional previous messages for context
             mode: Chat mode - CHAT for normal, LEARN for teacher mode
+            channel: Whether the answer will be spoken or read (sets the length budget)
             
         Returns:
             Tuple of (AI-generated response text, detected intent)
         """
         try:
-            # In learn mode, always use LEARN intent (no search needed)
-            if mode == ChatMode.LEARN:
-                intent = Intent.LEARN
-            else:
-                # Use intent classification for chat mode
-                intent = intent_service.classify_quick(user_message)
-                if intent is None:
-                    intent = await intent_service.classify(user_message)
+            intent = self._local_intent(user_message, mode)
+            if intent is None:
+                if settings.speculative_execution:
+                    return await self._generate_speculative(
+                        user_message, language, conversation_history, channel
+                    )
+                intent = await self._natlas_intent(user_message)
             
             logger.info(f"Mode: {mode.value}, Detected intent: {intent.value}")
             
+            cacheable = self._is_cacheable(user_message, intent, conversation_history)
+            if cacheable:
+                cached = semantic_cache.lookup(user_message, language, mode, channel)
+                if cached:
+                    return cached, intent
+            
             # Perform search if intent requires real-time data (only in chat mode)
             search_context = ""
             if mode == ChatMode.CHAT and intent == Intent.SEARCH:
-                search_results = search_service.search(user_message)
-                if search_results:
-                    search_context = f"\n\nCONTEXT FROM WEB SEARCH:\n{search_results}\nUse this information to answer the user's question if relevant."
-
-            # Select system prompt based on mode
-            if mode == ChatMode.LEARN:
-                system_prompt = TEACHER_PROMPTS.get(language, TEACHER_PROMPTS[SupportedLanguage.ENGLISH])
-            else:
-                system_prompt = SYSTEM_PROMPTS.get(language, SYSTEM_PROMPTS[SupportedLanguage.ENGLISH])
+                search_context = await self._search(user_message)
             
-            # STRICTLY enforce language
-            enforcement_instruction = f"\n\nIMPORTANT: You MUST respond in {language.name} ({language.value}). Do not switch languages unless explicitly asked."
-            
-            messages = [
-                {"role": "system", "content": system_prompt + enforcement_instruction + search_context}
-            ]
+            policy = get_generation_policy(mode, intent.value, channel)
+            messages = self._build_messages(
+                user_message, language, mode, search_context, conversation_history, policy.brevity
+            )
+            assistant_message = await self._complete(messages, mode, policy)
+            if cacheable:
+                semantic_cache.store(user_message, assistant_message, language, mode, channel)
+            return assistant_message, intent
             
-            # Add conversation history if provided
-            if conversation_history:
-                messages.extend(conversation_history)
+        except OverloadedError:
+            raise
+        except Exception as e:
+            self._record_failure(e)
+            # Fallback response (pre-rendered in the audio bank)
+            return FALLBACK_MESSAGES.get(language, FALLBACK_MESSAGES[SupportedLanguage.ENGLISH]), Intent.CHAT
+    
+    async def stream_response(
+        self,
+        user_message: str,
+        language: SupportedLanguage = SupportedLanguage.ENGLISH,
+        conversation_history: Optional[list] = None,
+        mode: ChatMode = ChatMode.CHAT,
+        channel: OutputChannel = OutputChannel.VOICE
+    ) -> AsyncIterator[str]:
+        """
+        Generate a response like generate_response, yielding the text in pieces
+        as N-ATLaS produces it. There is no speculative execution or semantic
+        cache here: the point is the first words, not the whole answer. If
+        N-ATLaS fails before saying anything, the fallback message is yielded.
+        
+        Args:
+            user_message: The user's message/question
+            language: Target language for response
+            conversation_history: Optional previous messages for context
+            mode: Chat mode - CHAT for normal, LEARN for teacher mode
+            channel: Whether the answer will be spoken or read (sets the length budget)
+        """
+        produced = False
+        try:
+            intent = self._local_intent(user_message, mode)
+            if intent is None:
+                intent = await self._natlas_intent(user_message)
+            logger.info(f"Mode: {mode.value} (streaming), Detected intent: {intent.value}")
             
-            # Add current user message
-            messages.append({"role": "user", "content": user_message})
+            search_context = ""
+            if mode == ChatMode.CHAT and intent == Intent.SEARCH:
+                search_context = await self._search(user_message)
             
-            logger.info(f"Sending to N-ATLaS ({mode.value} mode): {user_message[:100]}...")
+            policy = get_generation_policy(mode, intent.value, channel)
+            messages = self._build_messages(
+                user_message, language, mode, search_context, conversation_history, policy.brevity
+            )
+            async for delta in self._stream_complete(messages, mode, policy):
+                produced = True
+                yield delta
             
-            # Call N-ATLaS API (synchronous but wrapped for async)
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                max_tokens=500,
-                temperature=0.7,
+        except OverloadedError:
+            raise
+        except Exception as e:
+            self._record_failure(e)
+            if not produced:
+                yield FALLBACK_MESSAGES.get(language, FALLBACK_MESSAGES[SupportedLanguage.ENGLISH])
+    
+    def _local_intent(self, user_message: str, mode: ChatMode) -> Optional[Intent]:
+        """Intent from keywords, then the local model; None if both are unsure"""
+        # In learn mode, always use LEARN intent (no search needed)
+        if mode == ChatMode.LEARN:
+            return Intent.LEARN
+        with stage("intent", source="local") as span:
+            intent = intent_service.classify_quick(user_message)
+            if intent is None:
+                intent = intent_service.classify_local(user_message)
+            span.set_attribute("intent", intent.value if intent else None)
+        return intent
+    
+    async def _natlas_intent(self, user_message: str) -> Intent:
+        with stage("intent", source="natlas") as span:
+            intent = await intent_service.classify(user_message)
+            span.set_attribute("intent", intent.value)
+        return intent
+    
+    async def _search(self, user_message: str) -> str:
+        """Search context for the prompt, or "" if the deadline leaves no time to search"""
+        search_deadline = self._search_deadline()
+        if search_deadline == 0:
+            degrade("search_skipped")
+            return ""
+        with stage("search") as span:
+            search_results = await search_service.search_async(user_message, deadline=search_deadline)
+            span.set_attribute("result_chars", len(search_results))
+        return self._search_context(search_results)
+    
+    def _record_failure(self, e: Exception):
+        deadline = current_deadline()
+        if deadline is not None and deadline.remaining() == 0:
+            # Out of time: the fallback is the answer
+            degrade("llm_timeout")
+        else:
+            logger.error(f"N-ATLaS API error: {str(e)}")
+            UPSTREAM_ERRORS.inc("natlas")
+    
+    async def _generate_speculative(
+        self,
+        user_message: str,
+        language: SupportedLanguage,
+        conversation_history: Optional[list],
+        channel: OutputChannel
+    ) -> Tuple[str, Intent]:
+        """
+        Chat-mode generation when the fast classifiers are unsure.
+        
+        N-ATLaS classification and a web search start together (and, if
+        enabled, a plain chat generation too). Once the intent is known the
+        work it does not need is cancelled.
+        
+        Returns:
+            Tuple of (AI-generated response text, detected intent)
+        """
+        classify_task = asyncio.create_task(intent_service.classify(user_message))
+        search_deadline = self._search_deadline()
+        search_task = None
+        if search_deadline != 0:
+            # Unrecorded and unshared, so cancelling it stops a search the answer turns out not to need
+            search_task = asyncio.create_task(
+                search_service.search_async(user_message, deadline=search_deadline, record=False)
             )
+        chat_task = None
+        chat_policy = get_generation_policy(ChatMode.CHAT, Intent.CHAT.value, channel)
+        if settings.speculative_generation:
+            # Chat mode uses the same prompt for every intent except SEARCH
+            messages = self._build_messages(
+                user_message, language, ChatMode.CHAT, "", conversation_history, chat_policy.brevity
+            )
+            chat_task = asyncio.create_task(self._complete(messages, ChatMode.CHAT, chat_policy))
+        
+        try:
+            with stage("intent", source="natlas", speculative=True) as span:
+                intent = await classify_task
+                span.set_attribute("intent", intent.value)
+            logger.info(f"Mode: chat (speculative), Detected intent: {intent.value}")
             
-            assistant_message = response.choices[0].message.content
-            logger.info(f"N-ATLaS response: {assistant_message[:100]}...")
+            cacheable = self._is_cacheable(user_message, intent, conversation_history)
+            policy = get_generation_policy(ChatMode.CHAT, intent.value, channel)
+            if intent != Intent.SEARCH:
+                if search_task:
+                    search_task.cancel()
+                cached = semantic_cache.lookup(user_message, language, ChatMode.CHAT, channel) if cacheable else None
+                if cached:
+                    return cached, intent
+                # The speculative answer only counts if it was generated under this intent's budget
+                if chat_task and policy == chat_policy:
+                    assistant_message = await chat_task
+                    if cacheable:
+                        semantic_cache.store(user_message, assistant_message, language, ChatMode.CHAT, channel)
+                    return assistant_message, intent
+                if chat_task:
+                    # Generated under the wrong budget; free its LLM slot before generating again
+                    chat_task.cancel()
+                    await asyncio.wait({chat_task})
+                search_context = ""
+            else:
+                if chat_task:
+                    chat_task.cancel()
+                search_service.record_query(user_message)
+                if search_task:
+                    # Only the wait left after classification counts; the rest overlapped it
+                    with stage("search", speculative=True):
+                        search_context = self._search_context(await search_task)
+                else:
+                    degrade("search_skipped")
+                    search_context = ""
             
+            messages = self._build_messages(
+                user_message, language, ChatMode.CHAT, search_context, conversation_history, policy.brevity
+            )
+            assistant_message = await self._complete(messages, ChatMode.CHAT, policy)
+            if cacheable:
+                semantic_cache.store(user_message, assistant_message, language, ChatMode.CHAT, channel)
             return assistant_message, intent
-            
-        except Exception as e:
-            logger.error(f"N-ATLaS API error: {str(e)}")
-            # Fallback response
-            fallback_messages = {
-                SupportedLanguage.HAUSA: "Yi haƙuri, matsala ta faru. Da fatan za a sake gwadawa.",
-                SupportedLanguage.YORUBA: "E jọ̀wọ́, ìṣòro kan wáyé. Ẹ gbìyànjú lẹ́ẹ̀kan síi.",
-                SupportedLanguage.IGBO: "Biko, nsogbu mere. Gbalịa ọzọ.",
-                SupportedLanguage.PIDGIN: "Abeg, problem happen. Try again abeg.",
-                SupportedLanguage.ENGLISH: "Sorry, an error occurred. Please try again.",
-            }
-            return fallback_messages.get(language, fallback_messages[SupportedLanguage.ENGLISH]), Intent.CHAT
+        finally:
+            for task in (classify_task, search_task, chat_task):
+                if task and not task.done():
+                    task.cancel()
+    
+    def _is_cacheable(
+        self,
+        user_message: str,
+        intent: Intent,
+        conversation_history: Optional[list]
+    ) -> bool:
+        """
+        Whether an answer may be shared through the semantic cache: standalone,
+        impersonal CHAT/LEARN questions only (never SEARCH, whose data goes stale).
+        """
+        return (
+            semantic_cache.enabled
+            and intent in (Intent.CHAT, Intent.LEARN)
+            and not conversation_history
+            and not is_personal(user_message)
+        )
+    
+    def _search_context(self, search_results: str) -> str:
+        """Wrap search results for the system prompt"""
+        if not search_results:
+            return ""
+        return f"\n\nCONTEXT FROM WEB SEARCH:\n{search_results}\nUse this information to answer the user's question if relevant."
+    
+    def _build_messages(
+        self,
+        user_message: str,
+        language: SupportedLanguage,
+        mode: ChatMode,
+        search_context: str = "",
+        conversation_history: Optional[list] = None,
+        brevity: str = ""
+    ) -> list:
+        """Assemble the system prompt, history and user message"""
+        # Select system prompt based on mode
+        if mode == ChatMode.LEARN:
+            system_prompt = TEACHER_PROMPTS.get(language, TEACHER_PROMPTS[SupportedLanguage.ENGLISH])
+        else:
+            system_prompt = SYSTEM_PROMPTS.get(language, SYSTEM_PROMPTS[SupportedLanguage.ENGLISH])
+        
+        # STRICTLY enforce language
+        enforcement_instruction = f"\n\nIMPORTANT: You MUST respond in {language.name} ({language.value}). Do not switch languages unless explicitly asked."
+        if brevity:
+            enforcement_instruction += f" {brevity}"
+        
+        messages = [
+            {"role": "system", "content": system_prompt + enforcement_instruction + search_context}
+        ]
+        
+        # Add conversation history if provided
+        if conversation_history:
+            messages.extend(conversation_history)
+        
+        # Add current user message
+        messages.append({"role": "user", "content": user_message})
+        return messages
+    
+    def _search_deadline(self) -> Optional[float]:
+        """
+        Seconds a web search may take within the request deadline, leaving
+        time to generate and speak the answer. None means no deadline (use
+        the search default); 0 means there is no time to search at all.
+        """
+        left = time_left()
+        if left is None:
+            return None
+        allowed = left - settings.deadline_llm_reserve_seconds - settings.deadline_tts_reserve_seconds
+        if allowed < settings.deadline_search_min_seconds:
+            return 0
+        return min(allowed, settings.search_deadline_seconds)
+    
+    def _token_budget(self, max_tokens: int) -> int:
+        """Shrink max_tokens to what can be generated before the deadline (leaving time for speech)"""
+        left = time_left()
+        if left is None:
+            return max_tokens
+        seconds = left - settings.deadline_tts_reserve_seconds - settings.llm_first_token_seconds
+        affordable = int(seconds * self._tokens_per_second)
+        if affordable >= max_tokens:
+            return max_tokens
+        degrade("max_tokens_reduced")
+        return max(settings.deadline_min_tokens, affordable)
+    
+    async def _complete(self, messages: list, mode: ChatMode, policy: GenerationPolicy) -> str:
+        """Call N-ATLaS within a generation budget and return the assistant message"""
+        logger.info(f"Sending to N-ATLaS ({mode.value} mode): {messages[-1]['content'][:100]}...")
+        
+        max_tokens = self._token_budget(policy.max_tokens)
+        async with llm_limiter.slot():
+            started = time.perf_counter()
+            with stage("llm", mode=mode.value, max_tokens=max_tokens) as span:
+                response = await asyncio.wait_for(
+                    self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=policy.temperature,
+                    ),
+                    timeout=time_left(),
+                )
+                if response.usage:
+                    span.set_attribute("prompt_tokens", response.usage.prompt_tokens)
+                    span.set_attribute("completion_tokens", response.usage.completion_tokens)
+                span.set_attribute("finish_reason", response.choices[0].finish_reason)
+        
+        record_llm_usage(response.usage, "chat")
+        self._observe_decode_rate(response.usage, time.perf_counter() - started)
+        assistant_message = response.choices[0].message.content
+        used = response.usage.completion_tokens if response.usage else "?"
+        logger.info(
+            f"N-ATLaS response ({used}/{max_tokens} tokens, "
+            f"temperature {policy.temperature}): {assistant_message[:100]}..."
+        )
+        if response.choices[0].finish_reason == "length":
+            logger.warning(f"N-ATLaS reply cut off at the {max_tokens}-token budget")
+        return assistant_message
+    
+    async def _stream_complete(
+        self,
+        messages: list,
+        mode: ChatMode,
+        policy: GenerationPolicy
+    ) -> AsyncIterator[str]:
+        """Stream a completion from N-ATLaS, yielding text deltas until done or out of time"""
+        logger.info(f"Streaming from N-ATLaS ({mode.value} mode): {messages[-1]['content'][:100]}...")
+        
+        max_tokens = self._token_budget(policy.max_tokens)
+        async with llm_limiter.slot():
+            started = time.perf_counter()
+            usage = None
+            first_token = True
+            with stage("llm", mode=mode.value, max_tokens=max_tokens, stream=True) as span:
+                stream = await asyncio.wait_for(
+                    self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=policy.temperature,
+                        stream=True,
+                        stream_options={"include_usage": True},
+                    ),
+                    timeout=time_left(),
+                )
+                chunks = stream.__aiter__()
+                try:
+                    while True:
+                        # A stalled stream must not outlive the request deadline (or hold the LLM slot)
+                        try:
+                            chunk = await asyncio.wait_for(chunks.__anext__(), timeout=time_left())
+                        except StopAsyncIteration:
+                            break
+                        except asyncio.TimeoutError:
+                            degrade("llm_timeout")
+                            break
+                        if chunk.usage:
+                            usage = chunk.usage
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            if first_token:
+                                first_token = False
+                                span.set_attribute("first_token_ms", round(1000 * (time.perf_counter() - started)))
+                            yield delta
+                        if chunk.choices[0].finish_reason:
+                            span.set_attribute("finish_reason", chunk.choices[0].finish_reason)
+                finally:
+                    # Also runs when the consumer is cancelled (barge-in): stop the upstream generation
+                    await stream.close()
+                if usage:
+                    span.set_attribute("prompt_tokens", usage.prompt_tokens)
+                    span.set_attribute("completion_tokens", usage.completion_tokens)
+        
+        if usage:
+            record_llm_usage(usage, "chat")
+            self._observe_decode_rate(usage, time.perf_counter() - started)
+    
+    def _observe_decode_rate(self, usage: Optional[object], elapsed: float):
+        """Fold one completion's tokens/second into the moving estimate"""
+        tokens = getattr(usage, "completion_tokens", 0) or 0
+        generating = elapsed - settings.llm_first_token_seconds
+        if tokens < 20 or generating <= 0:
+            return  # Too short to say anything about the decode rate
+        self._tokens_per_second = 0.8 * self._tokens_per_second + 0.2 * (tokens / generating)
 
     async def translate(
         self,
@@ -116,6 +486,8 @@ class LLMService:
     ) -> str:
         """
         Translate text between supported languages using N-ATLaS.
+        Sentences already in the translation memory are reused; only new
+        ones are sent to the model, batched into one prompt.
         
         Args:
             text: Text to translate
@@ -126,46 +498,139 @@ class LLMService:
             Translated text
         """
         try:
-            # Language name mapping for clearer prompts
-            language_names = {
-                SupportedLanguage.HAUSA: "Hausa",
-                SupportedLanguage.YORUBA: "Yoruba",
-                SupportedLanguage.IGBO: "Igbo",
-                SupportedLanguage.PIDGIN: "Nigerian Pidgin",
-                SupportedLanguage.ENGLISH: "English",
-            }
-            
-            source_name = language_names.get(source_language, "the source language")
-            target_name = language_names.get(target_language, "the target language")
-            
-            # Build translation prompt
-            system_prompt = f"""You are a professional translator specializing in Nigerian languages.
-Your task is to translate text accurately from {source_name} to {target_name}.
-Preserve the meaning, tone, and cultural context of the original text.
-Only output the translated text, nothing else. Do not add explanations or notes."""
-
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Translate this from {source_name} to {target_name}:\n\n{text}"}
-            ]
-            
-            logger.info(f"Translating from {source_name} to {target_name}: {text[:50]}...")
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                max_tokens=500,
-                temperature=0.3,  # Lower temperature for more accurate translation
-            )
+            if not settings.translation_memory_enabled:
+                return await self._translate_text(text, source_language, target_language)
             
-            translated_text = response.choices[0].message.content.strip()
-            logger.info(f"Translation result: {translated_text[:50]}...")
+            # Even indexes are sentences, odd indexes the separators between them
+            parts = split_segments(text)
+            keys = {i: segment_key(parts[i]) for i in range(0, len(parts), 2) if parts[i].strip()}
             
-            return translated_text
+            known = await translation_memory.lookup(source_language, target_language, keys.values())
+            missing = list(dict.fromkeys(key for key in keys.values() if key not in known))
+            logger.info(f"Translation memory: reused {len(keys) - len(missing)}/{len(keys)} segments")
             
+            if missing:
+                translations = await self._translate_batch(missing, source_language, target_language)
+                if translations is None:
+                    # Model did not keep the numbering; translate the text as a whole instead
+                    return await self._translate_text(text, source_language, target_language)
+                await translation_memory.store(source_language, target_language, zip(missing, translations))
+                known.update(zip(missing, translations))
+            
+            for i, key in keys.items():
+                parts[i] = known[key]
+            return "".join(parts)
+            
+        except OverloadedError:
+            raise
         except Exception as e:
             logger.error(f"Translation error: {str(e)}")
+            UPSTREAM_ERRORS.inc("natlas")
             raise Exception(f"Translation failed: {str(e)}")
+    
+    def _translation_prompt(
+        self,
+        source_language: SupportedLanguage,
+        target_language: SupportedLanguage
+    ) -> Tuple[str, str, str]:
+        """Build the translator system prompt; returns (prompt, source name, target name)"""
+        source_name = LANGUAGE_NAMES.get(source_language, "the source language")
+        target_name = LANGUAGE_NAMES.get(target_language, "the target language")
+        
+        system_prompt = f"""You are a professional translator specializing in Nigerian languages.
+Your task is to translate text accurately from {source_name} to {target_name}.
+Preserve the meaning, tone, and cultural context of the original text.
+Only output the translated text, nothing else. Do not add explanations or notes."""
+        return system_prompt, source_name, target_name
+    
+    async def _translate_text(
+        self,
+        text: str,
+        source_language: SupportedLanguage,
+        target_language: SupportedLanguage
+    ) -> str:
+        """Translate a piece of text in a single N-ATLaS call"""
+        system_prompt, source_name, target_name = self._translation_prompt(source_language, target_language)
+        
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"Translate this from {source_name} to {target_name}:\n\n{text}"}
+        ]
+        
+        logger.info(f"Translating from {source_name} to {target_name}: {text[:50]}...")
+        
+        async with llm_limiter.slot():
+            with stage("translate", source=source_language.value, target=target_language.value, segments=1):
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=500,
+                    temperature=0.3,  # Lower temperature for more accurate translation
+                )
+        
+        record_llm_usage(response.usage, "translate")
+        translated_text = response.choices[0].message.content.strip()
+        logger.info(f"Translation result: {translated_text[:50]}...")
+        
+        return translated_text
+    
+    async def _translate_batch(
+        self,
+        segments: List[str],
+        source_language: SupportedLanguage,
+        target_language: SupportedLanguage
+    ) -> Optional[List[str]]:
+        """
+        Translate several sentences in one numbered prompt. A batch whose
+        reply could outgrow the token cap is split in half and each half
+        translated separately.
+        
+        Returns:
+            Translations in input order, or None if the reply could not be matched up
+        """
+        if len(segments) == 1:
+            return [await self._translate_text(segments[0], source_language, target_language)]
+        
+        numbered = "\n".join(f"{i}. {segment}" for i, segment in enumerate(segments, 1))
+        max_tokens = max(500, 2 * estimate_tokens(numbered))
+        if max_tokens > settings.translation_batch_max_tokens:
+            half = len(segments) // 2
+            parts = await asyncio.gather(
+                self._translate_batch(segments[:half], source_language, target_language),
+                self._translate_batch(segments[half:], source_language, target_language),
+            )
+            if any(part is None for part in parts):
+                return None
+            return parts[0] + parts[1]
+        
+        system_prompt, source_name, target_name = self._translation_prompt(source_language, target_language)
+        system_prompt += f"""
+You will receive {len(segments)} numbered sentences. Translate each one separately and
+output exactly {len(segments)} lines in the form "N. translation", keeping the same numbers."""
+        
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"Translate these from {source_name} to {target_name}:\n\n{numbered}"}
+        ]
+        
+        logger.info(f"Translating {len(segments)} new segments from {source_name} to {target_name}")
+        
+        async with llm_limiter.slot():
+            with stage("translate", source=source_language.value, target=target_language.value, segments=len(segments)):
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=0.3,
+                )
+        
+        record_llm_usage(response.usage, "translate")
+        translated = parse_numbered_items(response.choices[0].message.content)
+        
+        if any(not translated.get(i) for i in range(1, len(segments) + 1)):
+            logger.warning("Batched translation lost its numbering")
+            return None
+        return [translated[i] for i in range(1, len(segments) + 1)]
 
 
 # Singleton instance
@@ -2,14 +2,22 @@
 Voice Pipeline Service
 Orchestrates the full voice-to-voice pipeline: STT → LLM → TTS
 """
+import asyncio
 import logging
-from typing import Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
-from config import SupportedLanguage, ChatMode
+from config import settings, SupportedLanguage, ChatMode, OutputChannel
 from services.stt_service import stt_service
 from services.llm_service import llm_service
 from services.tts_service import tts_service
+from services.fast_path_service import fast_path_service
+from services.language_identifier import language_identifier
+from services.intent_service import Intent
 from schemas import VoiceResponse
+from utils.admission import OverloadedError, Priority, set_priority
+from utils.deadline import current_deadline, degrade, start_deadline, time_left
+from utils.timing import stage, current_timings
+from utils.tracing import annotate
 
 logger = logging.getLogger(__name__)
 
@@ -17,12 +25,84 @@ logger = logging.getLogger(__name__)
 class PipelineService:
     """Main orchestration service for voice processing"""
     
+    def response_timings(self) -> Optional[Dict[str, float]]:
+        """Stage timings for the response body, if enabled and collected"""
+        if not settings.stage_timings_in_response:
+            return None
+        timings = current_timings()
+        return {name: round(ms, 1) for name, ms in timings.items()} if timings else None
+    
+    def response_degradations(self) -> Optional[List[str]]:
+        """Optional steps dropped to meet this request's deadline, if any"""
+        deadline = current_deadline()
+        return list(deadline.degradations) if deadline and deadline.degradations else None
+    
+    def start_deadline(self, channel: OutputChannel, budget_seconds: Optional[float]):
+        """
+        Start the current request's latency budget.
+        
+        Args:
+            channel: Output channel whose default budget applies
+            budget_seconds: Client-requested budget (may only lower the default)
+        """
+        budget = settings.deadline_seconds.get(channel.value)
+        if budget_seconds:
+            budget = min(budget, budget_seconds) if budget else budget_seconds
+        if budget:
+            start_deadline(budget)
+    
+    async def speak_sentence(self, text: str, language: SupportedLanguage) -> Optional[str]:
+        """
+        Synthesize text if the request deadline allows.
+        
+        Skips or cuts short synthesis (recording the degradation) when the
+        deadline is close, and never raises for a TTS failure.
+        
+        Args:
+            text: Answer or sentence to speak
+            language: Language to synthesize in
+            
+        Returns:
+            Audio URL, or None if no audio was produced
+        """
+        left = time_left()
+        if left is not None and left < settings.deadline_tts_min_seconds:
+            degrade("audio_skipped")
+            return None
+        try:
+            with stage("tts", chars=len(text), language=language.value):
+                audio_path = await asyncio.wait_for(tts_service.synthesize(text, language), timeout=left)
+            return await tts_service.get_audio_url(audio_path)
+        except asyncio.TimeoutError:
+            degrade("audio_timeout")
+        except OverloadedError:
+            degrade("audio_skipped")
+        except Exception as e:
+            logger.error(f"TTS generation failed: {e}")
+            # Continue without audio, don't crash the pipeline
+        return None
+    
+    async def _respond(
+        self,
+        text: str,
+        language: SupportedLanguage,
+        mode: ChatMode,
+        channel: OutputChannel
+    ) -> Tuple[str, Intent]:
+        """Answer from the greeting fast path if possible, otherwise from N-ATLaS"""
+        fast_reply = fast_path_service.respond(text, language, mode)
+        if fast_reply:
+            return fast_reply, Intent.CHAT
+        return await llm_service.generate_response(text, language, mode=mode, channel=channel)
+    
     async def process_voice(
         self,
         audio_data: bytes,
         filename: str = "audio.wav",
         preferred_language: Optional[SupportedLanguage] = None,
-        mode: ChatMode = ChatMode.CHAT
+        mode: ChatMode = ChatMode.CHAT,
+        budget_seconds: Optional[float] = None,
+        on_event: Optional[Callable[[str, dict], None]] = None
     ) -> VoiceResponse:
         """
         Process a voice message through the full pipeline.
@@ -34,38 +114,46 @@ class PipelineService:
             filename: Original filename
             preferred_language: Optional language override
             mode: Chat mode (chat or learn)
+            budget_seconds: Answer within this many seconds (capped by the voice default)
+            on_event: Called with ("transcribed" | "answered" | "audio_ready", data) as each step finishes
             
         Returns:
             VoiceResponse with transcription, response, and audio URL
         """
         logger.info(f"🎤 Starting voice pipeline (mode: {mode.value})...")
+        # Text requests are admitted first when a stage is saturated
+        set_priority(Priority.VOICE)
+        self.start_deadline(OutputChannel.VOICE, budget_seconds)
         
         # Step 1: Speech-to-Text
         logger.info("Step 1: Transcribing audio...")
-        transcribed_text, detected_language = await stt_service.transcribe(
-            audio_data, filename
-        )
+        with stage("stt", audio_bytes=len(audio_data)) as span:
+            transcribed_text, detected_language = await stt_service.transcribe(
+                audio_data, filename
+            )
+            span.set_attribute("language", detected_language.value)
         
         # Use preferred language if provided, otherwise use detected
         language = preferred_language or detected_language
         logger.info(f"Using language: {language.value}")
+        if on_event:
+            on_event("transcribed", {"text": transcribed_text, "language": language.value})
         
-        # Step 2: Generate LLM response
+        # Step 2: Generate LLM response (pleasantries come from the fast path)
         logger.info("Step 2: Generating AI response...")
-        response_text, intent = await llm_service.generate_response(
-            transcribed_text, language, mode=mode
+        response_text, intent = await self._respond(
+            transcribed_text, language, mode, OutputChannel.VOICE
         )
         logger.info(f"Intent detected: {intent.value}")
+        annotate(language=language.value, mode=mode.value, intent=intent.value, channel="voice")
+        if on_event:
+            on_event("answered", {"text": response_text, "intent": intent.value})
         
         # Step 3: Text-to-Speech
         logger.info("Step 3: Synthesizing speech...")
-        audio_url = None
-        try:
-            audio_path = await tts_service.synthesize(response_text, language)
-            audio_url = await tts_service.get_audio_url(audio_path)
-        except Exception as e:
-            logger.error(f"TTS generation failed: {e}")
-            # Continue without audio, don't crash the pipeline
+        audio_url = await self.speak_sentence(response_text, language)
+        if on_event:
+            on_event("audio_ready", {"audio_url": audio_url, "degraded": self.response_degradations()})
         
         logger.info("✅ Voice pipeline complete!")
         
@@ -73,42 +161,47 @@ class PipelineService:
             transcribed_text=transcribed_text,
             response_text=response_text,
             detected_language=language,
-            audio_url=audio_url
+            audio_url=audio_url,
+            timings=self.response_timings(),
+            degraded=self.response_degradations()
         )
     
     async def process_text(
         self,
         text: str,
         language: Optional[SupportedLanguage] = None,
-        mode: ChatMode = ChatMode.CHAT
+        mode: ChatMode = ChatMode.CHAT,
+        budget_seconds: Optional[float] = None
     ) -> Tuple[str, SupportedLanguage, Optional[str]]:
         """
         Process a text message (useful for testing without audio).
         
         Args:
             text: User's text message
-            language: Language for response
+            language: Language for response (identified from the text if not given)
             mode: Chat mode (chat or learn for teacher mode)
+            budget_seconds: Answer within this many seconds (capped by the text default)
             
         Returns:
             Tuple of (response_text, language, audio_url)
         """
-        # Default to English if not specified
-        lang = language or SupportedLanguage.ENGLISH
+        self.start_deadline(OutputChannel.TEXT, budget_seconds)
+        
+        # Identify the language locally if not specified
+        if language is None:
+            with stage("langid"):
+                language = language_identifier.detect(text, settings.default_language)
+        lang = language
         
         logger.info(f"Processing text in {mode.value} mode")
         
         # Generate response with mode
-        response_text, intent = await llm_service.generate_response(text, lang, mode=mode)
+        response_text, intent = await self._respond(text, lang, mode, OutputChannel.TEXT)
         logger.info(f"Intent detected: {intent.value}")
+        annotate(language=lang.value, mode=mode.value, intent=intent.value, channel="text")
         
         # Optionally generate audio
-        audio_url = None
-        try:
-            audio_path = await tts_service.synthesize(response_text, lang)
-            audio_url = await tts_service.get_audio_url(audio_path)
-        except Exception as e:
-            logger.error(f"TTS generation failed: {e}")
+        audio_url = await self.speak_sentence(response_text, lang)
         
         return response_text, lang, audio_url
 
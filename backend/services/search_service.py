@@ -2,10 +2,21 @@
 Tavily Search Service
 Uses Tavily AI-optimized search with DuckDuckGo fallback.
 """
+import asyncio
 import logging
-from typing import Optional
+import time
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
 
 from config import settings
+from utils.admission import OverloadedError, Priority, search_limiter, set_priority
+from utils.cache import TTLCache
+from utils.compaction import compact_search_results
+from utils.metrics import UPSTREAM_ERRORS
+from utils.profiler import track_worker
+from utils.tracing import annotate, span
+from utils.text import normalize_query
 
 logger = logging.getLogger(__name__)
 
@@ -25,12 +36,108 @@ except ImportError:
     logger.warning("DuckDuckGo search not available.")
 
 
+# Keywords (normalized, diacritics folded) that decide how long a result stays fresh
+QUERY_CLASS_KEYWORDS = {
+    "weather": {
+        "weather", "rain", "temperature", "forecast", "climate", "sunny", "flood",
+        "oju", "ojo", "yanayi", "ruwan", "sama", "igwe", "mmiri", "ozuzo",
+    },
+    "news": {
+        "news", "latest", "headlines", "breaking", "update", "updates",
+        "iroyin", "labarai", "ozi",
+    },
+    "price": {
+        "price", "prices", "cost", "market", "naira", "rate", "fuel", "petrol",
+        "owo", "oja", "farashi", "kasuwa", "kudi", "ego", "ahia", "nawa", "ole",
+    },
+}
+
+
+def classify_query(normalized_query: str) -> str:
+    """Bucket a normalized query into weather / news / price / general"""
+    tokens = set(normalized_query.split())
+    for query_class, keywords in QUERY_CLASS_KEYWORDS.items():
+        if tokens & keywords:
+            return query_class
+    return "general"
+
+
+class ProviderStats:
+    """Latency and win-rate bookkeeping for one search provider"""
+    
+    def __init__(self):
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.cancelled = 0
+        self.wins = 0
+        self.total_latency = 0.0
+    
+    def to_dict(self) -> dict:
+        completed = self.successes + self.failures
+        return {
+            "calls": self.calls,
+            "successes": self.successes,
+            "failures": self.failures,
+            "cancelled": self.cancelled,
+            "wins": self.wins,
+            "win_rate": self.wins / self.calls if self.calls else 0.0,
+            "avg_latency_ms": 1000 * self.total_latency / completed if completed else 0.0,
+        }
+
+
+class RollingCounter:
+    """Approximate per-key counts over a sliding time window, kept in buckets"""
+    
+    def __init__(self, window_seconds: float, buckets: int = 6):
+        self.buckets = buckets
+        self.bucket_seconds = window_seconds / buckets
+        self._buckets: deque = deque(maxlen=buckets)
+    
+    def _current_index(self) -> int:
+        return int(time.monotonic() // self.bucket_seconds)
+    
+    def add(self, key: str):
+        index = self._current_index()
+        if not self._buckets or self._buckets[-1][0] != index:
+            self._buckets.append((index, Counter()))
+        self._buckets[-1][1][key] += 1
+    
+    def most_common(self, n: int) -> List[Tuple[str, int]]:
+        oldest = self._current_index() - self.buckets + 1
+        totals = Counter()
+        for index, counts in self._buckets:
+            if index >= oldest:
+                totals.update(counts)
+        return totals.most_common(n)
+
+
 class SearchService:
     """Unified search service with Tavily primary and DuckDuckGo fallback"""
     
     def __init__(self):
         self.tavily_client = None
         self.ddgs_client = None
+        self.stats: Dict[str, ProviderStats] = {
+            "tavily": ProviderStats(),
+            "ddgs": ProviderStats(),
+        }
+        # Provider clients are blocking, so they run on a dedicated pool
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.search_max_workers,
+            thread_name_prefix="search",
+        )
+        # Results keyed on normalized query; refreshes in flight keyed the same way
+        self.cache = TTLCache(
+            max_entries=settings.search_cache_max_entries,
+            default_ttl=settings.search_cache_ttls["general"],
+        )
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # Popularity of normalized queries, with the latest raw query for each
+        # (only tracked while the pre-warmer runs; the raw queries are LRU-capped)
+        self.query_counts = RollingCounter(settings.search_prewarm_window_seconds)
+        self._recent_queries: "OrderedDict[str, str]" = OrderedDict()
+        self._prewarming = False
         
         # Initialize Tavily if available and configured
         if TAVILY_AVAILABLE and settings.tavily_api_key and settings.use_tavily:
@@ -75,6 +182,371 @@ class SearchService:
         logger.warning("No search provider available")
         return ""
     
+    def _providers(self) -> List[Tuple[str, Callable[[str, int], str]]]:
+        """Configured providers in preference order"""
+        providers = []
+        if self.tavily_client:
+            providers.append(("tavily", self._search_tavily))
+        if self.ddgs_client:
+            providers.append(("ddgs", self._search_ddgs))
+        return providers
+    
+    async def search_async(
+        self,
+        query: str,
+        max_results: int = 5,
+        deadline: Optional[float] = None,
+        record: bool = True
+    ) -> str:
+        """
+        Search through the result cache, falling back to a live search.
+        
+        Fresh entries are returned directly. Stale entries are returned
+        immediately while a background refresh runs (stale-while-revalidate).
+        Concurrent misses for the same query share one live search.
+        
+        Args:
+            query: The search query
+            max_results: Maximum number of results
+            deadline: Seconds allowed for a live search (defaults to settings)
+            record: Count the query towards pre-warming. Speculative callers pass
+                False (and call record_query() once the search is known to be
+                needed); their live search is not shared, so cancelling it
+                really stops it.
+            
+        Returns:
+            Formatted string of search results
+        """
+        if not settings.search_cache_enabled:
+            return await self._search_live(query, max_results, deadline)
+        
+        key = normalize_query(query)
+        if record:
+            self._record(key, query)
+        
+        cached, state = self.cache.get(key)
+        annotate(query_class=classify_query(key), cache=state)
+        if state == TTLCache.FRESH:
+            logger.info(f"🔍 Search cache hit: {key}")
+            return cached
+        if state == TTLCache.STALE:
+            if record:
+                logger.info(f"🔍 Search cache stale hit, refreshing: {key}")
+                self._refresh(key, query, max_results)
+            return cached
+        
+        task = self._inflight.get(key)
+        if not record and task is None:
+            return await self._fetch_and_store(key, query, max_results, deadline)
+        # Shield so a cancelled or timed-out caller does not abort a search others
+        # are waiting on; a joined search may have started under a longer deadline
+        task = self._refresh(key, query, max_results, deadline)
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(task),
+                timeout=deadline or settings.search_deadline_seconds,
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Search for '{key}' missed its deadline; answering without it")
+            return ""
+    
+    def record_query(self, query: str, max_results: int = 5):
+        """
+        Count a query whose search was started with record=False, now that it
+        is known to be needed (and refresh its cache entry if stale)
+        """
+        if not settings.search_cache_enabled:
+            return
+        key = normalize_query(query)
+        self._record(key, query)
+        remaining = self.cache.fresh_remaining(key)
+        if remaining is not None and remaining <= 0:
+            self._refresh(key, query, max_results)
+    
+    def _record(self, key: str, query: str):
+        if not self._prewarming:
+            return
+        self.query_counts.add(key)
+        self._recent_queries[key] = query
+        self._recent_queries.move_to_end(key)
+        while len(self._recent_queries) > settings.search_prewarm_max_tracked:
+            self._recent_queries.popitem(last=False)
+    
+    def _refresh(
+        self,
+        key: str,
+        query: str,
+        max_results: int,
+        deadline: Optional[float] = None
+    ) -> asyncio.Task:
+        """Start (or join) a live search that stores its result in the cache"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_and_store(key, query, max_results, deadline))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+    
+    async def _fetch_and_store(
+        self,
+        key: str,
+        query: str,
+        max_results: int,
+        deadline: Optional[float]
+    ) -> str:
+        """Run a live search and cache a non-empty result with its class TTL"""
+        result = await self._search_live(query, max_results, deadline)
+        if result:
+            ttls = settings.search_cache_ttls
+            ttl = ttls.get(classify_query(key), ttls["general"])
+            self.cache.set(key, result, ttl=ttl, stale_ttl=ttl * settings.search_cache_stale_ratio)
+        return result
+    
+    def _prewarm_candidates(self) -> List[Tuple[str, str]]:
+        """Hot and seeded queries that will go stale before the next pass"""
+        hot = [
+            (key, count)
+            for key, count in self.query_counts.most_common(settings.search_prewarm_top_n)
+            if count >= settings.search_prewarm_min_hits
+        ]
+        hot_keys = {key for key, _ in hot}
+        
+        # Forget raw queries that dropped out of the popularity window
+        self._recent_queries = OrderedDict(
+            (key, query) for key, query in self._recent_queries.items() if key in hot_keys
+        )
+        
+        queries = [(key, self._recent_queries[key]) for key, _ in hot if key in self._recent_queries]
+        queries += [(normalize_query(query), query) for query in settings.search_prewarm_queries]
+        
+        margin = settings.search_prewarm_interval_seconds + settings.search_deadline_seconds
+        candidates, seen = [], set()
+        for key, query in queries:
+            if key in seen:
+                continue
+            seen.add(key)
+            remaining = self.cache.fresh_remaining(key)
+            if remaining is None or remaining < margin:
+                candidates.append((key, query))
+        return candidates
+    
+    async def prewarm_once(self) -> int:
+        """
+        Refresh hot queries that are about to go stale, within the
+        configured concurrency and rate limits.
+        
+        Returns:
+            Number of queries refreshed
+        """
+        candidates = self._prewarm_candidates()
+        if not candidates:
+            return 0
+        
+        semaphore = asyncio.Semaphore(settings.search_prewarm_concurrency)
+        spacing = 60.0 / max(settings.search_prewarm_rate_per_minute, 1)
+        
+        async def warm(key: str, query: str):
+            async with semaphore:
+                await self._refresh(key, query, 5)
+        
+        tasks = []
+        for i, (key, query) in enumerate(candidates):
+            if i:
+                await asyncio.sleep(spacing)
+            tasks.append(asyncio.create_task(warm(key, query)))
+        await asyncio.gather(*tasks, return_exceptions=True)
+        
+        logger.info(f"🔥 Pre-warmed {len(tasks)} search queries")
+        return len(tasks)
+    
+    async def run_prewarmer(self):
+        """Background loop that keeps the hottest queries in the cache"""
+        # Pre-warming yields to live requests
+        set_priority(Priority.BACKGROUND)
+        if not (settings.search_cache_enabled and settings.search_prewarm_enabled):
+            return
+        if not self._providers():
+            logger.warning("Search pre-warming disabled: no search provider available")
+            return
+        
+        self._prewarming = True
+        try:
+            while True:
+                try:
+                    await self.prewarm_once()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Search pre-warm error: {e}")
+                await asyncio.sleep(settings.search_prewarm_interval_seconds)
+        finally:
+            self._prewarming = False
+    
+    async def _search_live(
+        self,
+        query: str,
+        max_results: int = 5,
+        deadline: Optional[float] = None
+    ) -> str:
+        """
+        Search without blocking the event loop, hedging across providers.
+        
+        The preferred provider starts first; each further provider starts when
+        the hedge delay elapses or an earlier one fails. The first non-empty
+        result wins and any provider still running is cancelled.
+        
+        Args:
+            query: The search query
+            max_results: Maximum number of results
+            deadline: Seconds allowed for the whole search (defaults to settings)
+            
+        Returns:
+            Formatted string of search results, or "" if nothing arrived in time
+        """
+        queue = self._providers()
+        if not queue:
+            logger.warning("No search provider available")
+            return ""
+        
+        try:
+            async with search_limiter.slot():
+                return await self._hedged_search(queue, query, max_results, deadline)
+        except OverloadedError:
+            # Answer without web context rather than fail the request
+            return ""
+    
+    async def _hedged_search(
+        self,
+        queue: List[Tuple[str, Callable[[str, int], str]]],
+        query: str,
+        max_results: int,
+        deadline: Optional[float]
+    ) -> str:
+        """Run the provider race for _search_live"""
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + (deadline or settings.search_deadline_seconds)
+        hedge_delay = settings.search_hedge_delay_seconds
+        
+        pending = {self._launch(*queue.pop(0), query, max_results)}
+        if hedge_delay <= 0:
+            pending.update(self._launch(*provider, query, max_results) for provider in queue)
+            queue = []
+        
+        try:
+            while pending:
+                remaining = deadline_at - loop.time()
+                if remaining <= 0:
+                    logger.warning(f"Search deadline exceeded for: {query}")
+                    break
+                
+                timeout = min(remaining, hedge_delay) if queue else remaining
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    name, result = task.result()
+                    if result:
+                        self.stats[name].wins += 1
+                        return result
+                
+                # Hedge delay elapsed or a provider came back empty: start the next one
+                if queue:
+                    pending.add(self._launch(*queue.pop(0), query, max_results))
+            
+            return ""
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    def _launch(
+        self,
+        name: str,
+        provider: Callable[[str, int], str],
+        query: str,
+        max_results: int
+    ) -> asyncio.Task:
+        """Start one provider on the search thread pool"""
+        return asyncio.create_task(self._run_provider(name, provider, query, max_results))
+    
+    async def _run_provider(
+        self,
+        name: str,
+        provider: Callable[[str, int], str],
+        query: str,
+        max_results: int
+    ) -> Tuple[str, str]:
+        """Run a provider and record its latency; returns (name, result)"""
+        stats = self.stats[name]
+        stats.calls += 1
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        with span(f"search.{name}") as current:
+            try:
+                result = await loop.run_in_executor(self._executor, track_worker(provider), query, max_results)
+            except asyncio.CancelledError:
+                # The worker thread finishes on its own; its result is discarded
+                stats.cancelled += 1
+                current.set_attribute("cancelled", True)
+                raise
+            except Exception as e:
+                logger.error(f"{name} search error: {e}")
+                result = ""
+            current.set_attribute("result_chars", len(result))
+        
+        stats.total_latency += time.perf_counter() - started
+        if result:
+            stats.successes += 1
+        else:
+            stats.failures += 1
+        return name, result
+    
+    def get_stats(self) -> dict:
+        """Get per-provider latency and win-rate, plus cache counters"""
+        return {
+            "providers": {name: stats.to_dict() for name, stats in self.stats.items()},
+            "cache": self.cache.get_stats(),
+        }
+    
+    def _format_results(
+        self,
+        query: str,
+        results: List[Dict[str, str]],
+        answer: Optional[str] = None,
+        snippet_chars: Optional[int] = None
+    ) -> str:
+        """
+        Turn provider results into prompt context.
+        Compacted to the token budget when enabled, otherwise listed in full.
+        
+        Args:
+            query: The search query (used for relevance ranking)
+            results: Provider results, each with "title" and "content"
+            answer: Optional provider-generated summary
+            snippet_chars: Per-result truncation for the uncompacted listing
+            
+        Returns:
+            Formatted string of search results
+        """
+        if settings.search_context_compaction:
+            compacted = compact_search_results(
+                query, results, answer, token_budget=settings.search_context_token_budget
+            )
+            if compacted:
+                return compacted
+        
+        formatted = "Web Search Results:\n\n"
+        
+        # Include AI answer if available
+        if answer:
+            formatted += f"Summary: {answer}\n\n"
+        
+        # Include individual results
+        for i, result in enumerate(results, 1):
+            content = result["content"][:snippet_chars] if snippet_chars else result["content"]
+            formatted += f"{i}. {result['title']}: {content}\n\n"
+        
+        return formatted
+    
     def _search_tavily(self, query: str, max_results: int) -> str:
         """Search using Tavily AI-optimized search"""
         try:
@@ -87,24 +559,17 @@ class SearchService:
                 include_answer=True,  # Get AI-generated answer
             )
             
-            # Format results
-            formatted = "Web Search Results:\n\n"
-            
-            # Include AI answer if available
-            if response.get("answer"):
-                formatted += f"Summary: {response['answer']}\n\n"
-            
-            # Include individual results
-            for i, result in enumerate(response.get("results", [])[:max_results], 1):
-                title = result.get("title", "No title")
-                content = result.get("content", "")[:300]
-                formatted += f"{i}. {title}: {content}\n\n"
+            results = [
+                {"title": result.get("title", "No title"), "content": result.get("content", "")}
+                for result in response.get("results", [])[:max_results]
+            ]
             
             logger.info(f"Tavily returned {len(response.get('results', []))} results")
-            return formatted
+            return self._format_results(query, results, response.get("answer"), snippet_chars=300)
             
         except Exception as e:
             logger.error(f"Tavily search error: {e}")
+            UPSTREAM_ERRORS.inc("tavily")
             return ""
     
     def _search_ddgs(self, query: str, max_results: int) -> str:
@@ -117,15 +582,15 @@ class SearchService:
             if not results:
                 return ""
             
-            formatted = "Web Search Results:\n\n"
-            for i, result in enumerate(results, 1):
-                formatted += f"{i}. {result['title']}: {result['body']}\n\n"
-            
             logger.info(f"DuckDuckGo returned {len(results)} results")
-            return formatted
+            return self._format_results(
+                query,
+                [{"title": result["title"], "content": result["body"]} for result in results],
+            )
             
         except Exception as e:
             logger.error(f"DuckDuckGo search error: {e}")
+            UPSTREAM_ERRORS.inc("ddgs")
             return ""
 
 
@@ -0,0 +1,225 @@
+"""
+Semantic Response Cache
+Serves earlier answers to general-knowledge questions asked in slightly
+different words, matched by cosine similarity of hashed character n-grams.
+A match must also share most of its content words and exactly the same
+numbers and names: character n-grams alone rate "Niger" and "Nigeria" (or
+"1914" and "1941") as near-identical.
+"""
+import logging
+import re
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from config import settings, SupportedLanguage, ChatMode, OutputChannel
+from utils.text import ALL_STOPWORDS, normalize_query, normalize_text, tokenize
+from utils.vectorize import hashed_ngram_features
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    logger.warning("NumPy not installed. Semantic response cache disabled.")
+
+
+# First-person words that make a question about the asker, not the world.
+# Second person is left out: "Can you explain..." is how most questions are asked.
+PERSONAL_MARKERS = {
+    "i", "im", "i'm", "me", "my", "mine", "myself", "we", "us", "our",
+    "mi", "emi",  # Yoruba
+    "m", "mu",    # Igbo
+}
+
+# Words in the raw question, and the end of a sentence before one
+_RAW_WORD = re.compile(r"\w[\w'’]*")
+_SENTENCE_END = re.compile(r"[.!?]\s*$")
+
+
+def is_personal(message: str) -> bool:
+    """Whether a message mentions the user or the assistant"""
+    return any(token in PERSONAL_MARKERS for token in tokenize(message))
+
+
+def _stem(token: str) -> str:
+    """Drop a possessive "'s" and a plural "s", so "today's"/"today" and "cause"/"causes" agree"""
+    if token.endswith("'s"):
+        token = token[:-2]
+    return token[:-1] if len(token) > 3 and token.endswith("s") else token
+
+
+def content_tokens(question: str) -> FrozenSet[str]:
+    """Non-stopword tokens, numbers included"""
+    return frozenset(_stem(token) for token in normalize_query(question).split())
+
+
+def key_tokens(question: str) -> FrozenSet[str]:
+    """
+    Numbers and names (capitalized words not starting a sentence): two
+    questions about different ones must never share an answer
+    """
+    keys = set()
+    for match in _RAW_WORD.finditer(question):
+        word = match.group()
+        before = question[:match.start()]
+        sentence_start = not before.strip() or _SENTENCE_END.search(before) is not None
+        is_name = word[0].isupper() and not sentence_start
+        if is_name or any(char.isdigit() for char in word):
+            token = normalize_text(word)
+            if token and token not in ALL_STOPWORDS:
+                keys.add(_stem(token))
+    return frozenset(keys)
+
+
+def overlap(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Jaccard overlap of two token sets"""
+    union = a | b
+    return len(a & b) / len(union) if union else 1.0
+
+
+class _Scope:
+    """One (language, mode, channel) partition: a vector matrix plus LRU bookkeeping"""
+
+    def __init__(self, capacity: int, dim: int):
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.answers: Dict[int, str] = {}
+        self.questions: Dict[int, str] = {}
+        self.tokens: Dict[int, FrozenSet[str]] = {}
+        self.keys: Dict[int, FrozenSet[str]] = {}
+        self.lru: "OrderedDict[int, None]" = OrderedDict()
+
+    def free_slot(self) -> int:
+        if len(self.lru) < len(self.vectors):
+            return len(self.lru)
+        slot, _ = self.lru.popitem(last=False)
+        return slot
+
+
+class SemanticCache:
+    """Per-language, per-mode, per-channel top-1 cosine lookup over cached questions"""
+
+    def __init__(self):
+        self.enabled = NUMPY_AVAILABLE and settings.semantic_cache_enabled
+        self.dim = settings.semantic_cache_dim
+        self.capacity = settings.semantic_cache_max_entries
+        self.threshold = settings.semantic_cache_threshold
+        self.min_overlap = settings.semantic_cache_min_overlap
+        self._scopes: Dict[Tuple[SupportedLanguage, ChatMode, OutputChannel], _Scope] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _embed(self, text: str) -> "np.ndarray":
+        # Stopwords dropped first so phrasing ("what is the cause of") matters less than topic
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for index, weight in hashed_ngram_features(normalize_query(text), self.dim).items():
+            vector[index] = weight
+        return vector
+
+    def _match(
+        self,
+        scope: _Scope,
+        vector: "np.ndarray",
+        tokens: FrozenSet[str],
+        keys: FrozenSet[str]
+    ) -> Tuple[Optional[int], float]:
+        """
+        Slot of the most similar cached question, and its similarity. A match
+        shares most content words and exactly the same numbers and names.
+        """
+        # Rows are unit vectors, so the dot product is the cosine similarity
+        similarities = scope.vectors[:len(scope.lru)] @ vector
+        best = int(similarities.argmax())
+        if (
+            similarities[best] < self.threshold
+            or scope.keys[best] != keys
+            or overlap(scope.tokens[best], tokens) < self.min_overlap
+        ):
+            return None, float(similarities[best])
+        return best, float(similarities[best])
+
+    def lookup(
+        self,
+        question: str,
+        language: SupportedLanguage,
+        mode: ChatMode,
+        channel: OutputChannel = OutputChannel.TEXT
+    ) -> Optional[str]:
+        """
+        Find the answer to the most similar cached question.
+        Spoken and on-screen answers are cached apart since their budgets differ.
+
+        Returns:
+            Cached answer if the best match clears the similarity threshold
+        """
+        scope = self._scopes.get((language, mode, channel))
+        if scope is None or not scope.lru:
+            self.misses += 1
+            return None
+
+        best, similarity = self._match(
+            scope, self._embed(question), content_tokens(question), key_tokens(question)
+        )
+        if best is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        scope.lru.move_to_end(best)
+        logger.info(
+            f"🧠 Semantic cache hit ({similarity:.2f}): "
+            f"'{question[:50]}' ~ '{scope.questions[best][:50]}'"
+        )
+        return scope.answers[best]
+
+    def store(
+        self,
+        question: str,
+        answer: str,
+        language: SupportedLanguage,
+        mode: ChatMode,
+        channel: OutputChannel = OutputChannel.TEXT
+    ):
+        """
+        Cache an answer, evicting the least recently used entry when full.
+        A question that would already hit an entry is not stored again.
+        """
+        scope = self._scopes.get((language, mode, channel))
+        if scope is None:
+            scope = self._scopes[(language, mode, channel)] = _Scope(self.capacity, self.dim)
+
+        vector = self._embed(question)
+        tokens = content_tokens(question)
+        keys = key_tokens(question)
+        if scope.lru:
+            duplicate, _ = self._match(scope, vector, tokens, keys)
+            if duplicate is not None:
+                scope.lru.move_to_end(duplicate)
+                return
+
+        if len(scope.lru) == self.capacity:
+            self.evictions += 1
+        slot = scope.free_slot()
+        scope.vectors[slot] = vector
+        scope.answers[slot] = answer
+        scope.questions[slot] = question
+        scope.tokens[slot] = tokens
+        scope.keys[slot] = keys
+        scope.lru[slot] = None
+
+    def get_stats(self) -> dict:
+        """Get entry count and hit ratio"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": sum(len(scope.lru) for scope in list(self._scopes.values())),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Singleton instance
+semantic_cache = SemanticCache()
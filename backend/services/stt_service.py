@@ -3,12 +3,19 @@ Speech-to-Text Service
 Uses OpenAI Whisper for transcribing audio in Nigerian languages.
 """
 import whisper
+import asyncio
+import contextvars
 import os
 import tempfile
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple, Optional
 
 from config import settings, SupportedLanguage
+from services.language_identifier import language_identifier
+from utils.admission import SlotLease, stt_limiter
+from utils.profiler import track_worker
+from utils.tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -19,27 +26,48 @@ class STTService:
     def __init__(self):
         self.model = None
         self._model_name = settings.whisper_model
+        # Whisper is CPU/GPU bound and not safe to share across threads; one worker
+        # keeps decodes serialized while the event loop stays free
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stt")
+    
+    async def _run(self, lease: SlotLease, func, *args, **kwargs):
+        """
+        Run a blocking Whisper call on the STT thread (with the caller's trace context).
+        
+        A decode cannot be stopped once submitted, so the caller's stt_limiter
+        slot stays held until the thread is done, even if the caller is cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        func = track_worker(func)
+        future = loop.run_in_executor(self._executor, lambda: context.run(func, *args, **kwargs))
+        lease.hold_until(future)
+        return await future
     
     def _load_model(self):
         """Lazy load Whisper model"""
         if self.model is None:
             logger.info(f"Loading Whisper model: {self._model_name}")
-            self.model = whisper.load_model(self._model_name)
+            with span("stt.load_model", model=self._model_name):
+                self.model = whisper.load_model(self._model_name)
             logger.info("Whisper model loaded successfully")
     
-    def _detect_language(self, whisper_lang: str) -> SupportedLanguage:
+    def _detect_language(self, whisper_lang: str, text: str = "") -> SupportedLanguage:
         """
         Map Whisper detected language to SupportedLanguage.
         Whisper uses ISO 639-1 codes.
+        
+        Whisper has no Pidgin and often mislabels Nigerian languages, so an
+        "en" or unsupported result is checked against the transcript text.
         """
         lang_map = {
             "ha": SupportedLanguage.HAUSA,
             "yo": SupportedLanguage.YORUBA,
             "ig": SupportedLanguage.IGBO,
-            "en": SupportedLanguage.ENGLISH,
-            # Whisper doesn't directly detect Pidgin, so we default to English
         }
-        return lang_map.get(whisper_lang, SupportedLanguage.ENGLISH)
+        if whisper_lang in lang_map:
+            return lang_map[whisper_lang]
+        return language_identifier.detect(text, SupportedLanguage.ENGLISH)
     
     async def transcribe(
         self,
@@ -56,8 +84,6 @@ class STTService:
         Returns:
             Tuple of (transcribed text, detected language)
         """
-        self._load_model()
-        
         # Save audio to temp file
         suffix = os.path.splitext(filename)[1] or ".wav"
         with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
@@ -67,16 +93,24 @@ class STTService:
         try:
             logger.info(f"Transcribing audio file: {tmp_path}")
             
-            # Transcribe with Whisper
-            result = self.model.transcribe(
-                tmp_path,
-                task="transcribe",
-                # Don't specify language - let Whisper auto-detect
-            )
+            # Whisper decodes one clip at a time; further clips queue (or are shed) here
+            async with stt_limiter.slot() as lease:
+                await self._run(lease, self._load_model)
+                
+                # Transcribe with Whisper
+                with span("stt.whisper", model=self._model_name, audio_bytes=len(audio_data)) as current:
+                    result = await self._run(
+                        lease,
+                        self.model.transcribe,
+                        tmp_path,
+                        task="transcribe",
+                        # Don't specify language - let Whisper auto-detect
+                    )
+                    current.set_attribute("whisper_language", result.get("language"))
             
             text = result["text"].strip()
             detected_lang = result.get("language", "en")
-            language = self._detect_language(detected_lang)
+            language = self._detect_language(detected_lang, text)
             
             logger.info(f"Transcribed: '{text[:100]}...' (detected: {detected_lang})")
             
@@ -103,16 +137,16 @@ class STTService:
         Returns:
             Tuple of (transcribed text, detected language)
         """
-        self._load_model()
-        
         try:
             logger.info(f"Transcribing audio file: {file_path}")
             
-            result = self.model.transcribe(file_path, task="transcribe")
+            async with stt_limiter.slot() as lease:
+                await self._run(lease, self._load_model)
+                result = await self._run(lease, self.model.transcribe, file_path, task="transcribe")
             
             text = result["text"].strip()
             detected_lang = result.get("language", "en")
-            language = self._detect_language(detected_lang)
+            language = self._detect_language(detected_lang, text)
             
             logger.info(f"Transcribed: '{text[:100]}...' (detected: {detected_lang})")
             
@@ -0,0 +1,140 @@
+"""
+Translation Memory Service
+Persistent sentence-level store of past translations so repeated content
+(advisory boilerplate, common phrases) is reused instead of re-translated.
+"""
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+import logging
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import settings, SupportedLanguage
+from utils.profiler import track_worker
+
+logger = logging.getLogger(__name__)
+
+# Sentence boundaries (kept as separators so the text can be stitched back exactly)
+_SEGMENT_BOUNDARY = re.compile(r"((?<=[.!?…])\s+|\n+)")
+
+# Keys per SELECT, well under SQLite's bound-variable limit
+_LOOKUP_CHUNK = 500
+
+
+def split_segments(text: str) -> List[str]:
+    """
+    Split text into alternating [segment, separator, segment, ...] parts.
+    "".join(parts) == text, and segments sit at even indexes.
+    """
+    return _SEGMENT_BOUNDARY.split(text)
+
+
+def segment_key(segment: str) -> str:
+    """Normalized lookup key: Unicode composition and whitespace only"""
+    return " ".join(unicodedata.normalize("NFC", segment).split())
+
+
+class TranslationMemory:
+    """SQLite-backed (source, target, sentence) -> translation store"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.translation_memory_path
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        # Queries and commits run here, one at a time, off the event loop
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="translation-memory")
+        with self._lock:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS segments (
+                    source TEXT NOT NULL,
+                    target TEXT NOT NULL,
+                    segment TEXT NOT NULL,
+                    translation TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (source, target, segment)
+                )"""
+            )
+            self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, track_worker(func), *args)
+
+    async def lookup(
+        self,
+        source: SupportedLanguage,
+        target: SupportedLanguage,
+        keys: Iterable[str]
+    ) -> Dict[str, str]:
+        """
+        Find stored translations for segment keys.
+
+        Returns:
+            Mapping of key to translation for the keys that were found
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+
+        found = await self._run(self._select, source.value, target.value, keys)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def _select(self, source: str, target: str, keys: List[str]) -> Dict[str, str]:
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), _LOOKUP_CHUNK):
+                chunk = keys[start:start + _LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT segment, translation FROM segments "
+                    f"WHERE source = ? AND target = ? AND segment IN ({placeholders})",
+                    [source, target, *chunk],
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    async def store(
+        self,
+        source: SupportedLanguage,
+        target: SupportedLanguage,
+        pairs: Iterable[Tuple[str, str]]
+    ):
+        """Save (segment key, translation) pairs"""
+        now = time.time()
+        rows = [(source.value, target.value, key, translation, now) for key, translation in pairs]
+        if not rows:
+            return
+        await self._run(self._insert, rows)
+
+    def _insert(self, rows: List[Tuple[str, str, str, str, float]]):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO segments VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def get_stats(self) -> dict:
+        """Get segment hit ratio since startup and the stored segment count"""
+        with self._lock:
+            (stored,) = self._conn.execute("SELECT COUNT(*) FROM segments").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "segments": stored,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Singleton instance
+translation_memory = TranslationMemory()
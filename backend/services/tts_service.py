@@ -3,12 +3,20 @@ Text-to-Speech Service
 Uses YarnGPT API for converting text to natural-sounding Nigerian speech.
 """
 import requests
+import asyncio
 import os
+import time
 import uuid
 import logging
 from typing import Optional
 
 from config import settings, SupportedLanguage, LANGUAGE_VOICE_MAP
+from services.audio_bank_service import audio_bank_service
+from utils.admission import OverloadedError, Priority, set_priority, tts_limiter
+from utils.deadline import time_left
+from utils.metrics import UPSTREAM_ERRORS
+from utils.profiler import track_worker
+from utils.tracing import annotate, span
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +42,7 @@ class TTSService:
     ) -> str:
         """
         Convert text to speech using YarnGPT API.
+        Fixed phrases are served from the pre-rendered audio bank first.
         
         Args:
             text: Text to convert to speech (max 2000 characters)
@@ -44,64 +53,147 @@ class TTSService:
             Path to the generated audio file
         """
         try:
+            voice = self._get_voice(language)
+            
+            # Serve fixed phrases without an upstream call
+            banked_path = audio_bank_service.lookup(text, voice)
+            annotate(voice=voice, audio_bank_hit=bool(banked_path))
+            if banked_path:
+                logger.info(f"🔊 Audio bank hit for voice {voice}")
+                return banked_path
+            
             # Generate unique filename if not provided
             if not filename:
                 filename = f"response_{uuid.uuid4().hex[:8]}"
             
             output_path = os.path.join(self.output_dir, f"{filename}.mp3")
-            voice = self._get_voice(language)
             
             logger.info(f"Synthesizing speech with YarnGPT voice: {voice}")
             logger.info(f"Text: {text[:100]}...")
             
-            # Prepare request to YarnGPT API
-            if not self.api_key:
-                raise ValueError("YarnGPT API key is not set. Please configure YARNGPT_API_KEY.")
-            
-            auth_header = self.api_key if self.api_key.startswith("Bearer ") else f"Bearer {self.api_key}"
-            
-            headers = {
-                "Authorization": auth_header,
-                "Content-Type": "application/json"
-            }
-            
-            payload = {
-                "text": text[:2000],  # YarnGPT max is 2000 characters
-                "voice": voice,
-                "response_format": "mp3"
-            }
-            
-            # Make request to YarnGPT API
-            response = requests.post(
-                self.api_url,
-                headers=headers,
-                json=payload,
-                stream=True,
-                timeout=120
-            )
-            
-            if response.status_code != 200:
-                error_msg = f"YarnGPT API error: {response.status_code}"
-                try:
-                    error_data = response.json()
-                    error_msg += f" - {error_data}"
-                except:
-                    pass
-                raise Exception(error_msg)
-            
-            # Save audio response to file
-            with open(output_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            async with tts_limiter.slot() as lease:
+                with span("tts.yarngpt", voice=voice, chars=len(text)) as current:
+                    # requests is blocking; keep the event loop free while YarnGPT renders.
+                    # The request deadline bounds the wait here and the whole download in
+                    # the thread (requests' own timeout is per read, not in total); the
+                    # slot stays held until the thread has actually stopped.
+                    left = time_left()
+                    timeout = 120 if left is None else max(left, 0.1)
+                    work = asyncio.ensure_future(asyncio.to_thread(
+                        track_worker(self._request_speech), text, voice, output_path, timeout
+                    ))
+                    lease.hold_until(work)
+                    await asyncio.wait_for(asyncio.shield(work), timeout=timeout)
+                    current.set_attribute("audio_bytes", os.path.getsize(output_path))
             
             logger.info(f"Audio saved to: {output_path}")
             
             return output_path
             
+        except OverloadedError:
+            raise
         except Exception as e:
             logger.error(f"TTS error: {str(e)}")
+            UPSTREAM_ERRORS.inc("yarngpt")
             raise
     
+    def _request_speech(self, text: str, voice: str, output_path: str, timeout: float = 120):
+        """
+        Call the YarnGPT API and stream the audio into output_path.
+        
+        Args:
+            text: Text to convert to speech
+            voice: YarnGPT voice name
+            output_path: Where to write the mp3 audio
+            timeout: Seconds allowed for the whole call, download included
+        """
+        deadline_at = time.monotonic() + timeout
+        # Prepare request to YarnGPT API
+        if not self.api_key:
+            raise ValueError("YarnGPT API key is not set. Please configure YARNGPT_API_KEY.")
+        
+        auth_header = self.api_key if self.api_key.startswith("Bearer ") else f"Bearer {self.api_key}"
+        
+        headers = {
+            "Authorization": auth_header,
+            "Content-Type": "application/json"
+        }
+        
+        payload = {
+            "text": text[:2000],  # YarnGPT max is 2000 characters
+            "voice": voice,
+            "response_format": "mp3"
+        }
+        
+        # Make request to YarnGPT API
+        response = requests.post(
+            self.api_url,
+            headers=headers,
+            json=payload,
+            stream=True,
+            timeout=timeout
+        )
+        
+        if response.status_code != 200:
+            error_msg = f"YarnGPT API error: {response.status_code}"
+            try:
+                error_data = response.json()
+                error_msg += f" - {error_data}"
+            except:
+                pass
+            raise Exception(error_msg)
+        
+        # Save audio response to file, giving up if YarnGPT trickles past the deadline
+        try:
+            with open(output_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=8192):
+                    if time.monotonic() > deadline_at:
+                        raise TimeoutError(f"YarnGPT did not finish within {timeout:.1f}s")
+                    f.write(chunk)
+        except BaseException:
+            response.close()
+            if os.path.exists(output_path):
+                os.unlink(output_path)
+            raise
+    
+    async def prerender_bank(self, force: bool = False) -> int:
+        """
+        Render every fixed phrase into the audio bank.
+        
+        Args:
+            force: Re-render phrases that are already banked
+            
+        Returns:
+            Number of phrases rendered
+        """
+        # Pre-rendering yields to live requests
+        set_priority(Priority.BACKGROUND)
+        rendered = 0
+        for language, phrases in audio_bank_service.phrases().items():
+            voice = self._get_voice(language)
+            for text in phrases:
+                if not force and audio_bank_service.lookup(text, voice, record=False):
+                    continue
+                
+                output_path = audio_bank_service.path_for(text, voice)
+                tmp_path = f"{output_path}.part"
+                try:
+                    async with tts_limiter.slot():
+                        await asyncio.to_thread(track_worker(self._request_speech), text, voice, tmp_path)
+                    os.replace(tmp_path, output_path)
+                except Exception as e:
+                    logger.error(f"Failed to pre-render '{text[:40]}' ({voice}): {e}")
+                    if os.path.exists(tmp_path):
+                        os.unlink(tmp_path)
+                    continue
+                
+                audio_bank_service.register(text, voice, language)
+                rendered += 1
+        
+        audio_bank_service.save_manifest()
+        logger.info(f"🔊 Audio bank {audio_bank_service.version}: rendered {rendered} phrases")
+        return rendered
+    
     async def get_audio_url(self, file_path: str) -> str:
         """
         Get the URL for an audio file.
@@ -113,6 +205,8 @@ class TTSService:
             URL path for accessing the audio
         """
         filename = os.path.basename(file_path)
+        if audio_bank_service.contains(file_path):
+            return f"/audio/bank/{filename}"
         return f"/audio/{filename}"
 
 
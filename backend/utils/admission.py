@@ -0,0 +1,213 @@
+"""
+Admission Control
+Per-stage concurrency limits (STT, LLM, TTS, search) with bounded, priority
+ordered wait queues. When a stage is saturated, text requests are served
+before voice and voice before background work; requests that cannot get a
+slot in time are rejected with OverloadedError, which the API turns into a
+503/429 with Retry-After.
+"""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import math
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import List, Optional, Tuple
+
+from config import settings
+from utils.deadline import time_left
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Lower values are admitted first"""
+    TEXT = 0
+    VOICE = 1
+    BACKGROUND = 2
+
+
+# Priority of the request (or background job) this context belongs to
+_priority_var: contextvars.ContextVar[Priority] = contextvars.ContextVar("priority", default=Priority.TEXT)
+
+
+def set_priority(priority: Priority):
+    """Set the admission priority for the rest of the current request or task"""
+    _priority_var.set(priority)
+
+
+class OverloadedError(Exception):
+    """A stage could not admit the request; retry after `retry_after` seconds"""
+
+    def __init__(self, stage: str, reason: str, status_code: int, retry_after: float):
+        self.stage = stage
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(f"{stage} is overloaded ({reason}), retry in {self.retry_after}s")
+
+
+class SlotLease:
+    """Handle on a held slot, yielded by StageLimiter.slot()"""
+
+    def __init__(self):
+        self.pending: Optional[asyncio.Future] = None
+
+    def hold_until(self, future: asyncio.Future):
+        """
+        Keep the slot past the end of the block until `future` is done: work
+        handed to a thread cannot be stopped by cancelling its caller, and the
+        stage is busy until it ends.
+        """
+        self.pending = future
+
+
+class StageLimiter:
+    """At most `limit` concurrent holders; up to `max_queue` waiters, best priority first"""
+
+    def __init__(self, name: str, limit: int, max_queue: int, max_wait: float):
+        """
+        Args:
+            name: Stage name for errors and metrics
+            limit: Concurrent slots
+            max_queue: Waiters allowed beyond the slots (429 beyond this)
+            max_wait: Longest a waiter may queue (503 if it would take longer)
+        """
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.in_use = 0
+        self.avg_hold = 0.0  # Moving average of how long a slot is held
+        self.admitted = 0
+        self.rejected: Counter = Counter()
+        # Heap of (priority, arrival, future); a waiter's future resolves when it is handed a slot
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._arrivals = itertools.count()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _reject(self, reason: str, status_code: int, retry_after: float) -> OverloadedError:
+        self.rejected[reason] += 1
+        logger.warning(
+            f"🚦 {self.name} rejected a request ({reason}): {self.in_use}/{self.limit} busy, {self.queued} queued"
+        )
+        return OverloadedError(self.name, reason, status_code, retry_after)
+
+    def _expected_wait(self, priority: int) -> float:
+        """Rough wait for a newcomer: the waiters it would queue behind, drained `limit` at a time"""
+        ahead = sum(1 for waiter_priority, _, _ in self._waiters if waiter_priority <= priority)
+        return (ahead // self.limit + 1) * self.avg_hold
+
+    async def acquire(self, priority: int):
+        # Nobody waits past their request's deadline
+        left = time_left()
+        max_wait = self.max_wait if left is None else min(self.max_wait, left)
+
+        if self.in_use < self.limit and not self._waiters:
+            self.in_use += 1
+            self.admitted += 1
+            return
+
+        if self.queued >= self.max_queue:
+            # A full queue sheds its least urgent, most recent waiter to make room for a more urgent one
+            victim = max(self._waiters, default=None)
+            if victim is None or victim[0] <= priority:
+                raise self._reject("queue_full", 429, self._expected_wait(priority))
+            self._waiters.remove(victim)
+            heapq.heapify(self._waiters)
+            victim[2].set_exception(self._reject("preempted", 429, self._expected_wait(victim[0])))
+
+        expected = self._expected_wait(priority)
+        if expected > max_wait:
+            raise self._reject("expected_wait", 503, expected)
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._arrivals), future)
+        heapq.heappush(self._waiters, entry)
+        try:
+            done, _ = await asyncio.wait({future}, timeout=max_wait)
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self.release()  # A slot was handed over just as the caller went away
+            else:
+                self._discard(entry)
+            raise
+        if not done:
+            self._discard(entry)
+            raise self._reject("timeout", 503, self.avg_hold or self.max_wait)
+        future.result()  # Raises if this waiter was preempted
+        self.admitted += 1
+
+    def _discard(self, entry: Tuple[int, int, asyncio.Future]):
+        entry[2].cancel()
+        if entry in self._waiters:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+
+    def release(self):
+        # Hand the slot straight to the most urgent waiter, so nobody can jump the queue
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.in_use -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one slot of this stage for the duration of the block (see SlotLease)"""
+        lease = SlotLease()
+        if not settings.admission_enabled:
+            yield lease
+            return
+        await self.acquire(_priority_var.get())
+        started = time.monotonic()
+        try:
+            yield lease
+        finally:
+            pending = lease.pending
+            if pending is not None and not pending.done():
+                pending.add_done_callback(lambda future: self._end_hold(started, future))
+            else:
+                self._end_hold(started)
+
+    def _end_hold(self, started: float, pending: Optional[asyncio.Future] = None):
+        if pending is not None and not pending.cancelled():
+            pending.exception()  # The caller is gone; don't log its error as unretrieved
+        held = time.monotonic() - started
+        self.avg_hold = held if not self.avg_hold else 0.8 * self.avg_hold + 0.2 * held
+        self.release()
+
+    def get_stats(self) -> dict:
+        return {
+            "in_use": self.in_use,
+            "limit": self.limit,
+            "queued": self.queued,
+            "avg_hold_ms": round(1000 * self.avg_hold, 1),
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+        }
+
+
+def _limiter(stage: str) -> StageLimiter:
+    return StageLimiter(
+        stage,
+        limit=settings.admission_limits[stage],
+        max_queue=settings.admission_queue_sizes[stage],
+        max_wait=settings.admission_max_wait_seconds[stage],
+    )
+
+
+# One limiter per pipeline stage
+stt_limiter = _limiter("stt")
+llm_limiter = _limiter("llm")
+tts_limiter = _limiter("tts")
+search_limiter = _limiter("search")
+LIMITERS = {limiter.name: limiter for limiter in (stt_limiter, llm_limiter, tts_limiter, search_limiter)}
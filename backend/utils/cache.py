@@ -0,0 +1,112 @@
+"""
+In-Memory Caches
+LRU cache with per-entry TTL and a stale-while-revalidate grace period.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Bounded LRU cache. Each entry is fresh until its TTL, then stale for a
+    grace period (still served while a refresh runs), then expired.
+    """
+
+    FRESH = "fresh"
+    STALE = "stale"
+    MISS = "miss"
+
+    def __init__(self, max_entries: int, default_ttl: float, stale_ttl: float = 0.0):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, float]]" = OrderedDict()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Tuple[Optional[Any], str]:
+        """
+        Look up a key.
+
+        Returns:
+            Tuple of (value or None, one of FRESH / STALE / MISS)
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, self.MISS
+
+        value, fresh_until, expires_at = entry
+        now = time.monotonic()
+        if now >= expires_at:
+            del self._entries[key]
+            self.misses += 1
+            return None, self.MISS
+
+        self._entries.move_to_end(key)
+        if now < fresh_until:
+            self.hits += 1
+            return value, self.FRESH
+
+        self.stale_hits += 1
+        return value, self.STALE
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: Optional[float] = None,
+        stale_ttl: Optional[float] = None
+    ):
+        """Store a value, evicting the least recently used entry when full"""
+        ttl = self.default_ttl if ttl is None else ttl
+        stale_ttl = self.stale_ttl if stale_ttl is None else stale_ttl
+        now = time.monotonic()
+        self._entries[key] = (value, now + ttl, now + ttl + stale_ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def fresh_remaining(self, key: Hashable) -> Optional[float]:
+        """
+        Seconds until an entry goes stale (negative once stale), or None if
+        it is missing or expired. Does not count as a lookup.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        _, fresh_until, expires_at = entry
+        now = time.monotonic()
+        if now >= expires_at:
+            return None
+        return fresh_until - now
+
+    def delete(self, key: Hashable):
+        """Remove a key if present"""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove every entry"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get_stats(self) -> dict:
+        """Get size and hit-ratio counters"""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
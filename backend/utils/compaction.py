@@ -0,0 +1,169 @@
+"""
+Search Context Compaction
+Splits search results into sentences, drops near-duplicates, ranks them
+against the query with BM25 and packs the best into a token budget,
+filling any room left with the unmatched sentences in document order.
+"""
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from utils.text import ALL_STOPWORDS, tokenize
+
+# Sentence boundary: terminal punctuation followed by whitespace, or a line break
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n+")
+
+# A digit or currency sign: short sentences with one are facts ("32°C.", "₦75,000 per bag.")
+_FIGURE = re.compile(r"[\d$€£¥₦]")
+
+# Rough chars-per-token for the N-ATLaS tokenizer on mixed Nigerian text
+CHARS_PER_TOKEN = 4
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+NEAR_DUPLICATE_JACCARD = 0.7
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate without loading a tokenizer"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into trimmed sentences, dropping fragments too short to help (unless they hold a figure)"""
+    sentences = []
+    for sentence in _SENTENCE_BOUNDARY.split(text or ""):
+        sentence = sentence.strip(" \t-•|")
+        if len(sentence.split()) >= 3 or (sentence and _FIGURE.search(sentence)):
+            sentences.append(sentence)
+    return sentences
+
+
+def _content_terms(text: str) -> List[str]:
+    terms = [token for token in tokenize(text) if token not in ALL_STOPWORDS]
+    return terms or tokenize(text)
+
+
+def bm25_scores(query: str, documents: List[List[str]]) -> List[float]:
+    """
+    Score tokenized documents against a query with Okapi BM25.
+
+    Args:
+        query: Raw query text
+        documents: Each document as a list of content terms
+
+    Returns:
+        One score per document
+    """
+    if not documents:
+        return []
+
+    query_terms = set(_content_terms(query))
+    n_docs = len(documents)
+    avg_len = sum(len(doc) for doc in documents) / n_docs or 1.0
+    doc_freq = Counter(term for doc in documents for term in set(doc))
+
+    scores = []
+    for doc in documents:
+        term_freq = Counter(doc)
+        score = 0.0
+        for term in query_terms:
+            tf = term_freq.get(term)
+            if not tf:
+                continue
+            df = doc_freq[term]
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * len(doc) / avg_len)
+            score += idf * tf * (BM25_K1 + 1) / norm
+        scores.append(score)
+    return scores
+
+
+def _jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def compact_search_results(
+    query: str,
+    results: List[Dict[str, str]],
+    answer: Optional[str] = None,
+    token_budget: int = 350
+) -> str:
+    """
+    Build a compact, relevance-ranked search context for the system prompt.
+
+    Args:
+        query: The user's search query
+        results: Provider results, each with "title" and "content"
+        answer: Optional provider-generated summary
+        token_budget: Approximate token cap for the whole context
+
+    Returns:
+        Formatted context string, or "" if nothing relevant survived
+    """
+    # (source index, position, sentence); source 0 is the provider summary
+    candidates: List[Tuple[int, int, str]] = []
+    for position, sentence in enumerate(split_sentences(answer or "")):
+        candidates.append((0, position, sentence))
+    for index, result in enumerate(results, 1):
+        for position, sentence in enumerate(split_sentences(result.get("content", ""))):
+            candidates.append((index, position, sentence))
+
+    if not candidates:
+        return ""
+
+    terms = [_content_terms(sentence) for _, _, sentence in candidates]
+    scores = bm25_scores(query, terms)
+
+    # Prefer earlier sources and earlier sentences when relevance ties. Sentences
+    # sharing no term with the query (figures that don't repeat it, or English
+    # pages for a Hausa query) come last, in document order, to fill what is left
+    order = sorted(
+        range(len(candidates)),
+        key=lambda i: (-scores[i], candidates[i][0], candidates[i][1]),
+    )
+
+    header = "Web Search Results:\n\n"
+    used_tokens = estimate_tokens(header)
+    kept: List[int] = []
+    kept_terms: List[set] = []
+    titled_sources = set()
+    for i in order:
+        source, _, sentence = candidates[i]
+        term_set = set(terms[i])
+        if any(_jaccard(term_set, other) >= NEAR_DUPLICATE_JACCARD for other in kept_terms):
+            continue
+
+        cost = estimate_tokens(sentence) + 1
+        if source and source not in titled_sources:
+            cost += estimate_tokens(results[source - 1].get("title", "")) + 2
+        if used_tokens + cost > token_budget:
+            continue
+
+        used_tokens += cost
+        kept.append(i)
+        kept_terms.append(term_set)
+        if source:
+            titled_sources.add(source)
+
+    if not kept:
+        return ""
+
+    # Re-group the chosen sentences by source, in reading order
+    by_source: Dict[int, List[Tuple[int, str]]] = {}
+    for i in kept:
+        source, position, sentence = candidates[i]
+        by_source.setdefault(source, []).append((position, sentence))
+
+    formatted = header
+    if 0 in by_source:
+        summary = " ".join(sentence for _, sentence in sorted(by_source.pop(0)))
+        formatted += f"Summary: {summary}\n\n"
+    for number, source in enumerate(sorted(by_source), 1):
+        title = results[source - 1].get("title", "No title")
+        text = " ".join(sentence for _, sentence in sorted(by_source[source]))
+        formatted += f"{number}. {title}: {text}\n\n"
+    return formatted
@@ -0,0 +1,59 @@
+"""
+Request Deadlines
+A latency budget for one request, carried in a contextvar so every stage can
+see how much time is left. Optional stages check it and step aside (skip
+search, shorten the answer, return text without audio); each such step is
+recorded so the response can say what was left out.
+"""
+import contextvars
+import logging
+import time
+from typing import List, Optional
+
+from utils.metrics import DEGRADATIONS
+from utils.tracing import annotate
+
+logger = logging.getLogger(__name__)
+
+
+class Deadline:
+    """Absolute deadline plus the degradations taken to meet it"""
+
+    def __init__(self, seconds: float):
+        self.budget = seconds
+        self.at = time.monotonic() + seconds
+        self.degradations: List[str] = []
+
+    def remaining(self) -> float:
+        return max(0.0, self.at - time.monotonic())
+
+
+_deadline_var: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("deadline", default=None)
+
+
+def start_deadline(seconds: float) -> Deadline:
+    """Give the rest of the current request `seconds` to finish"""
+    deadline = Deadline(seconds)
+    _deadline_var.set(deadline)
+    return deadline
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _deadline_var.get()
+
+
+def time_left() -> Optional[float]:
+    """Seconds left for the current request, or None if it has no deadline"""
+    deadline = _deadline_var.get()
+    return deadline.remaining() if deadline is not None else None
+
+
+def degrade(what: str):
+    """Record that an optional step was skipped or cut short to meet the deadline"""
+    deadline = _deadline_var.get()
+    if deadline is None or what in deadline.degradations:
+        return
+    deadline.degradations.append(what)
+    DEGRADATIONS.inc(what)
+    annotate(degraded=",".join(deadline.degradations))
+    logger.warning(f"⏳ Degraded ({what}) with {deadline.remaining():.1f}s of {deadline.budget:.0f}s left")
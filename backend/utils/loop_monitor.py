@@ -0,0 +1,141 @@
+"""
+Event-Loop Lag Monitor
+A heartbeat coroutine measures how late the event loop wakes it (lag).
+A watchdog thread notices when the heartbeat stops and captures the loop
+thread's stack, so blocking calls are attributed to the line that made them.
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from config import settings, BASE_DIR
+from utils.timing import Histogram
+
+logger = logging.getLogger(__name__)
+
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Frames inside these paths are libraries; the offender is the innermost frame outside them
+_LIBRARY_MARKERS = (os.sep + "site-packages" + os.sep, os.sep + "dist-packages" + os.sep, os.sep + "lib" + os.sep + "python")
+
+
+def _offending_site(stack: List[traceback.FrameSummary]) -> str:
+    """Innermost frame in our own code (falls back to the innermost frame)"""
+    for frame in reversed(stack):
+        if frame.filename.startswith(BASE_DIR) and not any(marker in frame.filename for marker in _LIBRARY_MARKERS):
+            return f"{os.path.relpath(frame.filename, BASE_DIR)}:{frame.lineno} {frame.name}"
+    frame = stack[-1]
+    return f"{frame.filename}:{frame.lineno} {frame.name}"
+
+
+class LoopMonitor:
+    """Continuous lag measurement plus stall stack capture for one event loop"""
+
+    def __init__(self, interval: float = 0.05, stall_threshold: float = 0.1, recent_stalls: int = 20):
+        """
+        Args:
+            interval: Seconds between heartbeats
+            stall_threshold: Heartbeat silence (beyond the interval) that counts as a stall
+            recent_stalls: How many captured stacks to keep
+        """
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.lag = Histogram(LAG_BUCKETS)
+        self._recent_lags: Deque[float] = deque(maxlen=2000)
+        self.stalls = 0
+        # Call site -> (stall count, total seconds blocked)
+        self.offenders: Dict[str, Tuple[int, float]] = {}
+        self.recent: Deque[dict] = deque(maxlen=recent_stalls)
+
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = 0.0
+        self._pending_stall: Optional[dict] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Start monitoring the running loop (call from inside it)"""
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        threading.Thread(target=self._watchdog, name="loop-watchdog", daemon=True).start()
+        logger.info(f"⏱️ Loop monitor started (stall threshold {1000 * self.stall_threshold:.0f} ms)")
+
+    def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._last_beat = now
+            self.lag.observe(lag)
+            self._recent_lags.append(lag)
+
+            # The watchdog caught this stall's stack; now we know how long it lasted
+            stall, self._pending_stall = self._pending_stall, None
+            if stall is not None:
+                self._finish_stall(stall, lag)
+
+    def _watchdog(self):
+        check_every = max(self.stall_threshold / 2, 0.01)
+        while not self._stop.wait(check_every):
+            silent_for = time.monotonic() - self._last_beat - self.interval
+            if silent_for < self.stall_threshold or self._pending_stall is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)
+            self._pending_stall = {
+                "site": _offending_site(stack),
+                "stack": traceback.format_list(stack[-12:]),
+                "detected_at": time.time(),
+            }
+
+    def _finish_stall(self, stall: dict, lag: float):
+        self.stalls += 1
+        count, total = self.offenders.get(stall["site"], (0, 0.0))
+        self.offenders[stall["site"]] = (count + 1, total + lag)
+        stall["blocked_ms"] = round(1000 * lag, 1)
+        self.recent.append(stall)
+        logger.warning(
+            f"Event loop blocked for {stall['blocked_ms']:.0f} ms at {stall['site']}\n"
+            + "".join(stall["stack"])
+        )
+
+    def get_stats(self, top: int = 10) -> dict:
+        """Lag percentiles, worst call sites and the latest captured stacks"""
+        recent = sorted(self._recent_lags)
+
+        def pct(q):
+            return round(1000 * recent[min(len(recent) - 1, int(q * len(recent)))], 2) if recent else 0.0
+
+        offenders = sorted(self.offenders.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        return {
+            "lag_ms": {"p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99), "max": pct(1.0)},
+            "stalls": self.stalls,
+            "top_offenders": [
+                {"site": site, "stalls": count, "blocked_ms": round(1000 * total, 1)}
+                for site, (count, total) in offenders
+            ],
+            "recent_stalls": list(self.recent),
+        }
+
+
+# Singleton instance (started from the app lifespan)
+loop_monitor = LoopMonitor(
+    interval=settings.loop_monitor_interval_seconds,
+    stall_threshold=settings.loop_monitor_stall_threshold_seconds,
+)
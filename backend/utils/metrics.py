@@ -0,0 +1,195 @@
+"""
+Prometheus Metrics
+Minimal counters and gauges rendered in the Prometheus text format.
+Updates are lock-free: each thread writes its own shard (the event loop and
+the search/TTS worker threads never contend) and a scrape sums the shards.
+"""
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from utils.timing import Histogram, stage_histograms
+
+LabelValues = Tuple[str, ...]
+
+
+class _Sharded:
+    """Per-thread {label values: number} dicts, summed when read"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[Dict[LabelValues, float]] = []
+        self._register_lock = threading.Lock()  # Taken once per thread, not per update
+
+    def _shard(self) -> Dict[LabelValues, float]:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = {}
+            with self._register_lock:
+                self._shards.append(values)
+            return values
+
+    def add(self, labels: LabelValues, amount: float):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def collect(self) -> Dict[LabelValues, float]:
+        totals: Dict[LabelValues, float] = {}
+        for shard in list(self._shards):
+            # dict.items() is copied in one step, so concurrent writers cannot break it
+            for labels, value in list(shard.items()):
+                totals[labels] = totals.get(labels, 0.0) + value
+        return totals
+
+
+class Metric:
+    """Base class: name, help text, label names and the exposition format"""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> Dict[LabelValues, float]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for labels, value in sorted(self.samples().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    """Monotonic counter"""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values = _Sharded()
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        self._values.add(labels, amount)
+
+    def samples(self) -> Dict[LabelValues, float]:
+        return self._values.collect()
+
+
+class Gauge(Counter):
+    """Up/down gauge (e.g. requests in flight)"""
+
+    type = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self._values.add(labels, -amount)
+
+
+class CallbackMetric(Metric):
+    """Metric whose samples are computed at scrape time (cache stats, disk usage)"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        callback: Callable[[], Dict[LabelValues, float]],
+        type: str = "gauge"
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+        self.type = type
+
+    def samples(self) -> Dict[LabelValues, float]:
+        return self.callback()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: LabelValues) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _render_histogram(name: str, documentation: str, label: str, histograms: Dict[str, Histogram]) -> List[str]:
+    """Render per-bucket histograms with Prometheus' cumulative le buckets"""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} histogram"]
+    for key, histogram in sorted(histograms.items()):
+        cumulative = 0
+        for upper, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+            cumulative += count
+            le = "+Inf" if upper == float("inf") else repr(upper)
+            lines.append(f'{name}_bucket{{{label}="{key}",le="{le}"}} {cumulative}')
+        lines.append(f'{name}_sum{{{label}="{key}"}} {histogram.sum!r}')
+        lines.append(f'{name}_count{{{label}="{key}"}} {histogram.count}')
+    return lines
+
+
+# Registered metrics, in exposition order
+REGISTRY: List[Metric] = []
+
+# Histogram families: (name, help, label, {label value: Histogram})
+HISTOGRAMS: List[Tuple[str, str, str, Dict[str, Histogram]]] = []
+
+
+def register(metric: Metric) -> Metric:
+    REGISTRY.append(metric)
+    return metric
+
+
+def register_histograms(name: str, documentation: str, label: str, histograms: Dict[str, Histogram]):
+    """Expose a family of Histogram objects that are updated elsewhere"""
+    HISTOGRAMS.append((name, documentation, label, histograms))
+
+
+def render_metrics() -> str:
+    """Everything in the Prometheus text exposition format"""
+    lines: List[str] = []
+    for family in HISTOGRAMS:
+        lines.extend(_render_histogram(*family))
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+register_histograms(
+    "sautina_stage_duration_seconds", "Duration of each pipeline stage", "stage", stage_histograms
+)
+
+
+# Hot-path metrics shared by the services
+HTTP_IN_FLIGHT = register(Gauge(
+    "sautina_http_requests_in_flight", "HTTP requests currently being handled", ["route"]
+))
+HTTP_REQUESTS = register(Counter(
+    "sautina_http_requests_total", "HTTP requests handled", ["route", "status"]
+))
+UPSTREAM_ERRORS = register(Counter(
+    "sautina_upstream_errors_total", "Failed calls to upstream services", ["provider"]
+))
+LLM_TOKENS = register(Counter(
+    "sautina_llm_tokens_total", "N-ATLaS tokens reported in response usage", ["purpose", "kind"]
+))
+DEGRADATIONS = register(Counter(
+    "sautina_degradations_total", "Optional steps skipped or cut short to meet a request deadline", ["kind"]
+))
+
+
+def record_llm_usage(usage: Optional[object], purpose: str):
+    """Count prompt/completion tokens from an OpenAI-style usage object"""
+    if usage is None:
+        return
+    LLM_TOKENS.inc(purpose, "prompt", amount=getattr(usage, "prompt_tokens", 0) or 0)
+    LLM_TOKENS.inc(purpose, "completion", amount=getattr(usage, "completion_tokens", 0) or 0)
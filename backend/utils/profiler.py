@@ -0,0 +1,260 @@
+"""
+On-Demand Request Profiler
+A statistical sampler for single requests. While a request is profiled, a
+sampler thread snapshots the stacks of the threads doing its work - the event
+loop whenever one of the request's tasks is running, and any worker thread
+running a call handed off with track_worker() - and writes them as collapsed
+stacks (flamegraph.pl / speedscope / inferno) into a bounded directory.
+"""
+import asyncio
+import contextvars
+import hmac
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import weakref
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional
+
+from config import settings, BASE_DIR
+
+logger = logging.getLogger(__name__)
+
+MAX_STACK_DEPTH = 128
+
+# The profile of the request this context belongs to (inherited by the tasks it creates)
+_profile_var: contextvars.ContextVar[Optional["Profile"]] = contextvars.ContextVar("profile", default=None)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(BASE_DIR):
+        filename = os.path.relpath(filename, BASE_DIR)
+    else:
+        filename = os.sep.join(filename.split(os.sep)[-2:])
+    return f"{code.co_name} ({filename}:{frame.f_lineno})"
+
+
+def _collapse(thread_name: str, frame) -> str:
+    """Root-to-leaf "thread;frame;frame" line for one sampled stack"""
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.append(thread_name)
+    return ";".join(reversed(labels))
+
+
+class Profile:
+    """Samples gathered for one request"""
+
+    def __init__(self, request_id: str, label: str, trigger: str):
+        self.request_id = request_id
+        self.label = label
+        self.trigger = trigger
+        self.started = time.monotonic()
+        self.filename = "{}-{}-{}.collapsed".format(
+            datetime.now().strftime("%Y%m%d-%H%M%S"),
+            re.sub(r"[^A-Za-z0-9]+", "-", request_id)[:32],
+            re.sub(r"[^A-Za-z0-9]+", "-", label).strip("-") or "root",
+        )
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.truncated = False
+        # Tasks created under this request, and worker threads currently running its calls
+        self.tasks: "weakref.WeakSet[asyncio.Task]" = weakref.WeakSet()
+        self.threads: Dict[int, str] = {}
+        self._done = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+
+class RequestProfiler:
+    """Decides which requests to profile and runs a sampler thread for each"""
+
+    def __init__(
+        self,
+        interval: float = 0.005,
+        max_seconds: float = 30.0,
+        max_concurrent: int = 1,
+        output_dir: str = os.path.join(BASE_DIR, "logs", "profiles"),
+        max_files: int = 100,
+        max_bytes: int = 50 * 1024 * 1024,
+    ):
+        """
+        Args:
+            interval: Seconds between samples
+            max_seconds: Sampling stops after this long even if the request is still running
+            max_concurrent: Profiles allowed at once; further triggers are ignored
+            output_dir: Where collapsed stack files go
+            max_files: Oldest files are deleted beyond this many
+            max_bytes: ... or beyond this total size
+        """
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.max_concurrent = max_concurrent
+        self.output_dir = output_dir
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def install(self):
+        """Track task ownership on the running loop (call from inside it)"""
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        self._loop_thread_id = threading.get_ident()
+        previous = loop.get_task_factory()
+
+        def task_factory(loop, coro, **kwargs):
+            if previous is not None:
+                task = previous(loop, coro, **kwargs)
+            else:
+                task = asyncio.Task(coro, loop=loop, **kwargs)
+            profile = _profile_var.get()
+            if profile is not None:
+                profile.tasks.add(task)
+            return task
+
+        loop.set_task_factory(task_factory)
+        logger.info(f"🔬 Request profiling available (output: {self.output_dir})")
+
+    def trigger(self, header_token: str) -> Optional[str]:
+        """Why this request should be profiled ("header" or "sampled"), or None"""
+        if self._loop is None:
+            return None
+        token = settings.profiling_token
+        if header_token and token and hmac.compare_digest(header_token, token):
+            return "header"
+        if settings.profiling_sample_rate > 0 and random.random() < settings.profiling_sample_rate:
+            return "sampled"
+        return None
+
+    def start(self, request_id: str, label: str, trigger: str) -> Optional[Profile]:
+        """Start profiling the current task, unless the concurrency cap is reached"""
+        with self._lock:
+            if self._active >= self.max_concurrent:
+                logger.info(f"Profile of {label} skipped: {self._active} already running")
+                return None
+            self._active += 1
+
+        profile = Profile(request_id, label, trigger)
+        profile.tasks.add(asyncio.current_task())
+        profile._sampler = threading.Thread(
+            target=self._sample, args=(profile,), name="profiler", daemon=True
+        )
+        profile._sampler.start()
+        return profile
+
+    def _sample(self, profile: Profile):
+        while not profile._done.wait(self.interval):
+            if time.monotonic() - profile.started > self.max_seconds:
+                profile.truncated = True
+                break
+            frames = sys._current_frames()
+
+            # The loop thread only counts while it runs one of this request's tasks
+            task = asyncio.current_task(self._loop)
+            if task is not None and task in profile.tasks:
+                frame = frames.get(self._loop_thread_id)
+                if frame is not None:
+                    profile.stacks[_collapse("event-loop", frame)] += 1
+                    profile.samples += 1
+
+            for thread_id, thread_name in dict(profile.threads).items():
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    profile.stacks[_collapse(thread_name, frame)] += 1
+                    profile.samples += 1
+
+    def finish(self, profile: Profile) -> Optional[str]:
+        """Stop sampling and write the collapsed stacks; returns the file path (blocking)"""
+        profile._done.set()
+        profile._sampler.join()
+        with self._lock:
+            self._active -= 1
+
+        elapsed_ms = 1000 * (time.monotonic() - profile.started)
+        if not profile.stacks:
+            logger.info(f"Profile of {profile.label} took no samples ({elapsed_ms:.0f} ms)")
+            return None
+
+        body = "".join(f"{stack} {count}\n" for stack, count in profile.stacks.most_common())
+        path = os.path.join(self.output_dir, profile.filename)
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            self._prune(len(body.encode("utf-8")))
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(body)
+        except OSError as e:
+            logger.warning(f"Could not save profile of {profile.label}: {e}")
+            return None
+
+        logger.info(
+            f"🔬 Profile of {profile.label} ({profile.trigger}): {profile.samples} samples over "
+            f"{elapsed_ms:.0f} ms{' (truncated)' if profile.truncated else ''} -> {path}"
+        )
+        return path
+
+    def _prune(self, incoming: int):
+        """Delete the oldest profiles until the new one fits under both caps"""
+        files = []
+        for name in os.listdir(self.output_dir):
+            if name.endswith(".collapsed"):
+                path = os.path.join(self.output_dir, name)
+                stat = os.stat(path)
+                files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+
+        total = sum(size for _, size, _ in files) + incoming
+        while files and (len(files) >= self.max_files or total > self.max_bytes):
+            _, size, path = files.pop(0)
+            os.unlink(path)
+            total -= size
+
+
+def track_worker(func):
+    """
+    Wrap a callable about to be handed to a thread pool so that, if the current
+    request is being profiled, the worker thread is sampled while it runs it.
+    Returns func unchanged otherwise.
+    """
+    profile = _profile_var.get()
+    if profile is None:
+        return func
+
+    def run(*args, **kwargs):
+        thread_id = threading.get_ident()
+        profile.threads[thread_id] = threading.current_thread().name
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.threads.pop(thread_id, None)
+
+    return run
+
+
+def set_profile(profile: Profile) -> contextvars.Token:
+    return _profile_var.set(profile)
+
+
+def reset_profile(token: contextvars.Token):
+    _profile_var.reset(token)
+
+
+# Singleton instance (installed from the app lifespan when profiling is enabled)
+request_profiler = RequestProfiler(
+    interval=settings.profiling_interval_seconds,
+    max_seconds=settings.profiling_max_seconds,
+    max_concurrent=settings.profiling_max_concurrent,
+    output_dir=settings.profiling_dir,
+    max_files=settings.profiling_max_files,
+    max_bytes=settings.profiling_max_mb * 1024 * 1024,
+)
@@ -0,0 +1,113 @@
+"""
+Text Normalization Utilities
+Shared normalization for cache keys and matching across the five supported languages.
+"""
+import re
+import unicodedata
+from typing import List
+
+
+# Letters with no Unicode decomposition that should still fold to ASCII
+_FOLD_MAP = str.maketrans({
+    "ƙ": "k", "Ƙ": "k",
+    "ɓ": "b", "Ɓ": "b",
+    "ɗ": "d", "Ɗ": "d",
+    "ƴ": "y", "Ƴ": "y",
+    "’": "'", "‘": "'",
+})
+
+_PUNCTUATION = re.compile(r"[^\w\s']+|(?<!\w)'|'(?!\w)")
+
+# Function words in each language (diacritic-folded, lowercase)
+STOPWORDS = {
+    "en": {
+        "a", "an", "the", "is", "are", "was", "be", "of", "in", "on", "at", "for",
+        "to", "and", "or", "what", "whats", "what's", "please", "me", "tell", "about",
+        "can", "you", "i", "do", "does", "it", "this", "that", "with", "by",
+    },
+    "pcm": {
+        "wetin", "dey", "na", "abeg", "di", "de", "make", "go", "don", "una", "wey",
+        "sef", "o", "oh", "abi", "for",
+    },
+    "ha": {
+        "na", "da", "a", "ne", "ce", "shi", "ta", "su", "mene", "menene", "ina",
+        "don", "kuma", "ko", "wa", "ga", "cikin",
+    },
+    "yo": {
+        "ni", "ti", "ati", "fun", "naa", "se", "ki", "kini", "je", "si", "o", "won",
+        "mi", "wa", "e", "jowo",
+    },
+    "ig": {
+        "na", "nke", "bu", "ka", "ndi", "gi", "m", "o", "ya", "biko", "gini", "maka",
+        "di",
+    },
+}
+
+ALL_STOPWORDS = set().union(*STOPWORDS.values())
+
+
+class _FoldTable(dict):
+    """
+    str.translate table that folds each character on first sight and keeps
+    the result, so repeat text skips Unicode decomposition entirely. Folding
+    works per character (every combining mark is dropped), so this matches
+    folding the whole string at once.
+    """
+
+    max_entries = 4096
+
+    def __missing__(self, codepoint: int) -> str:
+        decomposed = unicodedata.normalize("NFKD", chr(codepoint).translate(_FOLD_MAP))
+        folded = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+        if len(self) < self.max_entries:
+            self[codepoint] = folded
+        return folded
+
+
+_FOLD_TABLE = _FoldTable()
+
+
+def fold_diacritics(text: str) -> str:
+    """
+    Strip tone marks and under-dots (Yoruba/Igbo) and hooked letters (Hausa).
+    "Ẹ kú àárọ̀" -> "E ku aaro", "ƙasa" -> "kasa"
+    """
+    return text.translate(_FOLD_TABLE)
+
+
+def normalize_text(text: str, strip_diacritics: bool = True) -> str:
+    """
+    Normalize text for matching: case, whitespace, punctuation and
+    (optionally) diacritics.
+
+    Args:
+        text: Raw text in any supported language
+        strip_diacritics: Fold diacritics to plain letters
+
+    Returns:
+        Lowercase, single-spaced text with punctuation removed
+    """
+    # Plain ASCII (most English and Pidgin input) needs no Unicode work
+    if not text.isascii():
+        if strip_diacritics:
+            text = fold_diacritics(text)
+        else:
+            text = unicodedata.normalize("NFC", text.translate(_FOLD_MAP))
+    text = _PUNCTUATION.sub(" ", text.casefold())
+    return " ".join(text.split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Split normalized text into word tokens"""
+    return normalize_text(text).split()
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalize a search query into a cache key: diacritics folded and
+    stopwords in all five languages removed.
+    """
+    tokens = tokenize(text)
+    content = [token for token in tokens if token not in ALL_STOPWORDS]
+    # A query made only of stopwords still needs a key
+    return " ".join(content or tokens)
@@ -0,0 +1,111 @@
+"""
+Per-Request Stage Timing
+Stages (stt, intent, search, llm, tts, ...) are timed with a context manager.
+Durations go into the current request's collector (a context variable, so
+services need no extra arguments) and into process-wide histograms. Each
+stage is also a tracing span.
+"""
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from utils.tracing import span
+
+# Upper bounds in seconds; covers cache hits through slow cold LLM/TTS calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0)
+
+# Stage name -> milliseconds for the request being handled (None outside a request)
+_current: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_timings", default=None)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (Prometheus bucket bounds, per-bucket counts)"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside its bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for upper, count in zip(self.buckets, self.counts):
+            if count and seen + count >= rank:
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = upper
+        return self.buckets[-1]
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(1000 * self.sum / self.count, 1) if self.count else 0.0,
+            "p50_ms": round(1000 * self.quantile(0.5), 1),
+            "p95_ms": round(1000 * self.quantile(0.95), 1),
+        }
+
+
+# Stage name -> histogram of durations in seconds, across all requests
+stage_histograms: Dict[str, Histogram] = {}
+
+
+def start_request() -> object:
+    """Begin collecting timings for a request; pass the token to end_request()"""
+    return _current.set({})
+
+
+def end_request(token: object):
+    _current.reset(token)
+
+
+def current_timings() -> Optional[Dict[str, float]]:
+    """Stage durations (ms) recorded so far in this request, or None outside one"""
+    return _current.get()
+
+
+def record(name: str, seconds: float):
+    """Add a measured duration to the request collector and the stage histogram"""
+    timings = _current.get()
+    if timings is not None:
+        # Repeated stages (e.g. two N-ATLaS calls) add up
+        timings[name] = timings.get(name, 0.0) + seconds * 1000
+    histogram = stage_histograms.get(name)
+    if histogram is None:
+        histogram = stage_histograms[name] = Histogram()
+    histogram.observe(seconds)
+
+
+@contextmanager
+def stage(name: str, **attributes: Any) -> Iterator[Any]:
+    """Time a block of work as one pipeline stage; yields its tracing span"""
+    start = time.perf_counter()
+    try:
+        with span(name, **attributes) as current:
+            yield current
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def server_timing_header(timings: Dict[str, float], total_ms: Optional[float] = None) -> str:
+    """Format timings as a Server-Timing header value"""
+    entries: List[str] = [f"{name};dur={ms:.1f}" for name, ms in timings.items()]
+    if total_ms is not None:
+        entries.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(entries)
+
+
+def get_stage_stats() -> Dict[str, dict]:
+    """Per-stage count, mean and estimated p50/p95 since startup"""
+    return {name: histogram.summary() for name, histogram in sorted(stage_histograms.items())}
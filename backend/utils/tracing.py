@@ -0,0 +1,241 @@
+"""
+Request Tracing
+A context-propagated request id for logs, plus sampled spans around the
+pipeline stages exported to a JSONL file or an OTLP/HTTP collector.
+Unsampled requests get a shared no-op span, so tracing that is off costs
+one context-variable read per span.
+"""
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Request id for log lines; "-" outside a request
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+# Trace id of the current request if it was sampled, else None
+_trace_id: ContextVar[Optional[str]] = ContextVar("trace_id", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed operation within a trace"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Stand-in for spans of unsampled requests"""
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class JsonlExporter:
+    """Append finished spans to a local JSON-lines file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def export(self, spans: List[Span]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n")
+
+
+class OTLPExporter:
+    """Send finished spans to an OpenTelemetry collector over OTLP/HTTP (JSON encoding)"""
+
+    def __init__(self, endpoint: str, service_name: str):
+        self.url = f"{endpoint.rstrip('/')}/v1/traces"
+        self.service_name = service_name
+
+    @staticmethod
+    def _attribute(key: str, value: Any) -> dict:
+        if isinstance(value, bool):
+            return {"key": key, "value": {"boolValue": value}}
+        if isinstance(value, int):
+            return {"key": key, "value": {"intValue": str(value)}}
+        if isinstance(value, float):
+            return {"key": key, "value": {"doubleValue": value}}
+        return {"key": key, "value": {"stringValue": str(value)}}
+
+    def _otlp_span(self, span: Span) -> dict:
+        otlp = {
+            # OTLP wants 16-byte trace ids and 8-byte span ids, hex encoded
+            "traceId": span.trace_id.ljust(32, "0"),
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": [self._attribute(k, v) for k, v in span.attributes.items()],
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+        }
+        if span.parent_id:
+            otlp["parentSpanId"] = span.parent_id
+        return otlp
+
+    def export(self, spans: List[Span]):
+        import requests
+
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [self._attribute("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "sautina"},
+                    "spans": [self._otlp_span(span) for span in spans],
+                }],
+            }]
+        }
+        response = requests.post(self.url, json=payload, timeout=5)
+        if response.status_code >= 400:
+            raise Exception(f"OTLP collector returned {response.status_code}")
+
+
+class _ExportWorker:
+    """Background thread that batches finished spans so exporting never blocks the event loop"""
+
+    def __init__(self, exporter, batch_size: int = 256, flush_interval: float = 2.0):
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: "queue.Queue[Span]" = queue.Queue(maxsize=10000)
+        self.dropped = 0
+        threading.Thread(target=self._run, name="trace-export", daemon=True).start()
+
+    def submit(self, span: Span):
+        try:
+            self.queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self.exporter.export(batch)
+            except Exception as e:
+                logger.warning(f"Trace export failed ({len(batch)} spans dropped): {e}")
+
+
+def _create_worker() -> Optional[_ExportWorker]:
+    if settings.tracing_sample_rate <= 0:
+        return None
+    if settings.tracing_exporter == "otlp":
+        exporter = OTLPExporter(settings.tracing_otlp_endpoint, settings.tracing_service_name)
+    else:
+        exporter = JsonlExporter(settings.tracing_jsonl_path)
+    return _ExportWorker(exporter)
+
+
+_worker = _create_worker()
+
+
+def start_request(request_id: Optional[str] = None) -> tuple:
+    """
+    Set the request id and make the sampling decision for a new request.
+
+    Returns:
+        Tokens to pass to end_request()
+    """
+    request_id = request_id or uuid.uuid4().hex[:16]
+    sampled = _worker is not None and random.random() < settings.tracing_sample_rate
+    trace_id = uuid.uuid4().hex if sampled else None
+    return request_id_var.set(request_id), _trace_id.set(trace_id)
+
+
+def end_request(tokens: tuple):
+    request_token, trace_token = tokens
+    _trace_id.reset(trace_token)
+    request_id_var.reset(request_token)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    Trace a block of work. Yields an object with set_attribute();
+    for unsampled requests it is a no-op.
+    """
+    trace_id = _trace_id.get()
+    if trace_id is None:
+        yield NOOP_SPAN
+        return
+
+    parent = _current_span.get()
+    attributes["request_id"] = request_id_var.get()
+    current = Span(name, trace_id, parent.span_id if parent else None, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+        _worker.submit(current)
+
+
+def annotate(**attributes: Any):
+    """Add attributes to the innermost open span (e.g. the request's language and intent)"""
+    current = _current_span.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+class RequestIdFilter(logging.Filter):
+    """Adds %(request_id)s to every log record"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
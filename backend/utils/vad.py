@@ -0,0 +1,86 @@
+"""
+Voice Activity Detection
+A small energy-based detector for live microphone audio (16-bit mono PCM).
+Each frame's level is compared with a noise floor tracked while nobody is
+speaking; a run of loud frames starts an utterance, a run of quiet frames
+ends it.
+"""
+import math
+import sys
+from array import array
+from typing import Optional
+
+SPEECH_START = "start"
+SPEECH_END = "end"
+
+
+def frame_level(frame: bytes) -> float:
+    """RMS level of a little-endian 16-bit PCM frame in dBFS (-120 for silence)"""
+    samples = array("h", frame)
+    if sys.byteorder == "big":
+        samples.byteswap()
+    if not samples:
+        return -120.0
+    rms = math.sqrt(sum(s * s for s in samples) / len(samples))
+    return 20 * math.log10(rms / 32768) if rms else -120.0
+
+
+class EnergyVAD:
+    """Turns a stream of fixed-size frames into speech start/end events"""
+
+    def __init__(
+        self,
+        sample_rate: int,
+        frame_ms: int,
+        threshold_db: float,
+        min_level_dbfs: float,
+        start_ms: int,
+        silence_ms: int,
+    ):
+        """
+        Args:
+            sample_rate: Samples per second of the incoming audio
+            frame_ms: Frame length fed to process()
+            threshold_db: How far above the noise floor counts as voiced
+            min_level_dbfs: Frames quieter than this are never voiced
+            start_ms: Voiced audio needed to start an utterance
+            silence_ms: Unvoiced audio needed to end one
+        """
+        self.frame_bytes = sample_rate * frame_ms // 1000 * 2
+        self.threshold_db = threshold_db
+        self.min_level_dbfs = min_level_dbfs
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.silence_frames = max(1, silence_ms // frame_ms)
+        self.noise_floor = min_level_dbfs
+        self.speaking = False
+        self._voiced = 0
+        self._unvoiced = 0
+
+    def process(self, frame: bytes) -> Optional[str]:
+        """Feed one frame; returns SPEECH_START, SPEECH_END or None"""
+        level = frame_level(frame)
+        voiced = level > max(self.noise_floor + self.threshold_db, self.min_level_dbfs)
+
+        if not self.speaking:
+            if not voiced:
+                # Follow the background level, but only while nobody is talking
+                self.noise_floor = 0.95 * self.noise_floor + 0.05 * level
+            self._voiced = self._voiced + 1 if voiced else 0
+            if self._voiced >= self.start_frames:
+                self.speaking = True
+                self._unvoiced = 0
+                return SPEECH_START
+            return None
+
+        self._unvoiced = 0 if voiced else self._unvoiced + 1
+        if self._unvoiced >= self.silence_frames:
+            self.speaking = False
+            self._voiced = 0
+            return SPEECH_END
+        return None
+
+    def reset(self):
+        """Forget the current utterance (the noise floor is kept)"""
+        self.speaking = False
+        self._voiced = 0
+        self._unvoiced = 0
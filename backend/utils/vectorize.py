@@ -0,0 +1,50 @@
+"""
+Hashed Character N-gram Features
+Language-agnostic sparse features for the local classifiers and caches.
+"""
+import math
+import zlib
+from collections import Counter
+from typing import Dict, Iterator
+
+from utils.text import normalize_text
+
+DEFAULT_DIM = 2 ** 14
+
+
+def char_ngrams(text: str, n_min: int = 1, n_max: int = 4) -> Iterator[str]:
+    """
+    Yield character n-grams of normalized text, padded with spaces so
+    word starts and ends get their own grams.
+    """
+    padded = f" {normalize_text(text)} "
+    for n in range(n_min, n_max + 1):
+        for i in range(len(padded) - n + 1):
+            yield padded[i:i + n]
+
+
+def hashed_ngram_features(
+    text: str,
+    dim: int = DEFAULT_DIM,
+    n_min: int = 1,
+    n_max: int = 4
+) -> Dict[int, float]:
+    """
+    Map text to an L2-normalized sparse vector of log-scaled n-gram counts.
+
+    Args:
+        text: Raw text in any supported language
+        dim: Number of hash buckets
+        n_min: Shortest n-gram length
+        n_max: Longest n-gram length
+
+    Returns:
+        Mapping of bucket index to weight
+    """
+    # crc32 rather than hash(): stable across processes, so saved models stay valid
+    counts = Counter(
+        zlib.crc32(gram.encode("utf-8")) % dim for gram in char_ngrams(text, n_min, n_max)
+    )
+    weights = {index: 1.0 + math.log(count) for index, count in counts.items()}
+    norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+    return {index: weight / norm for index, weight in weights.items()}
@@ -0,0 +1,328 @@
+"""
+Local stand-ins for the SautiNa upstreams, for offline load testing.
+
+Two servers:
+  upstreams  An OpenAI-compatible chat server in place of N-ATLaS (streaming
+             and non-streaming) and a YarnGPT-compatible TTS server, on one port.
+  backend    The real SautiNa app pointed at the fake upstreams, with the
+             search providers (and, by default, Whisper) replaced by stubs.
+             Adds GET /bench/loop-lag for event-loop lag sampling.
+
+Latencies are "MEDIAN[:P95]" in seconds and drawn from a log-normal
+distribution, so a few requests are much slower than the median, as in production.
+
+Usage:
+    python bench_fakes.py upstreams --port 9100 --llm-latency 0.6:1.5 --tts-latency 1.0:2.5
+    python bench_fakes.py backend --port 8100 --upstream http://127.0.0.1:9100 --search-latency 0.4:1.2
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import asynccontextmanager
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+
+
+class Latency:
+    """Log-normal delay given its median and 95th percentile"""
+
+    def __init__(self, spec: str):
+        median, _, p95 = spec.partition(":")
+        self.median = float(median)
+        p95 = float(p95) if p95 else self.median
+        # P95 of a log-normal sits 1.645 sigma above the median in log space
+        self.sigma = math.log(p95 / self.median) / 1.645 if self.median > 0 and p95 > self.median else 0.0
+
+    def sample(self) -> float:
+        if self.median <= 0:
+            return 0.0
+        return self.median * math.exp(random.gauss(0.0, self.sigma)) if self.sigma else self.median
+
+    async def wait(self):
+        delay = self.sample()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def __str__(self):
+        return f"median {self.median:.3f}s, sigma {self.sigma:.2f}"
+
+
+# ---------------------------------------------------------------------------
+# Fake upstreams
+# ---------------------------------------------------------------------------
+
+_SEARCH_HINTS = ("weather", "price", "news", "today", "oju ojo", "yanayi", "labarai", "ozi")
+_NUMBERED = re.compile(r"^\s*(\d+)[.)]\s*(.*)$", re.MULTILINE)
+_FILLER = (
+    "This is a simulated answer from the benchmark server. It has roughly the shape and "
+    "length of a real N-ATLaS reply so downstream text-to-speech work is realistic. "
+).split()
+
+
+def _fake_reply(body: dict) -> str:
+    """Reply text shaped like what the backend expects for each kind of call"""
+    messages = body.get("messages", [])
+    system = messages[0]["content"] if messages and messages[0]["role"] == "system" else ""
+    user = messages[-1]["content"] if messages else ""
+    max_tokens = int(body.get("max_tokens") or 500)
+
+    if "intent classifier" in system:
+        return "search" if any(hint in user.lower() for hint in _SEARCH_HINTS) else "chat"
+    if "professional translator" in system:
+        numbered = _NUMBERED.findall(user)
+        if numbered:
+            return "\n".join(f"{number}. [translated] {text}" for number, text in numbered)
+        return f"[translated] {user.split(':', 1)[-1].strip()}"
+
+    words = min(max_tokens, 60)
+    return " ".join(_FILLER[i % len(_FILLER)] for i in range(words))
+
+
+def create_upstream_app(llm_latency: Latency, token_delay: float, tts_latency: Latency, tts_bytes_per_char: int):
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+    app = FastAPI(title="SautiNa benchmark upstreams")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        reply = _fake_reply(body)
+        tokens = reply.split(" ")
+        prompt_tokens = sum(len(m.get("content", "")) for m in body.get("messages", [])) // 4
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        model = body.get("model", "n-atlas-bench")
+
+        # Time to first token
+        await llm_latency.wait()
+
+        if not body.get("stream"):
+            await asyncio.sleep(token_delay * len(tokens))
+            return JSONResponse({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": reply},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(tokens),
+                    "total_tokens": prompt_tokens + len(tokens),
+                },
+            })
+
+        async def events():
+            def chunk(delta: dict, finish_reason=None) -> str:
+                payload = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                }
+                return f"data: {json.dumps(payload)}\n\n"
+
+            yield chunk({"role": "assistant", "content": ""})
+            for i, token in enumerate(tokens):
+                yield chunk({"content": token if i == 0 else f" {token}"})
+                if token_delay:
+                    await asyncio.sleep(token_delay)
+            yield chunk({}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/api/v1/tts")
+    async def tts(request: Request):
+        body = await request.json()
+        await tts_latency.wait()
+        size = max(1024, len(body.get("text", "")) * tts_bytes_per_char)
+        # Frame-sync header so the bytes at least look like MPEG audio
+        return Response(b"\xff\xfb\x90\x00" + os.urandom(size - 4), media_type="audio/mpeg")
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    return app
+
+
+# ---------------------------------------------------------------------------
+# Backend with stubbed search and STT
+# ---------------------------------------------------------------------------
+
+_STUB_TRANSCRIPTS = [
+    ("How far, wetin be the price of rice for market today?", "pcm"),
+    ("Can you explain how photosynthesis works?", "en"),
+    ("Ina son in koyi yadda ake noman shinkafa.", "ha"),
+    ("Báwo ni ojú ọjọ́ yóò ṣe rí ní Èkó lọ́la?", "yo"),
+    ("Kedụ ka ihu igwe ga-adị n'Enugu echi?", "ig"),
+]
+
+
+class LoopLagSampler:
+    """Measures how late a periodic sleep wakes up, i.e. how long the event loop was blocked"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples = []
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - expected))
+
+    def snapshot(self, reset: bool = True) -> dict:
+        samples = sorted(self.samples)
+        if reset:
+            self.samples = []
+        if not samples:
+            return {"samples": 0}
+
+        def pct(q):
+            return 1000 * samples[min(len(samples) - 1, int(q * len(samples)))]
+
+        return {
+            "samples": len(samples),
+            "mean_ms": 1000 * sum(samples) / len(samples),
+            "p50_ms": pct(0.50),
+            "p99_ms": pct(0.99),
+            "max_ms": 1000 * samples[-1],
+        }
+
+
+def create_backend_app(
+    upstream: str,
+    search_latency: Latency,
+    stt_latency: Latency,
+    fake_stt: bool,
+    warm_caches: bool = False
+):
+    # Settings are read at import time, so point them at the fakes first
+    os.environ["NATLAS_API_URL"] = f"{upstream.rstrip('/')}/v1"
+    os.environ["YARNGPT_API_URL"] = f"{upstream.rstrip('/')}/api/v1/tts"
+    os.environ.setdefault("YARNGPT_API_KEY", "bench")
+    os.environ.setdefault("SEARCH_PREWARM_ENABLED", "false")
+
+    # Keep fake answers out of the real logs, caches and classifier training data
+    scratch = tempfile.mkdtemp(prefix="sautina-bench-")
+    os.environ["INTENT_LOG_ENABLED"] = "false"
+    os.environ["TRANSLATION_MEMORY_PATH"] = os.path.join(scratch, "translation_memory.sqlite3")
+    os.environ["TRACING_JSONL_PATH"] = os.path.join(scratch, "traces.jsonl")
+    os.environ["PROFILING_DIR"] = os.path.join(scratch, "profiles")
+    os.environ["AUDIO_BANK_DIR"] = os.path.join(scratch, "audio_bank")
+    os.environ["TEMP_DIR"] = os.path.join(scratch, "audio")
+    if not warm_caches:
+        # The inputs are a short fixed list: with caches on, every round after
+        # the first would measure cache hits rather than the pipeline
+        os.environ["SEARCH_CACHE_ENABLED"] = "false"
+        os.environ["TRANSLATION_MEMORY_ENABLED"] = "false"
+        os.environ["INTENT_CACHE_ENABLED"] = "false"
+        os.environ["SEMANTIC_CACHE_ENABLED"] = "false"
+    sys.path.insert(0, BACKEND_DIR)
+
+    import main as backend
+    from config import SupportedLanguage
+    from services.search_service import search_service
+
+    def search_stub(query: str, max_results: int) -> str:
+        # Runs on the search thread pool like the real blocking clients
+        time.sleep(search_latency.sample())
+        return "\n".join(
+            f"{i}. Result {i} for {query}: simulated snippet with a few facts." for i in range(1, max_results + 1)
+        )
+
+    search_service.tavily_client = object()
+    search_service.ddgs_client = None
+    search_service._search_tavily = search_stub
+
+    if fake_stt:
+        from services.stt_service import stt_service
+
+        async def transcribe_stub(audio_data: bytes, filename: str = "audio.wav"):
+            await stt_latency.wait()
+            text, code = random.choice(_STUB_TRANSCRIPTS)
+            return text, SupportedLanguage(code)
+
+        stt_service.transcribe = transcribe_stub
+
+    sampler = LoopLagSampler()
+    app = backend.app
+    app_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan_with_sampler(app_):
+        task = asyncio.create_task(sampler.run())
+        async with app_lifespan(app_) as state:
+            yield state
+        task.cancel()
+
+    app.router.lifespan_context = lifespan_with_sampler
+
+    @app.get("/bench/loop-lag")
+    async def loop_lag(reset: bool = True):
+        return sampler.snapshot(reset)
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run local stand-ins for SautiNa upstreams")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    up = sub.add_parser("upstreams", help="Fake N-ATLaS (OpenAI-compatible) and YarnGPT servers")
+    up.add_argument("--host", default="127.0.0.1")
+    up.add_argument("--port", type=int, default=9100)
+    up.add_argument("--llm-latency", default="0.5:1.5", help="Time to first token, MEDIAN[:P95] seconds")
+    up.add_argument("--llm-token-delay", type=float, default=0.01, help="Seconds per generated token")
+    up.add_argument("--tts-latency", default="1.0:2.5", help="YarnGPT latency, MEDIAN[:P95] seconds")
+    up.add_argument("--tts-bytes-per-char", type=int, default=600)
+
+    back = sub.add_parser("backend", help="SautiNa backend wired to the fakes")
+    back.add_argument("--host", default="127.0.0.1")
+    back.add_argument("--port", type=int, default=8100)
+    back.add_argument("--upstream", default="http://127.0.0.1:9100")
+    back.add_argument("--search-latency", default="0.4:1.2", help="Search provider latency, MEDIAN[:P95] seconds")
+    back.add_argument("--stt-latency", default="0.8:1.6", help="Stubbed STT latency, MEDIAN[:P95] seconds")
+    back.add_argument("--real-stt", action="store_true", help="Use Whisper instead of the STT stub")
+    back.add_argument(
+        "--warm-caches", action="store_true",
+        help="Leave the search, intent and semantic caches and the translation memory as configured"
+    )
+
+    args = parser.parse_args()
+
+    import uvicorn
+
+    if args.command == "upstreams":
+        app = create_upstream_app(
+            Latency(args.llm_latency), args.llm_token_delay, Latency(args.tts_latency), args.tts_bytes_per_char
+        )
+        print(f"Fake upstreams on {args.host}:{args.port} (LLM {Latency(args.llm_latency)}, TTS {Latency(args.tts_latency)})")
+    else:
+        app = create_backend_app(
+            args.upstream, Latency(args.search_latency), Latency(args.stt_latency), not args.real_stt,
+            args.warm_caches
+        )
+        print(f"Benchmark backend on {args.host}:{args.port} -> {args.upstream}")
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark the keyword fast path of IntentService.classify_quick.
+
+Compares the compiled, word-boundary KeywordMatcher against the previous
+substring scan on the labeled test set: speed, accuracy and false SEARCH routes.
+
+Usage:
+    python bench_intent_matcher.py
+    python bench_intent_matcher.py --testset my_labels.jsonl --repeat 2000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from config import BASE_DIR, settings
+from services.keyword_matcher import KeywordMatcher
+
+
+def legacy_classify_quick(user_message):
+    """The original substring-scan fast path, kept here as the baseline"""
+    message_lower = user_message.lower()
+
+    translate_patterns = [
+        "translate", "translation", "how do you say",
+        "in hausa", "in yoruba", "in igbo", "in pidgin", "in english",
+        "to hausa", "to yoruba", "to igbo", "to pidgin", "to english",
+        "tumọ", "fassara", "kowaa",
+    ]
+    if any(pattern in message_lower for pattern in translate_patterns):
+        return "translate"
+
+    search_patterns = [
+        "weather", "price", "market price", "news", "today",
+        "current", "now", "latest", "how much is", "cost of",
+        "oju ojo", "iroyin", "owo",
+        "yanayi", "labarai", "nawa ne",
+        "ihu igwe", "ozi", "ego ole",
+    ]
+    if any(pattern in message_lower for pattern in search_patterns):
+        return "search"
+
+    learn_patterns = [
+        "teach me", "explain", "learn about", "tell me about",
+        "what is", "how do i", "how to", "guide me", "help me understand",
+        "kọ mi", "koya min", "kuziere m",
+    ]
+    if any(pattern in message_lower for pattern in learn_patterns):
+        return "learn"
+
+    return None
+
+
+def load_testset(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def report(name, classify, examples, repeat):
+    correct = deferred = false_search = 0
+    for example in examples:
+        predicted = classify(example["message"])
+        if predicted is None:
+            deferred += 1
+        elif predicted == example["intent"]:
+            correct += 1
+        elif predicted == "search":
+            false_search += 1
+
+    messages = [example["message"] for example in examples]
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for message in messages:
+            classify(message)
+    per_call = (time.perf_counter() - started) / (repeat * len(messages))
+
+    matched = len(examples) - deferred
+    print(f"\n{name}")
+    print(f"  Correct:                 {correct}/{len(examples)} ({correct / len(examples):.1%})")
+    print(f"  Precision when matched:  {correct / (matched or 1):.1%}")
+    print(f"  Deferred to model:       {deferred / len(examples):.1%}")
+    print(f"  Wrong SEARCH routes:     {false_search}")
+    print(f"  Time per message:        {1e6 * per_call:.1f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the intent keyword fast path")
+    parser.add_argument("--testset", default=os.path.join(BASE_DIR, "data", "intent_testset.jsonl"))
+    parser.add_argument("--keywords", default=settings.intent_keywords_path)
+    parser.add_argument("--repeat", type=int, default=1000)
+    args = parser.parse_args()
+
+    examples = load_testset(args.testset)
+    matcher = KeywordMatcher.from_file(args.keywords)
+    print(f"Loaded {len(examples)} labeled messages from {args.testset}")
+
+    report("Legacy substring scan", legacy_classify_quick, examples, args.repeat)
+    report("Compiled KeywordMatcher", matcher.match, examples, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
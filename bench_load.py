@@ -0,0 +1,209 @@
+"""
+Offline load test for the SautiNa backend.
+
+Starts the fake upstreams and a benchmark backend (see bench_fakes.py), then
+drives /api/text, /api/voice and /api/translate at each concurrency level.
+Reports p50/p95/p99 latency, throughput, errors and backend event-loop lag.
+
+Usage:
+    python bench_load.py
+    python bench_load.py --concurrency 1,8,32 --duration 30 --endpoints text,voice
+    python bench_load.py --llm-latency 1.2:3 --tts-latency 2:5 --json results.json
+    python bench_load.py --base-url http://127.0.0.1:8100 --no-spawn   # servers already running
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import wave
+
+import httpx
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+TEXT_MESSAGES = [
+    {"text": "Can you explain how photosynthesis works?", "language": "en"},
+    {"text": "Wetin be the price of rice for market today?", "language": "pcm"},
+    {"text": "What is the weather in Lagos today?"},
+    {"text": "Ina son in koyi yadda ake noman shinkafa."},
+    {"text": "Kọ́ mi ní bí a ṣe ń ka nọ́ńbà ní Yorùbá", "mode": "learn"},
+    {"text": "Tell me a short story about the tortoise and the birds."},
+]
+
+TRANSLATIONS = [
+    {"text": "Good morning. How is your family?", "source_language": "en", "target_language": "ha"},
+    {"text": "The market opens at eight. Prices are higher this week.", "source_language": "en", "target_language": "yo"},
+    {"text": "Thank you for your help.", "source_language": "en", "target_language": "ig"},
+]
+
+
+def silent_wav(seconds: float = 2.0, rate: int = 16000) -> bytes:
+    """A short 16 kHz mono clip for /api/voice (the benchmark backend stubs STT by default)"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(b"\x00\x00" * int(seconds * rate))
+    return buffer.getvalue()
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def send(client: httpx.AsyncClient, endpoint: str, voice_clip: bytes) -> httpx.Response:
+    if endpoint == "text":
+        return await client.post("/api/text", json=random.choice(TEXT_MESSAGES))
+    if endpoint == "voice":
+        return await client.post("/api/voice", files={"audio": ("clip.wav", voice_clip, "audio/wav")})
+    if endpoint == "translate":
+        return await client.post("/api/translate", json=random.choice(TRANSLATIONS))
+    raise ValueError(f"Unknown endpoint: {endpoint}")
+
+
+async def run_level(base_url: str, endpoint: str, concurrency: int, duration: float, voice_clip: bytes) -> dict:
+    """Closed-loop load: `concurrency` workers each send the next request as soon as one finishes"""
+    latencies = []
+    errors = 0
+    stop_at = time.perf_counter() + duration
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        await client.get("/bench/loop-lag")  # Reset the lag window
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < stop_at:
+                started = time.perf_counter()
+                try:
+                    response = await send(client, endpoint, voice_clip)
+                    if response.status_code != 200:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        loop_lag = (await client.get("/bench/loop-lag")).json()
+
+    latencies.sort()
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": 1000 * percentile(latencies, 0.50),
+        "p95_ms": 1000 * percentile(latencies, 0.95),
+        "p99_ms": 1000 * percentile(latencies, 0.99),
+        "loop_lag": loop_lag,
+    }
+
+
+def spawn(args) -> list:
+    """Start the fake upstreams and the benchmark backend as subprocesses"""
+    upstream_port, backend_port = args.upstream_port, args.backend_port
+    processes = [
+        subprocess.Popen([
+            sys.executable, os.path.join(ROOT, "bench_fakes.py"), "upstreams",
+            "--port", str(upstream_port),
+            "--llm-latency", args.llm_latency,
+            "--llm-token-delay", str(args.llm_token_delay),
+            "--tts-latency", args.tts_latency,
+        ]),
+        subprocess.Popen([
+            sys.executable, os.path.join(ROOT, "bench_fakes.py"), "backend",
+            "--port", str(backend_port),
+            "--upstream", f"http://127.0.0.1:{upstream_port}",
+            "--search-latency", args.search_latency,
+            "--stt-latency", args.stt_latency,
+        ] + (["--real-stt"] if args.real_stt else []) + (["--warm-caches"] if args.warm_caches else [])),
+    ]
+    return processes
+
+
+async def wait_until_up(url: str, timeout: float = 60.0):
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(timeout=2) as client:
+        while time.perf_counter() < deadline:
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def print_table(results):
+    print(f"\n{'endpoint':<10} {'conc':>5} {'reqs':>6} {'err':>4} {'rps':>7} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'lag p99':>8} {'lag max':>8}")
+    for r in results:
+        lag = r["loop_lag"]
+        print(f"{r['endpoint']:<10} {r['concurrency']:>5} {r['requests']:>6} {r['errors']:>4} "
+              f"{r['throughput_rps']:>7.2f} {r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} {r['p99_ms']:>8.0f} "
+              f"{lag.get('p99_ms', 0):>8.1f} {lag.get('max_ms', 0):>8.1f}")
+
+
+async def run(args):
+    base_url = args.base_url or f"http://127.0.0.1:{args.backend_port}"
+    processes = [] if args.no_spawn else spawn(args)
+    try:
+        await wait_until_up(f"{base_url}/api/health")
+        voice_clip = silent_wav()
+        results = []
+        for endpoint in args.endpoints.split(","):
+            for concurrency in (int(c) for c in args.concurrency.split(",")):
+                print(f"▶ {endpoint} x{concurrency} for {args.duration:.0f}s...")
+                results.append(await run_level(base_url, endpoint, concurrency, args.duration, voice_clip))
+        print_table(results)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump({"args": vars(args), "results": results}, f, indent=2)
+            print(f"\nResults written to {args.json}")
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the SautiNa backend against local fake upstreams")
+    parser.add_argument("--endpoints", default="text,voice,translate")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per level")
+    parser.add_argument("--llm-latency", default="0.5:1.5", help="Fake N-ATLaS time to first token, MEDIAN[:P95]")
+    parser.add_argument("--llm-token-delay", type=float, default=0.01)
+    parser.add_argument("--tts-latency", default="1.0:2.5", help="Fake YarnGPT latency, MEDIAN[:P95]")
+    parser.add_argument("--search-latency", default="0.4:1.2", help="Search stub latency, MEDIAN[:P95]")
+    parser.add_argument("--stt-latency", default="0.8:1.6", help="STT stub latency, MEDIAN[:P95]")
+    parser.add_argument("--real-stt", action="store_true", help="Transcribe with Whisper instead of the stub")
+    parser.add_argument(
+        "--warm-caches", action="store_true",
+        help=(
+            "Leave the search, intent and semantic caches and the translation memory as configured "
+            "(repeat inputs then become cache hits)"
+        )
+    )
+    parser.add_argument("--upstream-port", type=int, default=9100)
+    parser.add_argument("--backend-port", type=int, default=8100)
+    parser.add_argument("--base-url", help="Backend to test (defaults to the spawned one)")
+    parser.add_argument("--no-spawn", action="store_true", help="Use servers that are already running")
+    parser.add_argument("--json", help="Write results to this file")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
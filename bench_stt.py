@@ -0,0 +1,268 @@
+"""
+Benchmark speech-to-text across Whisper model sizes and engines.
+
+Runs the fixed multilingual clip set (backend/data/stt_clips.json) through
+each model/engine pair. Each pair runs in a fresh subprocess so peak memory
+is measured per model. Reports load time, real-time factor (processing
+time / audio duration), peak RSS, word error rate against the reference
+transcripts, and how often the detected language was right.
+
+Engines:
+    openai   openai-whisper through STTService (what the backend runs)
+    faster   faster-whisper (CTranslate2, int8 on CPU), if installed
+
+Usage:
+    python bench_stt.py
+    python bench_stt.py --models tiny,base,small --engines openai,faster --json stt.json
+    python bench_stt.py --render-missing   # synthesize absent clips with YarnGPT first
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(ROOT, 'backend'))
+
+from config import BASE_DIR, SupportedLanguage
+from utils.text import normalize_text
+
+DEFAULT_MANIFEST = os.path.join(BASE_DIR, "data", "stt_clips.json")
+
+
+def load_clips(manifest_path):
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        clips = json.load(f)["clips"]
+    base = os.path.dirname(manifest_path)
+    for clip in clips:
+        clip["path"] = os.path.join(base, clip["file"])
+    return clips
+
+
+def word_errors(reference, hypothesis):
+    """Word-level edit distance on normalized text; returns (errors, reference word count)"""
+    ref = normalize_text(reference).split()
+    hyp = normalize_text(hypothesis).split()
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(
+                previous[j] + 1,          # deletion
+                current[j - 1] + 1,       # insertion
+                previous[j - 1] + (ref_word != hyp_word),  # substitution
+            )
+        previous = current
+    return previous[-1], len(ref)
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# ---------------------------------------------------------------------------
+# Engines (each returns transcribe(path) -> (text, language code, audio seconds, elapsed seconds))
+# ---------------------------------------------------------------------------
+
+def load_openai_engine(model_name):
+    import whisper
+    from services.stt_service import STTService
+
+    service = STTService()
+    service._model_name = model_name
+    service._load_model()
+
+    def transcribe(path):
+        duration = len(whisper.audio.load_audio(path)) / whisper.audio.SAMPLE_RATE
+        with open(path, "rb") as f:
+            audio_data = f.read()
+        started = time.perf_counter()
+        text, language = asyncio.run(service.transcribe(audio_data, os.path.basename(path)))
+        return text, language.value, duration, time.perf_counter() - started
+
+    return transcribe
+
+
+def load_faster_engine(model_name):
+    from faster_whisper import WhisperModel
+    from services.language_identifier import language_identifier
+
+    model = WhisperModel(model_name, device="auto", compute_type="int8")
+
+    def transcribe(path):
+        started = time.perf_counter()
+        segments, info = model.transcribe(path)
+        text = " ".join(segment.text.strip() for segment in segments)  # Segments decode lazily
+        elapsed = time.perf_counter() - started
+        # Same mapping as STTService: trust ha/yo/ig, check anything else against the text
+        if info.language in ("ha", "yo", "ig"):
+            language = info.language
+        else:
+            language = language_identifier.detect(text, SupportedLanguage.ENGLISH).value
+        return text, language, info.duration, elapsed
+
+    return transcribe
+
+
+ENGINES = {"openai": load_openai_engine, "faster": load_faster_engine}
+
+
+def run_worker(engine, model_name, manifest_path):
+    """Benchmark one engine/model pair in this process and print a JSON record"""
+    clips = [clip for clip in load_clips(manifest_path) if os.path.exists(clip["path"])]
+    record = {"engine": engine, "model": model_name}
+
+    started = time.perf_counter()
+    try:
+        transcribe = ENGINES[engine](model_name)
+    except ImportError as e:
+        print(json.dumps({**record, "error": f"engine not installed: {e}"}))
+        return
+    record["load_seconds"] = time.perf_counter() - started
+
+    # Warm-up so the first clip does not pay one-off kernel/setup costs
+    if clips:
+        transcribe(clips[0]["path"])
+
+    results = []
+    for clip in clips:
+        text, language, duration, elapsed = transcribe(clip["path"])
+        errors, words = word_errors(clip["reference"], text) if clip.get("reference") else (0, 0)
+        results.append({
+            "id": clip["id"],
+            "language": clip["language"],
+            "detected_language": language,
+            "audio_seconds": duration,
+            "seconds": elapsed,
+            "rtf": elapsed / duration if duration else None,
+            "word_errors": errors,
+            "reference_words": words,
+            "transcript": text,
+        })
+
+    record["clips"] = results
+    record["peak_rss_mb"] = peak_rss_mb()
+    print(json.dumps(record, ensure_ascii=False))
+
+
+def summarize(record):
+    """Overall and per-language RTF / WER / language accuracy"""
+    clips = record.get("clips", [])
+    by_language = {}
+    for clip in clips:
+        by_language.setdefault(clip["language"], []).append(clip)
+
+    def stats(group):
+        audio = sum(c["audio_seconds"] for c in group)
+        words = sum(c["reference_words"] for c in group)
+        return {
+            "rtf": sum(c["seconds"] for c in group) / audio if audio else None,
+            "wer": sum(c["word_errors"] for c in group) / words if words else None,
+            "language_accuracy": sum(c["detected_language"] == c["language"] for c in group) / len(group),
+        }
+
+    record["summary"] = stats(clips) if clips else {}
+    record["by_language"] = {language: stats(group) for language, group in sorted(by_language.items())}
+    return record
+
+
+def fmt(value, pattern):
+    return "-" if value is None else format(value, pattern)
+
+
+def print_table(records):
+    print(f"\n{'engine':<8} {'model':<8} {'load s':>7} {'RSS MB':>8} {'RTF':>6} {'WER':>6} {'lang':>6}   per-language WER")
+    for record in records:
+        if "error" in record:
+            print(f"{record['engine']:<8} {record['model']:<8} {record['error']}")
+            continue
+        summary = record["summary"]
+        per_language = "  ".join(
+            f"{language}:{fmt(stats['wer'], '.0%')}" for language, stats in record["by_language"].items()
+        )
+        print(f"{record['engine']:<8} {record['model']:<8} {record['load_seconds']:>7.1f} "
+              f"{record['peak_rss_mb']:>8.0f} {fmt(summary.get('rtf'), '.2f'):>6} "
+              f"{fmt(summary.get('wer'), '.0%'):>6} {fmt(summary.get('language_accuracy'), '.0%'):>6}   {per_language}")
+
+
+async def render_missing(clips):
+    """Synthesize absent clips with YarnGPT in each clip's language voice"""
+    from services.tts_service import tts_service
+
+    for clip in clips:
+        if os.path.exists(clip["path"]):
+            continue
+        os.makedirs(os.path.dirname(clip["path"]), exist_ok=True)
+        print(f"Rendering {clip['id']} with YarnGPT...")
+        voice = tts_service._get_voice(SupportedLanguage(clip["language"]))
+        await asyncio.to_thread(tts_service._request_speech, clip["reference"], voice, clip["path"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Whisper STT across models and engines")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST)
+    parser.add_argument("--models", default="tiny,base,small", help="Comma-separated Whisper model sizes")
+    parser.add_argument("--engines", default="openai", help="Comma-separated engines: openai, faster")
+    parser.add_argument("--render-missing", action="store_true", help="Synthesize missing clips with YarnGPT")
+    parser.add_argument("--json", help="Write machine-readable results to this file")
+    parser.add_argument("--worker", nargs=2, metavar=("ENGINE", "MODEL"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(*args.worker, args.manifest)
+        return
+
+    clips = load_clips(args.manifest)
+    if args.render_missing:
+        asyncio.run(render_missing(clips))
+    available = [clip for clip in clips if os.path.exists(clip["path"])]
+    print(f"{len(available)}/{len(clips)} clips available in {args.manifest}")
+    if not available:
+        print("No audio to benchmark. Record the clips or run with --render-missing.")
+        return
+
+    records = []
+    for engine in args.engines.split(","):
+        for model_name in args.models.split(","):
+            print(f"▶ {engine} / {model_name}...")
+            worker = subprocess.run(
+                [sys.executable, __file__, "--manifest", args.manifest, "--worker", engine, model_name],
+                capture_output=True, text=True,
+            )
+            lines = [line for line in worker.stdout.splitlines() if line.startswith("{")]
+            if worker.returncode != 0 or not lines:
+                error = (worker.stderr.strip().splitlines() or ["worker failed"])[-1]
+                records.append({"engine": engine, "model": model_name, "error": error})
+                continue
+            record = json.loads(lines[-1])
+            records.append(summarize(record) if "error" not in record else record)
+
+    print_table(records)
+
+    if args.json:
+        output = {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "machine": {
+                "platform": platform.platform(),
+                "processor": platform.processor(),
+                "cpus": os.cpu_count(),
+                "python": platform.python_version(),
+            },
+            "manifest": args.manifest,
+            "results": records,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(output, f, ensure_ascii=False, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
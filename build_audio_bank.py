@@ -0,0 +1,38 @@
+"""
+Pre-render fixed phrases (fallbacks, welcome text, greetings) into the audio bank.
+
+Usage:
+    python build_audio_bank.py           # render phrases missing from the bank
+    python build_audio_bank.py --force   # re-render every phrase
+"""
+import argparse
+import asyncio
+import os
+import sys
+from dotenv import load_dotenv
+
+# Load environment variables BEFORE importing config
+env_path = os.path.join(os.path.dirname(__file__), 'backend', '.env')
+load_dotenv(env_path)
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from services.tts_service import tts_service
+from services.audio_bank_service import audio_bank_service
+
+
+async def build_audio_bank(force: bool):
+    print(f"Building audio bank {audio_bank_service.version} in {audio_bank_service.bank_dir}...")
+
+    total = sum(len(phrases) for phrases in audio_bank_service.phrases().values())
+    rendered = await tts_service.prerender_bank(force=force)
+
+    print(f"✅ Rendered {rendered} phrases ({len(audio_bank_service.entries)}/{total} banked)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-render the SautiNa audio bank")
+    parser.add_argument("--force", action="store_true", help="Re-render phrases that are already banked")
+    args = parser.parse_args()
+
+    asyncio.run(build_audio_bank(args.force))
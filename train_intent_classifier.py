@@ -0,0 +1,104 @@
+"""
+Train and evaluate the local intent classifier from logged N-ATLaS labels.
+The backend only logs labels with INTENT_LOG_ENABLED=true (the log holds raw
+user messages, so collect it deliberately).
+
+Usage:
+    python train_intent_classifier.py                   # train, evaluate, save
+    python train_intent_classifier.py --eval-only       # evaluate the saved model
+    python train_intent_classifier.py --log other.jsonl --threshold 0.9
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from config import settings
+from services.intent_classifier import LocalIntentClassifier, load_labeled_log
+
+
+def split_dataset(pairs, test_fraction, seed):
+    """Stratified train/test split so rare intents appear in both halves"""
+    by_label = defaultdict(list)
+    for message, label in pairs:
+        by_label[label].append((message, label))
+
+    rng = random.Random(seed)
+    train, test = [], []
+    for items in by_label.values():
+        rng.shuffle(items)
+        cut = int(round(len(items) * test_fraction))
+        test.extend(items[:cut])
+        train.extend(items[cut:])
+    rng.shuffle(train)
+    return train, test
+
+
+def evaluate(model, pairs, threshold):
+    """Accuracy against the LLM labels and the share of LLM calls avoided"""
+    correct = covered = covered_correct = 0
+    per_label = defaultdict(Counter)
+
+    started = time.perf_counter()
+    for message, label in pairs:
+        predicted, confidence = model.predict(message)
+        hit = predicted == label
+        correct += hit
+        per_label[label]["total"] += 1
+        per_label[label]["correct"] += hit
+        if confidence >= threshold:
+            covered += 1
+            covered_correct += hit
+    elapsed = time.perf_counter() - started
+
+    total = len(pairs) or 1
+    print(f"\nEvaluated {len(pairs)} messages (threshold {threshold:.2f})")
+    print(f"  Accuracy vs N-ATLaS labels:     {correct / total:.1%}")
+    print(f"  LLM calls avoided:              {covered / total:.1%}")
+    print(f"  Accuracy on avoided calls:      {covered_correct / (covered or 1):.1%}")
+    print(f"  Effective accuracy (with LLM):  {(covered_correct + total - covered) / total:.1%}")
+    print(f"  Mean prediction time:           {1e6 * elapsed / total:.0f} µs")
+    print("  Per intent:")
+    for label, counts in sorted(per_label.items()):
+        print(f"    {label:<10} {counts['correct'] / counts['total']:.1%} of {counts['total']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the SautiNa local intent classifier")
+    parser.add_argument("--log", default=settings.intent_log_path, help="Labeled JSONL log")
+    parser.add_argument("--model", default=settings.intent_model_path, help="Where to save/load the model")
+    parser.add_argument("--threshold", type=float, default=settings.intent_local_confidence_threshold)
+    parser.add_argument("--test-fraction", type=float, default=0.2)
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--eval-only", action="store_true", help="Evaluate the saved model on the whole log")
+    args = parser.parse_args()
+
+    pairs = load_labeled_log(args.log)
+    print(f"Loaded {len(pairs)} labeled messages from {args.log}")
+    print("  " + ", ".join(f"{label}: {count}" for label, count in Counter(l for _, l in pairs).most_common()))
+
+    if args.eval_only:
+        evaluate(LocalIntentClassifier.load(args.model), pairs, args.threshold)
+        return
+
+    train, test = split_dataset(pairs, args.test_fraction, args.seed)
+    model = LocalIntentClassifier()
+    started = time.perf_counter()
+    model.fit([m for m, _ in train], [l for _, l in train], epochs=args.epochs, seed=args.seed)
+    print(f"Trained on {len(train)} messages in {time.perf_counter() - started:.1f}s")
+
+    evaluate(model, test, args.threshold)
+
+    # Final model uses every labeled message
+    model.fit([m for m, _ in pairs], [l for _, l in pairs], epochs=args.epochs, seed=args.seed)
+    model.save(args.model)
+    print(f"\n✅ Model saved to {args.model}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import asyncio
+import json
+import math
+import os
+import struct
+import sys
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from config import settings
+from services.conversation_service import ConversationSession
+
+
+class RecordingWebSocket:
+    """Stands in for the client end: keeps every event the server sends"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+
+def quiet_tone(seconds, sample_rate, amplitude=40):
+    """A faint 220 Hz tone, far below the VAD's minimum speech level"""
+    samples = int(seconds * sample_rate)
+    return b"".join(
+        struct.pack("<h", int(amplitude * math.sin(2 * math.pi * 220 * i / sample_rate)))
+        for i in range(samples)
+    )
+
+
+async def verify_conversation_ptt():
+    print("Testing push-to-talk end_of_speech over audio too quiet for the VAD...")
+
+    session = ConversationSession(RecordingWebSocket())
+    turns = []
+
+    async def record_turn(turn, carried, audio):
+        turns.append((turn, len(carried), len(audio)))
+
+    session._run_turn = record_turn
+
+    audio = quiet_tone(1.5, settings.conversation_sample_rate)
+    # Stream it in 20 ms chunks, as a microphone would
+    chunk = settings.conversation_sample_rate * 20 // 1000 * 2
+    for start in range(0, len(audio), chunk):
+        await session._on_audio(audio[start:start + chunk])
+    speech_started = any(event["type"] == "speech_started" for event in session.websocket.sent)
+
+    await session._on_control(json.dumps({"type": "end_of_speech"}))
+    await asyncio.sleep(0)
+
+    print(f"VAD detected speech: {speech_started}")
+    print(f"Turns started: {turns}")
+    ok = not speech_started and len(turns) == 1 and turns[0][2] >= len(audio) - chunk
+    if ok:
+        print("\n[SUCCESS] end_of_speech answered the quiet audio.")
+    else:
+        print("\n[FAILURE] end_of_speech did not start a turn with the quiet audio.")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(verify_conversation_ptt()) else 1)
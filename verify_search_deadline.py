@@ -0,0 +1,46 @@
+import asyncio
+import os
+import sys
+import time
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from services.search_service import SearchService
+from utils.text import normalize_query
+
+
+async def verify_search_deadline():
+    print("Testing a short-deadline caller joining a slow in-flight search...")
+
+    service = SearchService()
+
+    async def slow_search(query, max_results=5, deadline=None):
+        await asyncio.sleep(1.0)
+        return f"results for {query}"
+
+    service._search_live = slow_search
+    query = "Market price of rice in Lagos"
+
+    slow_caller = asyncio.create_task(service.search_async(query, deadline=5.0))
+    await asyncio.sleep(0.05)
+
+    started = time.monotonic()
+    joined = await service.search_async(query, deadline=0.2)
+    waited = time.monotonic() - started
+
+    slow = await slow_caller
+    cached, state = service.cache.get(normalize_query(query))
+
+    ok = joined == "" and waited < 0.5 and slow and cached == slow
+    print(f"Joined caller returned {joined!r} after {waited:.2f}s")
+    print(f"Slow caller returned {slow!r}; cache is {state}")
+    if ok:
+        print("\n[SUCCESS] The joined caller kept its own deadline and the shared search still filled the cache.")
+    else:
+        print("\n[FAILURE] The joined caller did not honour its deadline.")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(verify_search_deadline()) else 1)